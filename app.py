@@ -1,6 +1,7 @@
 import html
 import io
 import json
+import logging
 import math
 import random
 import re
@@ -10,16 +11,22 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import pandas as pd
-import requests
 import streamlit as st
-from bs4 import BeautifulSoup
 
 import config
 from ev_calculator import analyze_match_ev, kelly_criterion
-from kambi_client import KambiClient
-from odds import calculate_poisson_markets_from_dnb
-from team_mapping_db import get_mapping_service, TeamMappingService
-import logging
+from football_elo_odds.app.error_mapper import map_error_to_ui
+from kambi_client import KambiClient, get_http_cache
+from odds import cached_poisson_markets_from_dnb, get_pricing_cache, price_fixtures_batch
+from odds_poller import OddsPoller, OddsSnapshot
+from soccer_rating import (
+    EloTableIndex,
+    PrefetchReport,
+    SoccerRatingClient,
+    get_table_cache,
+    normalize_team_name,
+)
+from team_mapping_db import ImportReport, TeamMappingService, get_mapping_service, read_mapping_rows
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -112,10 +119,127 @@ def normalize_league_key(name: str) -> str:
 def get_kambi_client() -> KambiClient:
     """Get cached Kambi API client.
 
+    The client shares the disk-backed HTTP cache, so unchanged payloads are
+    revalidated with a conditional request instead of being re-downloaded.
+
     Returns:
         KambiClient instance
     """
-    return KambiClient()
+    return KambiClient(http_cache=get_http_cache())
+
+
+@st.cache_resource
+def get_rating_client() -> SoccerRatingClient:
+    """Get the soccer-rating.com client shared by all sessions.
+
+    The client shares the disk-backed table cache, so restarts and new
+    workers serve the last scraped tables immediately and refresh stale ones
+    in the background.
+
+    Returns:
+        SoccerRatingClient with a pooled session and per-host rate limiting
+    """
+    return SoccerRatingClient(table_cache=get_table_cache())
+
+
+def display_prefetch_report(report: PrefetchReport) -> None:
+    """Summarize a league prefetch with the slowest and failed leagues.
+
+    Args:
+        report: Report returned by SoccerRatingClient.prefetch_leagues()
+    """
+    if report.failed:
+        st.warning(f"⚠️ Prefetched {report.summary}")
+    else:
+        st.success(f"✅ Prefetched {report.summary}")
+    rows = [
+        {
+            "League": f"{result.country} - {result.league}",
+            "Seconds": round(result.latency, 2),
+            "Error": result.error or "",
+        }
+        for result in report.failed + [r for r in report.slowest(10) if r.ok]
+    ]
+    if rows:
+        with st.expander("Slowest and failed leagues"):
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+
+@st.cache_resource
+def get_odds_poller() -> OddsPoller:
+    """Get the background odds poller shared by all sessions, started on first use.
+
+    Returns:
+        Running OddsPoller instance
+    """
+    return OddsPoller(get_kambi_client()).start()
+
+
+def get_odds_snapshot() -> Optional[OddsSnapshot]:
+    """Read the latest polled odds snapshot from memory.
+
+    Only blocks while the poller has not yet completed its first poll.
+
+    Returns:
+        Latest OddsSnapshot, or None if no poll has succeeded yet
+    """
+    store = get_odds_poller().store
+    snapshot = store.latest()
+    if snapshot is None and store.last_error is None:
+        with st.spinner("Fetching all football matches from Kambi..."):
+            snapshot = store.wait_for_snapshot(timeout=config.ODDS_SNAPSHOT_WAIT)
+    return snapshot
+
+
+def display_snapshot_status(snapshot: Optional[OddsSnapshot], key: str) -> None:
+    """Show the odds snapshot age with a button to poll immediately.
+
+    Args:
+        snapshot: Snapshot being displayed, None if none is available yet
+        key: Unique widget key for the refresh button
+    """
+    poller = get_odds_poller()
+    status_col, button_col = st.columns([4, 1])
+    with status_col:
+        if snapshot is not None:
+            diff = snapshot.diff
+            st.caption(
+                f"🕒 Odds snapshot #{snapshot.version} from {snapshot.fetched_at:%H:%M:%S} "
+                f"({snapshot.age:.0f}s ago) · {len(diff.changed)} price changes, "
+                f"{len(diff.added)} new, {len(diff.removed)} removed since the previous poll"
+            )
+        if poller.store.last_error is not None:
+            stale = " Showing the last successful snapshot." if snapshot is not None else ""
+            ui_error = map_error_to_ui(poller.store.last_error)
+            st.warning(f"**{ui_error.title}** (degraded mode): {ui_error.detail}{stale}")
+            logger.debug(f"Last Kambi poll failed: {poller.store.last_error}")
+    with button_col:
+        if st.button("🔄 Refresh odds", key=key):
+            poller.refresh()
+            with st.spinner("Polling Kambi..."):
+                poller.store.wait_for_snapshot(
+                    timeout=config.ODDS_SNAPSHOT_WAIT,
+                    newer_than=snapshot.version if snapshot is not None else 0,
+                )
+            st.rerun()
+
+
+def display_import_report(report: ImportReport) -> None:
+    """Summarize a bulk mapping import, listing any conflicts and rejected rows.
+
+    Args:
+        report: Report returned by import_mappings()/import_league_mappings()
+    """
+    if report.errors or report.skipped:
+        st.warning(f"⚠️ Import finished: {report.summary}")
+    else:
+        st.success(f"✅ Import finished: {report.summary}")
+    if report.conflicts:
+        with st.expander(f"Conflicts ({len(report.conflicts)})"):
+            st.dataframe(pd.DataFrame(report.conflicts), use_container_width=True, hide_index=True)
+    if report.errors:
+        with st.expander(f"Rejected rows ({len(report.errors)})"):
+            st.text("\n".join(report.errors))
 
 
 @st.cache_data
@@ -182,88 +306,75 @@ def load_css(file_name: str) -> None:
     except FileNotFoundError:
         st.error(f"CSS file '{file_name}' not found. Please add it to the directory.")
 
-def fetch_with_headers(
-    url: str, referer: Optional[str] = None, timeout: int = 15
-) -> requests.Response:
-    """Fetches a URL with custom headers to mimic a browser.
-
-    Args:
-        url: URL to fetch
-        referer: Referer header value (optional)
-        timeout: Request timeout in seconds
-
-    Returns:
-        Response object
-
-    Raises:
-        requests.HTTPError: If the request fails
+def match_team_with_elo(
+    kambi_team_name: str,
+    elo_table: Union[pd.DataFrame, EloTableIndex],
+    league_name: Optional[str] = None
+) -> Tuple[Optional[pd.Series], Optional[Tuple[str, int, str]]]:
     """
-    headers = config.BASE_HEADERS.copy()
-    headers["Referer"] = referer or "https://www.soccer-rating.com/"
-    response = requests.get(url, headers=headers, timeout=timeout)
-    response.raise_for_status()
-    return response
+    Match a Kambi team name to an Elo rating team using database and fuzzy matching.
 
-def normalize_team_name(name: Any) -> str:
-    """Robustly cleans and standardizes a team name for reliable matching.
+    Single-team form of match_teams_with_elo; prefer that when resolving a
+    whole slate.
 
     Args:
-        name: Team name to normalize
+        kambi_team_name: Team name from Kambi API
+        elo_table: DataFrame with Elo ratings, or its EloTableIndex
+        league_name: Optional league filter for mapping
 
     Returns:
-        Normalized team name
+        Tuple of (matched_team_row, suggestion)
+        - matched_team_row: Series from Elo table if matched, else None
+        - suggestion: (elo_name, score, confidence) if fuzzy match found, else None
     """
-    if not isinstance(name, str):
-        return ""
-    name = name.lower()
-    name = name.replace('ö', 'oe').replace('ü', 'ue').replace('ä', 'ae')
-    name = name.replace('ø', 'oe').replace('å', 'aa').replace('æ', 'ae')
-    name = re.sub(r'[\&\-\.]+', ' ', name)
-    name = re.sub(r'[^a-z0-9\s]', '', name)
-    name = re.sub(r'\s\([ns]\)$', '', name)
-    return ' '.join(name.split())
+    return match_teams_with_elo([kambi_team_name], elo_table, league_name)[kambi_team_name]
 
 
-def match_team_with_elo(
-    kambi_team_name: str,
-    elo_table: pd.DataFrame,
+def match_teams_with_elo(
+    kambi_team_names: List[str],
+    elo_table: Union[pd.DataFrame, EloTableIndex],
     league_name: Optional[str] = None
-) -> Tuple[Optional[pd.Series], Optional[Tuple[str, int, str]]]:
+) -> Dict[str, Tuple[Optional[pd.Series], Optional[Tuple[str, int, str]]]]:
     """
-    Match a Kambi team name to an Elo rating team using database and fuzzy matching.
+    Resolve many Kambi team names against an Elo table in one pass.
 
-    Strategy:
-    1. Check team mapping database for exact match
-    2. Try normalized exact match against Elo table (auto-save this)
-    3. Try fuzzy matching - return suggestion but DON'T auto-save
+    Strategy (applied to each unique name, in bulk):
+    1. Check team mapping database for exact match (one query)
+    2. Try normalized exact match against Elo table via a hash join (auto-save this)
+    3. Try fuzzy matching with one rapidfuzz cdist score matrix - return
+       suggestion but DON'T auto-save
     4. Record unmapped team for admin review
 
     Args:
-        kambi_team_name: Team name from Kambi API
-        elo_table: DataFrame with Elo ratings
+        kambi_team_names: Team names from Kambi API (duplicates allowed)
+        elo_table: DataFrame with Elo ratings, or its EloTableIndex (pass the
+            cached index to avoid re-indexing the table on every call)
         league_name: Optional league filter for mapping
 
     Returns:
-        Tuple of (matched_team_row, suggestion)
-        - matched_team_row: Series from Elo table if matched, else None
-        - suggestion: (elo_name, score, confidence) if fuzzy match found, else None
+        Dict mapping each unique name to (matched_team_row, suggestion), as
+        returned by match_team_with_elo
     """
     mapping_service = get_mapping_service()
+    names = list(dict.fromkeys(kambi_team_names))
+    elo_index = elo_table if isinstance(elo_table, EloTableIndex) else EloTableIndex(elo_table)
+    results = {}
+
+    # Strategy 1: Check database mappings
+    db_mappings = mapping_service.get_mappings(names, league_name)
+    unresolved = []
+    for kambi_team_name in names:
+        mapped_elo_name = db_mappings.get(kambi_team_name)
+        position = elo_index.position(mapped_elo_name)
+        if position is not None:
+            logger.info(f"✓ Database match: '{kambi_team_name}' -> '{mapped_elo_name}'")
+            results[kambi_team_name] = (elo_index.row(position), None)
+            continue
 
-    # Strategy 1: Check database mapping
-    mapped_elo_name = mapping_service.get_mapping(kambi_team_name, league_name)
-    if mapped_elo_name:
-        # Find the exact team in Elo table
-        for _, team_row in elo_table.iterrows():
-            if team_row['Team'] == mapped_elo_name:
-                logger.info(f"✓ Database match: '{kambi_team_name}' -> '{mapped_elo_name}'")
-                return (team_row, None)
-
-    # Strategy 2: Try normalized exact match (auto-save this since it's exact)
-    normalized_kambi = normalize_team_name(kambi_team_name)
-    for _, team_row in elo_table.iterrows():
-        elo_team_name = team_row['Team']
-        if normalize_team_name(elo_team_name) == normalized_kambi:
+        # Strategy 2: Try normalized exact match (auto-save this since it's exact)
+        position = elo_index.normalized_position(kambi_team_name)
+        if position is not None:
+            elo_team_name = elo_index.names[position]
             logger.info(f"✓ Normalized match: '{kambi_team_name}' -> '{elo_team_name}'")
             # Auto-save normalized exact matches since they're reliable
             mapping_service.add_mapping(
@@ -272,34 +383,31 @@ def match_team_with_elo(
                 league_filter=league_name,
                 confidence="auto_high"
             )
-            return (team_row, None)
-
-    # Strategy 3: Try fuzzy matching - DON'T auto-save, just return suggestion
-    elo_team_names = elo_table['Team'].tolist()
-    suggestion = mapping_service.suggest_mapping(
-        kambi_team_name=kambi_team_name,
-        elo_team_names=elo_team_names,
-        auto_save=False,  # Never auto-save fuzzy matches
-        league_filter=league_name
-    )
+            results[kambi_team_name] = (elo_index.row(position), None)
+            continue
 
-    if suggestion:
-        elo_name, score, confidence = suggestion
-        logger.info(f"💡 Fuzzy suggestion: '{kambi_team_name}' -> '{elo_name}' (score: {score}, confidence: {confidence})")
-        # Return None for match but include the suggestion
-        # User must manually confirm fuzzy matches
+        unresolved.append(kambi_team_name)
 
-    # Strategy 4: No match found - record for admin review
-    if not suggestion:
-        logger.warning(f"✗ No match found for Kambi team: '{kambi_team_name}'")
+    # Strategy 3: Fuzzy matching for the rest - DON'T auto-save, just suggest
+    suggestions = mapping_service.suggest_mappings(unresolved, elo_index.names)
+    for kambi_team_name in unresolved:
+        suggestion = suggestions.get(kambi_team_name)
+        if suggestion:
+            elo_name, score, confidence = suggestion
+            logger.info(f"💡 Fuzzy suggestion: '{kambi_team_name}' -> '{elo_name}' (score: {score}, confidence: {confidence})")
+            # User must manually confirm fuzzy matches
+        else:
+            # Strategy 4: No match found - record for admin review
+            logger.warning(f"✗ No match found for Kambi team: '{kambi_team_name}'")
 
-    mapping_service.record_unmapped_team(
-        team_name=kambi_team_name,
-        source="kambi",
-        league=league_name
-    )
+        mapping_service.record_unmapped_team(
+            team_name=kambi_team_name,
+            source="kambi",
+            league=league_name
+        )
+        results[kambi_team_name] = (None, suggestion)
 
-    return (None, suggestion)
+    return results
 
 def safe_float(value: Any, default: float = 0.0) -> float:
     """Converts a value to float, handling percentage strings and errors.
@@ -320,12 +428,16 @@ def safe_float(value: Any, default: float = 0.0) -> float:
 
 # --- Data Fetching and Parsing Functions ---
 
-@st.cache_data(ttl=3600)
 def fetch_table_data(
     country: str, league: str
 ) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame], Optional[pd.DataFrame]]:
     """Fetches and parses ratings and league table in one go.
 
+    Tables come from the shared soccer-rating client's disk-backed cache,
+    which serves stale tables while refreshing them in the background; the
+    home and away pages of a league that has to be scraped are requested
+    concurrently. Copies are returned so pages can modify them freely.
+
     Args:
         country: Country identifier
         league: League identifier
@@ -333,215 +445,42 @@ def fetch_table_data(
     Returns:
         Tuple of (home_rating_table, away_rating_table, league_table) or (None, None, None) on error
     """
-    base_url = f"https://www.soccer-rating.com/{country}/{league}/"
-    home_url = f"{base_url}home/"
-    away_url = f"{base_url}away/"
-    
-    try:
-        response_home = fetch_with_headers(home_url, referer=base_url)
-        soup_home = BeautifulSoup(response_home.text, "lxml")
-
-        response_away = fetch_with_headers(away_url, referer=base_url)
-        soup_away = BeautifulSoup(response_away.text, "lxml")
-
-        home_rating_table = None
-        for table in soup_home.find_all('table', class_='rattab'):
-            header = table.find('th')
-            if header and "Home" in header.get_text():
-                teams_data = []
-                for row in table.find_all('tr')[1:]:
-                    cols = row.find_all('td')
-                    if len(cols) == 5:
-                        team_link = cols[1].find('a')
-                        if team_link and team_link.has_attr('href'):
-                            team_url = team_link['href']
-                            name_from_url = team_url.split('/')[1].replace('-', ' ')
-                            rating = float(cols[4].get_text(strip=True))
-                            teams_data.append({"Team": name_from_url, "Rating": rating, "URL": team_url})
-                home_rating_table = pd.DataFrame(teams_data)
-                break
-        
-        away_rating_table = None
-        for table in soup_away.find_all('table', class_='rattab'):
-            header = table.find('th')
-            if header and "Away" in header.get_text():
-                teams_data = []
-                for row in table.find_all('tr')[1:]:
-                    cols = row.find_all('td')
-                    if len(cols) == 5:
-                        team_link = cols[1].find('a')
-                        if team_link and team_link.has_attr('href'):
-                            team_url = team_link['href']
-                            name_from_url = team_url.split('/')[1].replace('-', ' ')
-                            rating = float(cols[4].get_text(strip=True))
-                            teams_data.append({"Team": name_from_url, "Rating": rating, "URL": team_url})
-                away_rating_table = pd.DataFrame(teams_data)
-                break
-
-        league_table = None
-        all_html_tables = pd.read_html(io.StringIO(str(soup_home)), flavor="lxml")
-        expected_columns = {"M", "P.", "Goals", "Home", "Away"}
-        for candidate in all_html_tables:
-            if expected_columns.issubset(set(candidate.columns.astype(str))):
-                league_table = candidate
-                break
-        
-        return home_rating_table, away_rating_table, league_table
-    except Exception:
-        return None, None, None
+    tables = get_rating_client().fetch_tables(country, league).as_tuple()
+    return tuple(table.copy() if table is not None else None for table in tables)
 
-def find_section_header(soup: BeautifulSoup, header_text: str) -> Optional[Any]:
-    """Finds a table header element by its text.
+def fetch_elo_indexes(country: str, league: str) -> Tuple[Optional[EloTableIndex], Optional[EloTableIndex]]:
+    """Returns team lookup indexes over a league's home and away Elo tables.
 
-    Args:
-        soup: BeautifulSoup object
-        header_text: Text to search for in headers
-
-    Returns:
-        Header element or None
-    """
-    for header in soup.find_all('th'):
-        if header_text in header.get_text():
-            return header
-    return None
-
-def get_correct_table(
-    soup: BeautifulSoup,
-    target_team_name: str,
-    target_team_url: str,
-    header_text: str,
-    table_id_1: str,
-    table_id_2: str,
-) -> Optional[Any]:
-    """Finds the correct data table using a hybrid URL-first, then name-fallback approach.
+    The indexes are built once per scraped table and cached with it, so they
+    are shared by every session; rows they return must not be modified.
 
     Args:
-        soup: BeautifulSoup object
-        target_team_name: Name of the target team
-        target_team_url: URL of the target team
-        header_text: Text to search for in table header
-        table_id_1: ID of the first table
-        table_id_2: ID of the second table
+        country: Country identifier
+        league: League identifier
 
     Returns:
-        Table element or None
+        Tuple of (home_index, away_index) or (None, None) on error
     """
-    header = find_section_header(soup, header_text)
-    if not header: return None 
-    team_name_row = header.find_next('tr')
-    if not team_name_row: return None
-    team_links = team_name_row.find_all('a')
-    normalized_target_url = target_team_url.strip('/')
-    
-    if len(team_links) >= 1 and team_links[0].has_attr('href'):
-        href1 = team_links[0]['href']
-        if not href1.startswith('javascript:'):
-             if href1.strip('/') == normalized_target_url:
-                return soup.find("table", id=table_id_1)
-            
-    if len(team_links) == 2 and team_links[1].has_attr('href'):
-        href2 = team_links[1]['href']
-        if not href2.startswith('javascript:'):
-            if href2.strip('/') == normalized_target_url:
-                return soup.find("table", id=table_id_2)
-
-    normalized_target_name = normalize_team_name(target_team_name)
-    if len(team_links) >= 1:
-        header_team1_raw = team_links[0].get_text(strip=True)
-        header_team1 = re.sub(r'\s*\([^)]*\)', '', header_team1_raw).strip()
-        if normalize_team_name(header_team1) == normalized_target_name:
-            return soup.find("table", id=table_id_1)
-            
-    if len(team_links) == 2:
-        header_team2_raw = team_links[1].get_text(strip=True)
-        header_team2 = re.sub(r'\s*\([^)]*\)', '', header_team2_raw).strip()
-        if normalize_team_name(header_team2) == normalized_target_name:
-            return soup.find("table", id=table_id_2)
-    return None
+    tables = get_rating_client().fetch_tables(country, league)
+    if not tables.ok:
+        return None, None
+    return tables.home_index, tables.away_index
 
-@st.cache_data(ttl=3600)
 def fetch_team_page_data(
-    team_name: str, team_url: str
+    country: str, league: str, team_name: str, team_url: str
 ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[List[Dict[str, Any]]], Optional[Dict[str, Any]]]:
-    """Fetches lineup, squad, and last matches from a single team page visit.
+    """Returns a team's lineup, squad and last matches, scraping the page only on a cache miss.
 
     Args:
+        country: Country identifier
+        league: League identifier
         team_name: Name of the team
         team_url: URL path for the team
 
     Returns:
         Tuple of (lineup_data, squad_data, last_matches_data) or (None, None, None) on error
     """
-    try:
-        url = f"https://www.soccer-rating.com{team_url}"
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "lxml")
-
-        # Parse Lineup
-        lineup_table = get_correct_table(soup, team_name, team_url, 'Expected Lineup', 'line1', 'line2')
-        lineup_data = []
-        if lineup_table:
-            for row in lineup_table.find_all('tr'):
-                cols = row.find_all('td')
-                if len(cols) == 4:
-                    try:
-                        player_div = cols[1].find("div", class_="nomobil")
-                        if not player_div: continue
-                        img_tag = player_div.find('img')
-                        full_text = (img_tag.next_sibling.strip() if img_tag and img_tag.next_sibling else player_div.get_text(strip=True))
-                        match = re.match(r'(.+?)\s*\((.+)\)', full_text)
-                        name, pos = (match.group(1).strip(), match.group(2).strip()) if match else (full_text.strip(), "N/A")
-                        stats = cols[2].get_text(strip=True)
-                        rating = int(cols[3].get_text(strip=True))
-                        lineup_data.append({"name": name, "position": pos, "stats": stats, "rating": rating})
-                    except (ValueError, IndexError): continue
-        
-        # Parse Squad
-        squad_table = get_correct_table(soup, team_name, team_url, 'Squad', 'squad1', 'squad2')
-        squad_data = []
-        if squad_table:
-            for row in squad_table.find_all('tr'):
-                if row.find('th') or row.find('hr'): continue
-                cols = row.find_all('td')
-                if len(cols) == 3:
-                    try:
-                        player_div = cols[0].find("div", class_="nomobil")
-                        if not player_div: continue
-                        img_tag = player_div.find('img')
-                        full_text = (img_tag.next_sibling.strip() if img_tag and img_tag.next_sibling else player_div.get_text(strip=True))
-                        match = re.match(r'(.+?)\s*\((\d+)\)', full_text)
-                        name, age = (match.group(1).strip(), int(match.group(2))) if match else (full_text, "N/A")
-                        rating = int(cols[2].get_text(strip=True))
-                        squad_data.append({"name": name, "age": age, "rating": rating})
-                    except (ValueError, IndexError): continue
-        
-        # Parse Last Matches
-        last_matches_data, points, league_matches_count = [], 0, 0
-        matches_table = soup.find('table', {'class': 'bigtable', 'cellspacing': '0'})
-        if matches_table:
-            for row in matches_table.find_all('tr'):
-                if league_matches_count >= 5: break
-                cols = row.find_all('td')
-                if len(cols) > 9 and "cup" not in cols[7].get_text(strip=True).lower():
-                    date = cols[1].get_text(strip=True, separator=" ").split(" ")[0]
-                    opponent = cols[2].get_text(strip=True)
-                    result = cols[10].get_text(strip=True)
-                    if result:
-                        last_matches_data.append({"date": date, "opponent": opponent, "result": result})
-                        try:
-                            own_score, opp_score = map(int, result.split(':'))
-                            is_home_match = team_name.lower() in opponent.split('-')[0].lower()
-                            if (is_home_match and own_score > opp_score) or (not is_home_match and own_score < opp_score):
-                                points += 3
-                            elif own_score == opp_score:
-                                points += 1
-                        except (ValueError, IndexError): pass
-                        league_matches_count += 1
-
-        return lineup_data, squad_data, {"matches": last_matches_data, "points": points}
-    except Exception:
-        return None, None, None
+    return get_rating_client().team_page(country, league, team_name, team_url).as_tuple()
 
 # --- Statistical & Odds Calculation Functions ---
 
@@ -682,6 +621,42 @@ def calculate_outcome_probabilities(
     return p_home / total, p_draw / total, p_away / total
 
 
+def cached_outcome_probabilities(
+    home_rating: float,
+    away_rating: float,
+    base_draw_prob: float,
+    avg_goals: float,
+    draw_weight: float = config.DRAW_OBS_WEIGHT,
+) -> Tuple[float, float, float]:
+    """Memoized ``calculate_outcome_probabilities`` using the shared pricing cache.
+
+    The model only depends on the ratings through their difference, so the
+    cache key is the quantized (rating_diff, draw rate, average goals, weight).
+
+    Args:
+        home_rating: Home team Elo rating
+        away_rating: Away team Elo rating
+        base_draw_prob: Base draw probability from league statistics
+        avg_goals: Average goals per match
+        draw_weight: Weight for blending observed draw rate
+
+    Returns:
+        Tuple of (p_home, p_draw, p_away)
+    """
+    cache = get_pricing_cache()
+    key = cache.make_key(
+        "outcome",
+        safe_float(home_rating, 0) - safe_float(away_rating, 0),
+        safe_float(base_draw_prob, config.DEFAULT_DRAW_RATE),
+        safe_float(avg_goals, config.DEFAULT_AVG_GOALS),
+        draw_weight,
+    )
+    return cache.get_or_compute(
+        key,
+        lambda: calculate_outcome_probabilities(home_rating, away_rating, base_draw_prob, avg_goals, draw_weight),
+    )
+
+
 def apply_margin(probabilities: List[float], margin_percent: float) -> List[float]:
     """Applies a bookmaker's margin to a list of probabilities using proportional scaling.
 
@@ -709,8 +684,90 @@ def apply_margin(probabilities: List[float], margin_percent: float) -> List[floa
     return [1 / p if p > 0 else 0 for p in adjusted_probs]
 
 
+def ladder_to_dataframe(
+    ladder: Dict[float, Dict[str, float]], first: str, second: str, margin_percent: float
+) -> pd.DataFrame:
+    """Tabulates a two-way line ladder with margin-applied odds.
+
+    Line odds already account for pushes, so their inverses are the effective
+    probabilities that the margin is spread over.
+
+    Args:
+        ladder: Mapping of line to probabilities and fair odds (from ``project_markets``)
+        first: Key prefix of the first side (e.g. ``"over"`` or ``"home"``)
+        second: Key prefix of the second side (e.g. ``"under"`` or ``"away"``)
+        margin_percent: Margin percentage to apply
+
+    Returns:
+        DataFrame with one row per line
+    """
+    rows = []
+    for line, market in ladder.items():
+        effective = [
+            1 / market[f"{side}_odds"] if market[f"{side}_odds"] != float("inf") else 0.0
+            for side in (first, second)
+        ]
+        first_odds, second_odds = apply_margin(effective, margin_percent)
+        rows.append({
+            "Line": f"{line:+g}" if first == "home" else f"{line:g}",
+            f"{first.title()} %": f"{market[f'{first}_prob']:.1%}",
+            "Push %": f"{market['push_prob']:.1%}",
+            f"{second.title()} %": f"{market[f'{second}_prob']:.1%}",
+            f"{first.title()} Odds": round(first_odds, 2),
+            f"{second.title()} Odds": round(second_odds, 2),
+        })
+    return pd.DataFrame(rows)
+
+
 # --- UI Display Functions ---
 
+def display_market_ladder(ladder: Dict[str, Any], home_team: str, away_team: str, margin_percent: float) -> None:
+    """Displays the full market ladder priced from the score matrix.
+
+    Args:
+        ladder: Output of ``odds.project_markets``
+        home_team: Home team display name
+        away_team: Away team display name
+        margin_percent: Margin percentage to apply
+    """
+    target_overround = 1 + (margin_percent / 100.0)
+    totals_tab, handicap_tab, team_tab, other_tab = st.tabs(
+        ["Over/Under", "Asian Handicap", "Team Totals", "Double Chance & Correct Score"]
+    )
+
+    with totals_tab:
+        st.dataframe(ladder_to_dataframe(ladder["totals"], "over", "under", margin_percent), hide_index=True, use_container_width=True)
+
+    with handicap_tab:
+        st.caption(f"Lines are from {home_team}'s perspective")
+        st.dataframe(ladder_to_dataframe(ladder["asian_handicap"], "home", "away", margin_percent), hide_index=True, use_container_width=True)
+
+    with team_tab:
+        team_cols = st.columns(2)
+        for col, side, name in ((team_cols[0], "home", home_team), (team_cols[1], "away", away_team)):
+            col.markdown(f"**{name}**")
+            col.dataframe(ladder_to_dataframe(ladder["team_totals"][side], "over", "under", margin_percent), hide_index=True, use_container_width=True)
+
+    with other_tab:
+        double_chance = ladder["double_chance"]
+        dc_cols = st.columns(3)
+        for col, key, label in ((dc_cols[0], "home_draw", "1X"), (dc_cols[1], "draw_away", "X2"), (dc_cols[2], "home_away", "12")):
+            prob = double_chance[f"{key}_prob"]
+            odds_value = 1 / (prob * target_overround) if prob > 0 else 0.0
+            col.markdown(f"<div class='card'><div class='card-title'>{label}</div><div class='card-value'>{odds_value:.2f}</div></div>", unsafe_allow_html=True)
+
+        scores = {score: prob for score, prob in ladder["correct_score"].items() if score != "other"}
+        size = max(int(score.split("-")[0]) for score in scores) + 1
+        grid = pd.DataFrame(
+            [[f"{scores[f'{home}-{away}']:.1%}" for away in range(size)] for home in range(size)],
+            index=[f"{home_team} {home}" for home in range(size)],
+            columns=[f"{away_team} {away}" for away in range(size)],
+        )
+        st.markdown("**Correct Score**")
+        st.dataframe(grid, use_container_width=True)
+        st.caption(f"Any other score: {ladder['correct_score']['other']:.1%}")
+
+
 def display_league_stats(stats_row: Optional[Dict[str, Any]]) -> None:
     """Renders the soccerstats data in a compact, multi-column format.
 
@@ -918,17 +975,22 @@ def fetch_data_for_selection(country: str, league: str) -> None:
             home_table, away_table, league_table = fetch_table_data(country, league)
             
             if isinstance(home_table, pd.DataFrame) and not home_table.empty:
+                home_index, away_index = fetch_elo_indexes(country, league)
                 st.session_state.update({
                     "home_table": home_table,
                     "away_table": away_table,
                     "league_table": league_table,
+                    "home_index": home_index,
+                    "away_index": away_index,
                     "data_fetched": True,
                     "last_refresh": time.time()
                 })
                 # Clear old team-specific data
                 for key in ['home_lineup', 'away_lineup', 'home_squad', 'away_squad', 
-                           'home_matches', 'away_matches', 'last_home_team', 'last_away_team']: 
+                           'home_matches', 'away_matches']: 
                     st.session_state.pop(key, None)
+                # Scrape every team page of the league in the background so team selection is instant
+                get_rating_client().prefetch_team_pages(country, league, zip(home_table["Team"], home_table["URL"]))
                 st.success(f"✅ Loaded {country} - {league}")
             else:
                 st.session_state['data_fetched'] = False
@@ -942,6 +1004,14 @@ selected_league = st.sidebar.selectbox("Select League:", league_list, key="leagu
 # Fetch data on selection change
 fetch_data_for_selection(selected_country, selected_league)
 
+with st.sidebar.expander("⚡ Prefetch Ratings"):
+    st.caption("Scrape every league's rating tables in the background so switching leagues is instant.")
+    if st.button("Prefetch all leagues", key="prefetch_leagues"):
+        with st.spinner("Scraping all leagues from soccer-rating.com..."):
+            display_prefetch_report(get_rating_client().prefetch_leagues())
+            # Let the next deploy start from these tables instead of a cold scrape
+            get_table_cache().write_snapshot(config.RATING_TABLE_SNAPSHOT)
+
 
 # --- Main Content Area: Top-Level Tabs ---
 main_tab1, main_tab2 = st.tabs(["🗺️ All Matches & Mapping", "📊 League Analysis"])
@@ -956,10 +1026,10 @@ with main_tab1:
     Map both teams and leagues to your ELO ratings database with inline suggestions.
     """)
 
-    # Fetch all matches
-    with st.spinner("Fetching all football matches from Kambi..."):
-        kambi = KambiClient()
-        all_kambi_matches = kambi.get_all_football_matches()
+    # Read all matches from the background poller's snapshot
+    odds_snapshot = get_odds_snapshot()
+    display_snapshot_status(odds_snapshot, key="refresh_odds_all_matches")
+    all_kambi_matches = odds_snapshot.matches_for(include_live=False) if odds_snapshot else []
 
     if not all_kambi_matches:
         st.warning("⚠️ No matches found. The Kambi API may be unavailable or there are no upcoming matches.")
@@ -997,20 +1067,25 @@ with main_tab1:
 
             # Process matches
             displayed_matches = []
-            for match in all_kambi_matches[:match_limit * 2]:  # Process more than limit to account for filtering
+            candidate_matches = all_kambi_matches[:match_limit * 2]  # Process more than limit to account for filtering
+            team_suggestions = mapping_service.suggest_mappings(
+                [team for m in candidate_matches for team in (m.home_team, m.away_team)],
+                team_list_for_suggestions
+            ) if team_list_for_suggestions else {}
+            for match in candidate_matches:
                 home_mapped = mapping_service.get_mapping(match.home_team, match.league)
                 away_mapped = mapping_service.get_mapping(match.away_team, match.league)
                 league_mapped = mapping_service.get_league_mapping(match.league)
 
                 # Get suggestions
                 home_sugg = away_sugg = league_sugg = None
-                if not home_mapped and team_list_for_suggestions:
-                    result = mapping_service.suggest_mapping(match.home_team, team_list_for_suggestions, False, match.league)
+                if not home_mapped:
+                    result = team_suggestions.get(match.home_team)
                     if result:
                         home_sugg = f"{result[0]} ({result[1]:.0f}%)"
 
-                if not away_mapped and team_list_for_suggestions:
-                    result = mapping_service.suggest_mapping(match.away_team, team_list_for_suggestions, False, match.league)
+                if not away_mapped:
+                    result = team_suggestions.get(match.away_team)
                     if result:
                         away_sugg = f"{result[0]} ({result[1]:.0f}%)"
 
@@ -1169,19 +1244,12 @@ with main_tab2:
                 away_team_data = away_table[away_table["Team"] == away_team_name].iloc[0]
 
             # --- Team-Specific Data Fetching ---
-            home_needs_fetch = 'last_home_team' not in st.session_state or st.session_state.last_home_team != home_team_name
-            away_needs_fetch = 'last_away_team' not in st.session_state or st.session_state.last_away_team != away_team_name
-
-            if home_needs_fetch or away_needs_fetch:
-                with st.spinner("Fetching team data..."):
-                    if home_needs_fetch:
-                        lineup, squad, matches = fetch_team_page_data(home_team_name, home_team_data['URL'])
-                        st.session_state.update({'home_lineup': lineup, 'home_squad': squad, 'home_matches': matches, 'last_home_team': home_team_name})
-                    
-                    if away_needs_fetch:
-                        lineup, squad, matches = fetch_team_page_data(away_team_name, away_team_data['URL'])
-                        st.session_state.update({'away_lineup': lineup, 'away_squad': squad, 'away_matches': matches, 'last_away_team': away_team_name})
-                st.rerun()
+            # Served from the league's team-page cache; the spinner only shows if a page must be scraped now
+            with st.spinner("Fetching team data..."):
+                lineup, squad, matches = fetch_team_page_data(selected_country, selected_league, home_team_name, home_team_data['URL'])
+                st.session_state.update({'home_lineup': lineup, 'home_squad': squad, 'home_matches': matches})
+                lineup, squad, matches = fetch_team_page_data(selected_country, selected_league, away_team_name, away_team_data['URL'])
+                st.session_state.update({'away_lineup': lineup, 'away_squad': squad, 'away_matches': matches})
 
             # --- Analysis Expanders ---
             with st.expander("📊 Team Statistics", expanded=False):
@@ -1204,7 +1272,7 @@ with main_tab2:
                 margin = st.slider("Apply Bookmaker's Margin (%):", 0.0, 15.0, 5.0, 0.5, format="%.1f%%", key="single_margin")
 
             # --- Calculations for Single Match ---
-            p_home, p_draw, p_away = calculate_outcome_probabilities(
+            p_home, p_draw, p_away = cached_outcome_probabilities(
                 home_rating,
                 away_rating,
                 league_avg_draw,
@@ -1217,10 +1285,11 @@ with main_tab2:
             fair_dnb_home_odds = 1 / max(p_dnb_home, min_prob)
             fair_dnb_away_odds = 1 / max(p_dnb_away, min_prob)
 
-            poisson_markets = calculate_poisson_markets_from_dnb(
+            poisson_markets = cached_poisson_markets_from_dnb(
                 fair_dnb_home_odds,
                 fair_dnb_away_odds,
                 league_avg_goals,
+                include_ladder=True,
             )
 
             poisson_probs = poisson_markets["probabilities"]
@@ -1295,19 +1364,21 @@ with main_tab2:
                 btts_card_cols[0].markdown(f"<div class='card'><div class='card-title'>BTTS - Yes</div><div class='card-value'>{btts_yes_odds:.2f}</div></div>", unsafe_allow_html=True)
                 btts_card_cols[1].markdown(f"<div class='card'><div class='card-title'>BTTS - No</div><div class='card-value'>{btts_no_odds:.2f}</div></div>", unsafe_allow_html=True)
 
+            with st.expander("📈 Market Ladder", expanded=False):
+                display_market_ladder(poisson_markets["ladder"], home_team_name, away_team_name, margin)
+
             # --- Bookmaker Odds Comparison & EV ---
             with st.expander("💰 Bookmaker Odds & Expected Value (EV)", expanded=True):
                 st.markdown("**Live Bookmaker Odds from Kambi**")
 
                 # Try to fetch odds from Kambi
-                kambi = get_kambi_client()
-
-                with st.spinner("Fetching live bookmaker odds..."):
-                    kambi_match = kambi.find_match(
-                        home_team_name,
-                        away_team_name,
-                        league=selected_league
-                    )
+                # Look up the match in the poller's pre-indexed snapshot
+                odds_snapshot = get_odds_snapshot()
+                kambi_match = odds_snapshot.index.find(
+                    home_team_name,
+                    away_team_name,
+                    league=selected_league
+                ) if odds_snapshot else None
 
                 if kambi_match and kambi_match.has_odds:
                     # Display bookmaker info
@@ -1452,7 +1523,8 @@ with main_tab2:
 
                 # If no matches found, try getting all matches and filter
                 if not kambi_matches:
-                    all_matches = kambi.get_all_football_matches(include_live=include_live)
+                    odds_snapshot = get_odds_snapshot()
+                    all_matches = odds_snapshot.matches_for(include_live) if odds_snapshot else []
                     # Filter by league/country
                     kambi_matches = [
                         m for m in all_matches
@@ -1472,10 +1544,31 @@ with main_tab2:
 
                 # Process each match - store ALL matches with status indicators
                 match_data_list = []
+                pending_pricing = []  # (index in match_data_list, home rating, away rating)
                 matched_count = 0
                 no_odds_count = 0
                 no_elo_count = 0
 
+                # Resolve every team in the slate against the Elo tables in bulk
+                priced_matches = [m for m in kambi_matches if m.has_odds]
+                resolution_error = None
+                try:
+                    home_index = st.session_state.get("home_index")
+                    away_index = st.session_state.get("away_index")
+                    home_resolved = match_teams_with_elo(
+                        [m.home_team for m in priced_matches],
+                        home_index if home_index is not None else home_table,
+                        league_name=selected_league,
+                    )
+                    away_resolved = match_teams_with_elo(
+                        [m.away_team for m in priced_matches],
+                        away_index if away_index is not None else away_table,
+                        league_name=selected_league,
+                    )
+                except Exception as e:
+                    resolution_error = e
+                    logger.error(f"Failed to resolve teams for {selected_league}: {e}", exc_info=True)
+
                 for kambi_match in kambi_matches:
                     match_status = "matched"  # Default status
                     status_reason = None
@@ -1491,17 +1584,11 @@ with main_tab2:
                         no_odds_count += 1
                     else:
                         try:
-                            # Find matching teams in Elo ratings using new helper
-                            home_match, home_suggestion = match_team_with_elo(
-                                kambi_match.home_team,
-                                home_table,
-                                league_name=selected_league
-                            )
-                            away_match, away_suggestion = match_team_with_elo(
-                                kambi_match.away_team,
-                                away_table,
-                                league_name=selected_league
-                            )
+                            if resolution_error is not None:
+                                raise resolution_error
+                            # Look up the bulk-resolved Elo teams
+                            home_match, home_suggestion = home_resolved[kambi_match.home_team]
+                            away_match, away_suggestion = away_resolved[kambi_match.away_team]
 
                             # Store suggestions for later display
                             suggestions = {}
@@ -1529,55 +1616,12 @@ with main_tab2:
                                 status_reason = "Need team mapping: " + ", ".join(missing_info)
                                 no_elo_count += 1
                             else:
-                                # Successfully matched both teams - calculate EV
-                                home_rating = home_match['Rating']
-                                away_rating = away_match['Rating']
-
-                                # Calculate Elo probabilities
-                                p_h, p_draw, p_a = calculate_outcome_probabilities(
-                                    home_rating,
-                                    away_rating,
-                                    league_avg_draw,
-                                    league_avg_goals,
-                                )
-
-                                p_dnb_home = p_h / (p_h + p_a) if (p_h + p_a) > 0 else 0.5
-                                p_dnb_away = 1 - p_dnb_home
-                                min_prob = 1e-6
-                                fair_dnb_home = 1 / max(p_dnb_home, min_prob)
-                                fair_dnb_away = 1 / max(p_dnb_away, min_prob)
-
-                                poisson_markets = calculate_poisson_markets_from_dnb(
-                                    fair_dnb_home,
-                                    fair_dnb_away,
-                                    league_avg_goals,
-                                )
-                                poisson_probs = poisson_markets["probabilities"]
-
-                                # Calculate EV
-                                elo_probs = {
-                                    'home': poisson_probs['home'],
-                                    'draw': poisson_probs['draw'],
-                                    'away': poisson_probs['away']
-                                }
-
-                                bookmaker_odds_dict = {
-                                    'home': kambi_match.odds_home,
-                                    'draw': kambi_match.odds_draw,
-                                    'away': kambi_match.odds_away
-                                }
-
-                                ev_analysis = analyze_match_ev(elo_probs, bookmaker_odds_dict)
-
-                                # Get best EV value (could be negative)
-                                best_ev_value = max(
-                                    ev_analysis.home_ev.expected_value,
-                                    ev_analysis.draw_ev.expected_value,
-                                    ev_analysis.away_ev.expected_value
-                                )
-
-                                match_status = "matched"
-                                matched_count += 1
+                                # Successfully matched both teams - price in one batch below
+                                pending_pricing.append((
+                                    len(match_data_list),
+                                    home_match['Rating'],
+                                    away_match['Rating'],
+                                ))
 
                         except Exception as e:
                             match_status = "error"
@@ -1595,6 +1639,60 @@ with main_tab2:
                         'suggestions': suggestions  # Include fuzzy match suggestions
                     })
 
+                # Price every matched fixture in one vectorized call
+                if pending_pricing:
+                    try:
+                        batch = price_fixtures_batch(
+                            [home for _, home, _ in pending_pricing],
+                            [away for _, _, away in pending_pricing],
+                            league_avg_draw,
+                            league_avg_goals,
+                            matrix_free=True,
+                            cache=get_pricing_cache(),
+                        )
+                    except Exception as e:
+                        logger.error(f"Batch pricing failed for {len(pending_pricing)} matches: {e}", exc_info=True)
+                        for list_idx, _, _ in pending_pricing:
+                            match_data_list[list_idx].update({'status': 'error', 'status_reason': f"Error: {str(e)}"})
+                    else:
+                        cache_stats = get_pricing_cache().stats()
+                        logger.debug(
+                            f"Pricing cache: {cache_stats.hits} hits, {cache_stats.misses} misses "
+                            f"({cache_stats.hit_rate:.0%}), {cache_stats.size}/{cache_stats.maxsize} entries"
+                        )
+                        for batch_idx, (list_idx, _, _) in enumerate(pending_pricing):
+                            match_data = match_data_list[list_idx]
+                            kambi_match = match_data['match']
+
+                            elo_probs = {
+                                'home': float(batch.home[batch_idx]),
+                                'draw': float(batch.draw[batch_idx]),
+                                'away': float(batch.away[batch_idx])
+                            }
+
+                            bookmaker_odds_dict = {
+                                'home': kambi_match.odds_home,
+                                'draw': kambi_match.odds_draw,
+                                'away': kambi_match.odds_away
+                            }
+
+                            ev_analysis = analyze_match_ev(elo_probs, bookmaker_odds_dict)
+
+                            # Get best EV value (could be negative)
+                            best_ev_value = max(
+                                ev_analysis.home_ev.expected_value,
+                                ev_analysis.draw_ev.expected_value,
+                                ev_analysis.away_ev.expected_value
+                            )
+
+                            match_data.update({
+                                'status': 'matched',
+                                'elo_probs': elo_probs,
+                                'ev_analysis': ev_analysis,
+                                'best_ev': best_ev_value
+                            })
+                            matched_count += 1
+
                 # Display summary statistics
                 st.markdown("### 📊 Match Processing Summary")
                 summary_col1, summary_col2, summary_col3, summary_col4 = st.columns(4)
@@ -1945,29 +2043,38 @@ with main_tab2:
                 col_exp1, col_exp2 = st.columns(2)
 
                 with col_exp1:
-                    if st.button("📥 Export All Mappings (JSON)", key="export_mappings"):
-                        export_data = mapping_service.export_mappings()
-                        json_str = json.dumps(export_data, indent=2)
+                    export_format = st.selectbox(
+                        "Export format",
+                        ["jsonl", "csv"],
+                        format_func=lambda fmt: {"jsonl": "JSON Lines", "csv": "CSV"}[fmt],
+                        key="export_mappings_format"
+                    )
+                    if st.button("📥 Export All Mappings", key="export_mappings"):
+                        buffer = io.StringIO()
+                        mapping_service.write_mappings(buffer, export_format)
                         st.download_button(
-                            label="⬇️ Download JSON",
-                            data=json_str,
-                            file_name="team_mappings.json",
-                            mime="application/json"
+                            label=f"⬇️ Download {export_format.upper()}",
+                            data=buffer.getvalue(),
+                            file_name=f"team_mappings.{export_format}",
+                            mime="text/csv" if export_format == "csv" else "application/x-ndjson"
                         )
 
                 with col_exp2:
                     uploaded_file = st.file_uploader(
-                        "📤 Import Mappings (JSON)",
-                        type=['json'],
+                        "📤 Import Mappings (JSON, JSON Lines or CSV)",
+                        type=['json', 'jsonl', 'csv'],
                         key="import_mappings"
                     )
-                    if uploaded_file is not None:
+                    if uploaded_file is not None and st.button("📤 Import Mappings", key="import_mappings_button"):
                         try:
-                            import_data = json.load(uploaded_file)
-                            mapping_service.import_mappings(import_data)
-                            st.success(f"✅ Imported {len(import_data)} mappings")
-                            st.rerun()
-                        except Exception as e:
+                            report = mapping_service.import_mappings(
+                                read_mapping_rows(
+                                    io.TextIOWrapper(uploaded_file, encoding="utf-8", newline=""),
+                                    Path(uploaded_file.name).suffix.lstrip(".").lower()
+                                )
+                            )
+                            display_import_report(report)
+                        except (ValueError, KeyError, TypeError) as e:
                             st.error(f"❌ Failed to import: {e}")
 
             else:
@@ -2059,10 +2166,10 @@ with main_tab2:
             Accept suggestions or create custom mappings.
             """)
 
-            # Fetch all matches
-            with st.spinner("Fetching all football matches..."):
-                kambi = KambiClient()
-                all_matches = kambi.get_all_football_matches()
+            # Read all matches from the background poller's snapshot
+            odds_snapshot = get_odds_snapshot()
+            display_snapshot_status(odds_snapshot, key="refresh_odds_mapping")
+            all_matches = odds_snapshot.matches_for(include_live=False) if odds_snapshot else []
 
             if not all_matches:
                 st.warning("⚠️ No matches found. Please try again later.")
@@ -2091,6 +2198,10 @@ with main_tab2:
 
                     # Process matches and create display data
                     matches_data = []
+                    team_suggestions = mapping_service.suggest_mappings(
+                        [team for m in all_matches for team in (m.home_team, m.away_team)],
+                        team_list
+                    ) if team_list else {}
                     for match in all_matches:
                         # Check team mappings
                         home_mapped = mapping_service.get_mapping(match.home_team, match.league)
@@ -2104,13 +2215,13 @@ with main_tab2:
                         away_suggestion = None
                         league_suggestion = None
 
-                        if not home_mapped and team_list:
-                            home_sugg = mapping_service.suggest_mapping(match.home_team, team_list, auto_save=False, league_filter=match.league)
+                        if not home_mapped:
+                            home_sugg = team_suggestions.get(match.home_team)
                             if home_sugg:
                                 home_suggestion = f"{home_sugg[0]} ({home_sugg[1]}%)"
 
-                        if not away_mapped and team_list:
-                            away_sugg = mapping_service.suggest_mapping(match.away_team, team_list, auto_save=False, league_filter=match.league)
+                        if not away_mapped:
+                            away_sugg = team_suggestions.get(match.away_team)
                             if away_sugg:
                                 away_suggestion = f"{away_sugg[0]} ({away_sugg[1]}%)"
 
@@ -2290,9 +2401,7 @@ with main_tab2:
                             if uploaded_file:
                                 import_data = json.load(uploaded_file)
                                 if st.button("📤 Import League Mappings"):
-                                    mapping_service.import_league_mappings(import_data)
-                                    st.success(f"✅ Imported {len(import_data)} league mappings")
-                                    st.rerun()
+                                    display_import_report(mapping_service.import_league_mappings(import_data))
                     else:
                         st.info("No league mappings yet. Start mapping leagues from the 'All Matches' tab.")
 
@@ -44,6 +44,49 @@ ELO_GOAL_SCALE_FACTOR = 0.35
 ELO_GOAL_SCALE_DIVISOR = 400
 ELO_GOAL_SCALE_CAP = 0.6
 
+# Pricing cache: bounded LRU over pricing inputs, which are rounded to
+# PRICING_CACHE_PRECISION decimals before being used as cache keys.
+PRICING_CACHE_SIZE = 4096
+PRICING_CACHE_PRECISION = 4
+
+# Kambi HTTP cache: parsed listView payloads with their ETag/Last-Modified
+# validators, persisted so Streamlit reruns can revalidate instead of refetch.
+KAMBI_HTTP_CACHE_DIR = DATA_DIR / "kambi_http_cache"
+
+# Background odds poller: seconds between Kambi polls, relative random jitter
+# applied to each interval, and how long a page waits for the first snapshot.
+ODDS_POLL_INTERVAL = 60
+ODDS_POLL_JITTER = 0.1
+ODDS_SNAPSHOT_WAIT = 20
+
+# Kambi request resilience: attempts per request with exponential backoff and
+# full jitter (base doubling per retry, capped), a total time budget per
+# request, and a per-endpoint circuit breaker that opens after consecutive
+# failures and allows a trial request after the reset timeout.
+KAMBI_RETRY_ATTEMPTS = 3
+KAMBI_BACKOFF_BASE = 0.5
+KAMBI_BACKOFF_MAX = 4.0
+KAMBI_REQUEST_BUDGET = 20.0
+KAMBI_BREAKER_THRESHOLD = 5
+KAMBI_BREAKER_RESET = 30.0
+
+# soccer-rating.com scraper: HTTP connection pool size (and page fetches in
+# flight), sustained requests per second per host with the burst allowed
+# after an idle period, and request timeout.
+SOCCER_RATING_MAX_CONNECTIONS = 8
+SOCCER_RATING_RATE_LIMIT = 4.0
+SOCCER_RATING_BURST = 4
+SOCCER_RATING_TIMEOUT = 15
+
+# Scraped rating tables: seconds they count as fresh, seconds past which
+# stale tables are refetched before use instead of being served while a
+# background refresh runs, the on-disk cache, and the snapshot file used to
+# warm an empty cache on a new deploy.
+RATING_TABLE_TTL = 3600
+RATING_TABLE_MAX_STALE = 7 * 24 * 3600
+RATING_TABLE_CACHE_DIR = DATA_DIR / "rating_tables"
+RATING_TABLE_SNAPSHOT = DATA_DIR / "rating_tables_snapshot.pkl.gz"
+
 # League Mapping ("Rosetta Stone")
 # Maps (country_key, league_code) from leagues_data to the string key in the loaded stats
 LEAGUE_STATS_MAP: Dict[Tuple[str, str], str] = {
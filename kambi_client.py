@@ -1,16 +1,135 @@
 """Kambi API client for fetching bookmaker odds."""
 
+import codecs
+import hashlib
+import json
 import logging
-from dataclasses import dataclass
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
 
+import numpy as np
 import requests
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
+from requests.adapters import HTTPAdapter
+
+import config
+from football_elo_odds.errors import ExternalServiceError
 
 logger = logging.getLogger(__name__)
 
 
+_JSON_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """
+    Incrementally yield the items of a top-level array in a streamed JSON object.
+
+    Only the current item and the undecoded tail of the stream are held in
+    memory, so items can be processed while the body is still downloading.
+    Other top-level values are decoded and discarded.
+
+    Args:
+        chunks: UTF-8 encoded body chunks (e.g. ``response.iter_content()``)
+        key: Name of the top-level array to stream (e.g. ``"events"``)
+
+    Yields:
+        Each decoded array item, in order
+
+    Raises:
+        ValueError: If the stream is not a JSON object or ends early
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    exhausted = False
+
+    def fill() -> bool:
+        """Append the next chunk to the unconsumed buffer; False at end of stream."""
+        nonlocal buffer, pos, exhausted
+        if exhausted:
+            return False
+        for chunk in chunks:
+            text = text_decoder.decode(chunk)
+            if text:
+                buffer = buffer[pos:] + text
+                pos = 0
+                return True
+        buffer = buffer[pos:] + text_decoder.decode(b"", final=True)
+        pos = 0
+        exhausted = True
+        return True
+
+    def peek() -> str:
+        """Skip whitespace and return the next character."""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _JSON_WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(char: str) -> None:
+        nonlocal pos
+        found = peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON stream, found '{found}'")
+        pos += 1
+
+    def decode() -> Any:
+        """Decode the next complete value, reading more data until it is available."""
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if not fill():
+                    raise ValueError("Truncated or invalid JSON stream")
+                continue
+            # A number at the very end of the buffer may continue in the next chunk.
+            if end < len(buffer) or exhausted:
+                pos = end
+                return value
+            fill()
+
+    expect("{")
+    while True:
+        char = peek()
+        if char == "}":
+            return
+        if char == ",":
+            pos += 1
+            continue
+        name = decode()
+        expect(":")
+        if name == key:
+            break
+        decode()
+
+    expect("[")
+    while True:
+        char = peek()
+        if char == "]":
+            return
+        if char == ",":
+            pos += 1
+            continue
+        yield decode()
+
+
 @dataclass
 class KambiMatch:
     """Represents a match from Kambi API."""
@@ -44,6 +163,472 @@ class KambiMatch:
         return (implied_probs - 1) * 100
 
 
+@dataclass
+class LeagueFetchResult:
+    """Outcome of fetching one league from Kambi."""
+
+    country: str
+    league: str
+    matches: List[KambiMatch] = field(default_factory=list)
+    latency: float = 0.0  # Seconds spent on the request and parsing
+    error: Optional[str] = None  # Failure description, None on success
+
+    @property
+    def ok(self) -> bool:
+        """Check if the league was fetched without errors."""
+        return self.error is None
+
+
+@dataclass
+class SnapshotDiff:
+    """Per-event differences between two successive Kambi snapshots."""
+
+    added: List[KambiMatch] = field(default_factory=list)  # New event_ids
+    changed: List[KambiMatch] = field(default_factory=list)  # New 1X2 odds or state
+    removed: List[KambiMatch] = field(default_factory=list)  # Previous versions of dropped events
+
+
+def _price_state(
+    match: KambiMatch,
+) -> Tuple[Optional[float], Optional[float], Optional[float], str]:
+    return (match.odds_home, match.odds_draw, match.odds_away, match.state)
+
+
+def diff_snapshots(
+    previous: Iterable[KambiMatch], current: Iterable[KambiMatch]
+) -> SnapshotDiff:
+    """
+    Compare two snapshots by event_id on 1X2 odds and match state.
+
+    Args:
+        previous: Matches from the earlier fetch (empty for the first poll)
+        current: Matches from the latest fetch
+
+    Returns:
+        SnapshotDiff with added and changed events in current order and
+        removed events in previous order
+    """
+    previous_by_id = {match.event_id: match for match in previous}
+    current_by_id = {match.event_id: match for match in current}
+
+    diff = SnapshotDiff()
+    for event_id, match in current_by_id.items():
+        old = previous_by_id.get(event_id)
+        if old is None:
+            diff.added.append(match)
+        elif _price_state(old) != _price_state(match):
+            diff.changed.append(match)
+    diff.removed = [
+        match for event_id, match in previous_by_id.items() if event_id not in current_by_id
+    ]
+    return diff
+
+
+@dataclass
+class HttpCacheEntry:
+    """Parsed listView payload for one URL plus its HTTP validators."""
+
+    url: str
+    matches: List[KambiMatch]  # Parsed with live matches included
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    expires_at: float = 0.0  # Wall-clock time until which no request is needed
+
+    @property
+    def is_fresh(self) -> bool:
+        """Check if the entry can be served without contacting the server."""
+        return time.time() < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for revalidation."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class HttpCacheStats:
+    """Counters describing how listView requests were served."""
+
+    hits: int = 0  # Served from a fresh entry, no request sent
+    revalidations: int = 0  # Conditional request answered with 304
+    misses: int = 0  # Full download and parse
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups that avoided downloading the payload."""
+        total = self.hits + self.revalidations + self.misses
+        return (self.hits + self.revalidations) / total if total else 0.0
+
+
+def _header(headers: Mapping, name: str) -> Optional[str]:
+    """Read a response header, ignoring missing or non-string values."""
+    value = headers.get(name)
+    return value if isinstance(value, str) and value else None
+
+
+def _freshness_lifetime(headers: Mapping) -> Optional[float]:
+    """
+    Derive how long a response may be served without revalidation.
+
+    Returns:
+        Lifetime in seconds from Cache-Control max-age (0 when absent or
+        ``no-cache``), or None if the response must not be stored (``no-store``)
+    """
+    cache_control = _header(headers, "Cache-Control")
+    if cache_control is None:
+        return 0.0
+
+    lifetime = 0.0
+    for directive in cache_control.lower().split(","):
+        name, _, value = directive.strip().partition("=")
+        if name == "no-store":
+            return None
+        if name == "no-cache":
+            return 0.0
+        if name == "max-age":
+            try:
+                lifetime = max(float(value.strip('"')), 0.0)
+            except ValueError:
+                lifetime = 0.0
+    return lifetime
+
+
+def _match_to_dict(match: KambiMatch) -> Dict[str, Any]:
+    data = asdict(match)
+    for key in ("start_time", "odds_timestamp"):
+        if data[key] is not None:
+            data[key] = data[key].isoformat()
+    return data
+
+
+def _match_from_dict(data: Dict[str, Any]) -> KambiMatch:
+    data = dict(data)
+    for key in ("start_time", "odds_timestamp"):
+        if data.get(key) is not None:
+            data[key] = datetime.fromisoformat(data[key])
+    return KambiMatch(**data)
+
+
+class HttpCache:
+    """
+    Per-request cache of parsed Kambi payloads driven by HTTP caching headers.
+
+    Entries are keyed by the full request URL including its query string
+    (see KambiClient._cache_key), so clients with different markets or
+    languages never share payloads.
+
+    Entries are kept in memory and, when ``cache_dir`` is given, mirrored to
+    one JSON file per URL so they survive new clients and app restarts.
+    Thread-safe, so it can be shared by concurrent league fetches.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for the on-disk store (default: memory only)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._entries: Dict[str, HttpCacheEntry] = {}
+        self._lock = threading.Lock()
+        self._stats = HttpCacheStats()
+
+    def get(self, url: str) -> Optional[HttpCacheEntry]:
+        """Return the entry for a URL, loading it from disk if necessary."""
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None and self.cache_dir is not None:
+            entry = self._load(url)
+            if entry is not None:
+                with self._lock:
+                    entry = self._entries.setdefault(url, entry)
+        return entry
+
+    def store(self, url: str, matches: List[KambiMatch], headers: Mapping) -> None:
+        """Record a full download, caching it if the response allows reuse."""
+        lifetime = _freshness_lifetime(headers)
+        etag = _header(headers, "ETag")
+        last_modified = _header(headers, "Last-Modified")
+
+        if lifetime is None or not (lifetime or etag or last_modified):
+            with self._lock:
+                self._stats.misses += 1
+                self._entries.pop(url, None)
+            self._remove(url)  # A restart must not serve it from disk either
+            return
+
+        entry = HttpCacheEntry(
+            url=url,
+            matches=matches,
+            etag=etag,
+            last_modified=last_modified,
+            expires_at=time.time() + lifetime,
+        )
+        with self._lock:
+            self._stats.misses += 1
+            self._entries[url] = entry
+        self._save(entry)
+
+    def revalidated(self, entry: HttpCacheEntry, headers: Mapping) -> None:
+        """Refresh an entry after a 304 Not Modified response."""
+        lifetime = _freshness_lifetime(headers) or 0.0
+        with self._lock:
+            self._stats.revalidations += 1
+            entry.etag = _header(headers, "ETag") or entry.etag
+            entry.last_modified = _header(headers, "Last-Modified") or entry.last_modified
+            entry.expires_at = time.time() + lifetime
+        self._save(entry)
+
+    def record_hit(self) -> None:
+        """Count a lookup served from a fresh entry."""
+        with self._lock:
+            self._stats.hits += 1
+
+    def stats(self) -> HttpCacheStats:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return HttpCacheStats(
+                hits=self._stats.hits,
+                revalidations=self._stats.revalidations,
+                misses=self._stats.misses,
+                size=len(self._entries),
+            )
+
+    def clear(self) -> None:
+        """Drop all entries (memory and disk) and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._stats = HttpCacheStats()
+        if self.cache_dir is not None:
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logger.warning(f"Could not remove cached Kambi payload {path}: {e}")
+
+    def _path(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+
+    def _load(self, url: str) -> Optional[HttpCacheEntry]:
+        path = self._path(url)
+        try:
+            with open(path, encoding="utf-8") as handle:
+                data = json.load(handle)
+            if data.get("version") != self.VERSION or data.get("url") != url:
+                return None
+            return HttpCacheEntry(
+                url=url,
+                matches=[_match_from_dict(item) for item in data["matches"]],
+                etag=data.get("etag"),
+                last_modified=data.get("last_modified"),
+                expires_at=float(data.get("expires_at", 0.0)),
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, KeyError, TypeError, ValueError) as e:
+            logger.debug(f"Ignoring unreadable cached Kambi payload {path}: {e}")
+            return None
+
+    def _remove(self, url: str) -> None:
+        if self.cache_dir is None:
+            return
+        path = self._path(url)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove cached Kambi payload {path}: {e}")
+
+    def _save(self, entry: HttpCacheEntry) -> None:
+        if self.cache_dir is None:
+            return
+        path = self._path(entry.url)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        data = {
+            "version": self.VERSION,
+            "url": entry.url,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "expires_at": entry.expires_at,
+            "matches": [_match_to_dict(match) for match in entry.matches],
+        }
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump(data, handle)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not persist Kambi payload to {path}: {e}")
+
+
+_http_cache: Optional[HttpCache] = None
+
+
+def get_http_cache() -> HttpCache:
+    """Get the shared disk-backed Kambi HTTP cache (singleton)."""
+    global _http_cache
+    if _http_cache is None:
+        _http_cache = HttpCache(config.KAMBI_HTTP_CACHE_DIR)
+    return _http_cache
+
+
+class KambiServiceError(ExternalServiceError):
+    """Raised when a Kambi endpoint fails after retries or is short-circuited."""
+
+    def __init__(self, message: str, endpoint: str):
+        super().__init__(message)
+        self.endpoint = endpoint
+
+
+class CircuitOpenError(KambiServiceError):
+    """Raised without sending a request while an endpoint's circuit is open."""
+
+
+@dataclass
+class RetryPolicy:
+    """Retry schedule for Kambi requests."""
+
+    max_attempts: int = config.KAMBI_RETRY_ATTEMPTS
+    backoff_base: float = config.KAMBI_BACKOFF_BASE  # Seconds, doubled per retry
+    backoff_max: float = config.KAMBI_BACKOFF_MAX
+    budget: float = config.KAMBI_REQUEST_BUDGET  # Total seconds across all attempts
+    retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504)
+
+    def backoff(self, retry: int) -> float:
+        """Full-jitter delay before the given retry (0 for the first retry)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**retry))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one endpoint.
+
+    Closed: requests flow. Open: requests fail fast until reset_timeout has
+    passed. Half-open: one trial request decides whether to close or reopen.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = config.KAMBI_BREAKER_THRESHOLD,
+        reset_timeout: float = config.KAMBI_BREAKER_RESET,
+    ):
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state, reporting half-open once the reset timeout has passed."""
+        with self._lock:
+            if self._state == self.OPEN and self._reset_due():
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Check if a request may be sent, admitting one trial when half-open."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and self._reset_due():
+                self._state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def _reset_due(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.reset_timeout
+
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0)
+
+
+@dataclass
+class EndpointMetrics:
+    """Latency histogram and outcome counts for one Kambi endpoint."""
+
+    endpoint: str
+    latency_buckets: List[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1)
+    )  # Counts per LATENCY_BUCKETS upper bound, plus overflow
+    latency_sum: float = 0.0
+    outcomes: Dict[str, int] = field(default_factory=dict)
+    retries: int = 0
+    circuit_state: str = CircuitBreaker.CLOSED
+
+    @property
+    def attempts(self) -> int:
+        """Number of HTTP attempts with a measured latency."""
+        return sum(self.latency_buckets)
+
+    @property
+    def mean_latency(self) -> float:
+        return self.latency_sum / self.attempts if self.attempts else 0.0
+
+    def latency_quantile(self, q: float) -> float:
+        """Upper bucket bound containing the q-quantile (inf if in overflow)."""
+        if not self.attempts:
+            return 0.0
+        target = q * self.attempts
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), self.latency_buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def observe(self, outcome: str, latency: Optional[float] = None) -> None:
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        if latency is not None:
+            index = next(
+                (i for i, bound in enumerate(LATENCY_BUCKETS) if latency <= bound),
+                len(LATENCY_BUCKETS),
+            )
+            self.latency_buckets[index] += 1
+            self.latency_sum += latency
+
+
+def _classify_failure(error: requests.exceptions.RequestException) -> str:
+    if isinstance(error, requests.exceptions.Timeout):
+        return "timeout"
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return "connection_error"
+    return "request_error"
+
+
+def _without_live(matches: List[KambiMatch], include_live: bool) -> List[KambiMatch]:
+    """Apply the include_live filter to matches parsed with live events kept."""
+    if include_live:
+        return list(matches)
+    return [match for match in matches if match.state != "STARTED"]
+
+
 class KambiClient:
     """Client for interacting with Kambi betting API."""
 
@@ -55,6 +640,11 @@ class KambiClient:
         client_id: int = 200,
         lang: str = "en_GB",
         market: str = "GB",
+        max_connections: int = 10,
+        http_cache: Optional[HttpCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker_threshold: int = config.KAMBI_BREAKER_THRESHOLD,
+        breaker_reset: float = config.KAMBI_BREAKER_RESET,
     ):
         """
         Initialize Kambi API client.
@@ -64,8 +654,28 @@ class KambiClient:
             client_id: Kambi client identifier
             lang: Language code (default: en_GB)
             market: Market code (default: GB)
+            max_connections: Size of the HTTP connection pool, and the default
+                concurrency of get_matches_for_leagues
+            http_cache: Cache of parsed payloads keyed by request URL (default: a new
+                in-memory cache; pass get_http_cache() to share one on disk)
+            retry_policy: Retry/backoff schedule (default: RetryPolicy())
+            breaker_threshold: Consecutive failures before an endpoint's circuit opens
+            breaker_reset: Seconds an open circuit fails fast before a trial request
         """
+        self.http_cache = http_cache if http_cache is not None else HttpCache()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._metrics: Dict[str, EndpointMetrics] = {}
+        self._metrics_lock = threading.Lock()
+        self.max_connections = max(int(max_connections), 1)
         self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.max_connections, pool_maxsize=self.max_connections
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update(
             {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
@@ -83,7 +693,7 @@ class KambiClient:
         }
 
     def get_all_football_matches(
-        self, include_live: bool = False, timeout: int = 15
+        self, include_live: bool = False, timeout: int = 15, stream: bool = False
     ) -> List[KambiMatch]:
         """
         Fetch all football matches with odds from Kambi.
@@ -91,27 +701,23 @@ class KambiClient:
         Args:
             include_live: Include live/in-play matches
             timeout: Request timeout in seconds
+            stream: Parse events one at a time while downloading instead of
+                loading the whole payload (lower peak memory)
 
         Returns:
             List of KambiMatch objects
         """
-        url = f"{self.BASE_URL}/listView/football/all/all/all/matches.json"
+        url = self._all_matches_url()
 
         try:
-            response = self.session.get(url, params=self.default_params, timeout=timeout)
-            response.raise_for_status()
-            data = response.json()
-
-            matches = []
-            for event_data in data.get("events", []):
-                match = self._parse_event(event_data, include_live)
-                if match:
-                    matches.append(match)
-
+            if stream:
+                matches = list(self._iter_matches(url, include_live, timeout))
+            else:
+                matches = self._fetch_matches(url, include_live, timeout)
             logger.info(f"Fetched {len(matches)} matches from Kambi")
             return matches
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, KambiServiceError, ValueError) as e:
             logger.error(f"Failed to fetch Kambi matches: {e}")
             return []
 
@@ -130,34 +736,312 @@ class KambiClient:
         Returns:
             List of KambiMatch objects for the specified league
         """
-        # Normalize country/league for URL
-        country_slug = country.lower().replace(" ", "-")
-        league_slug = league.lower().replace(" ", "-")
-
-        url = f"{self.BASE_URL}/listView/football/{country_slug}/{league_slug}/all/matches.json"
+        url = self._league_url(country, league)
 
         try:
-            response = self.session.get(url, params=self.default_params, timeout=timeout)
-            response.raise_for_status()
-            data = response.json()
-
-            matches = []
-            for event_data in data.get("events", []):
-                match = self._parse_event(event_data, include_live)
-                if match:
-                    matches.append(match)
-
+            matches = self._fetch_matches(url, include_live, timeout)
             logger.info(
                 f"Fetched {len(matches)} matches for {country}/{league} from Kambi"
             )
             return matches
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, KambiServiceError, ValueError) as e:
             logger.warning(
                 f"Failed to fetch Kambi matches for {country}/{league}: {e}"
             )
             return []
 
+    def get_matches_for_leagues(
+        self,
+        leagues: Iterable[Tuple[str, str]],
+        include_live: bool = False,
+        timeout: int = 15,
+        max_workers: Optional[int] = None,
+    ) -> Dict[Tuple[str, str], LeagueFetchResult]:
+        """
+        Fetch several leagues concurrently over the pooled session.
+
+        Args:
+            leagues: (country, league) pairs, as for get_matches_by_league
+            include_live: Include live/in-play matches
+            timeout: Per-request timeout in seconds
+            max_workers: Concurrent requests (default: the connection pool size)
+
+        Returns:
+            Dict mapping each (country, league) pair, in input order, to its
+            LeagueFetchResult with matches, latency and error information
+        """
+        leagues = list(dict.fromkeys(leagues))
+        if not leagues:
+            return {}
+
+        workers = min(max_workers or self.max_connections, len(leagues))
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kambi") as executor:
+            results = list(
+                executor.map(
+                    lambda pair: self._fetch_league(pair[0], pair[1], include_live, timeout),
+                    leagues,
+                )
+            )
+
+        failed = sum(1 for result in results if not result.ok)
+        logger.info(
+            f"Fetched {len(leagues)} leagues from Kambi in {time.perf_counter() - started:.2f}s "
+            f"({failed} failed, {workers} workers)"
+        )
+        return dict(zip(leagues, results))
+
+    def _fetch_league(
+        self, country: str, league: str, include_live: bool, timeout: int
+    ) -> LeagueFetchResult:
+        """Fetch one league, capturing latency and any error instead of raising."""
+        started = time.perf_counter()
+        try:
+            matches = self._fetch_matches(self._league_url(country, league), include_live, timeout)
+        except (requests.exceptions.RequestException, KambiServiceError, ValueError) as e:
+            logger.warning(f"Failed to fetch Kambi matches for {country}/{league}: {e}")
+            return LeagueFetchResult(
+                country=country,
+                league=league,
+                latency=time.perf_counter() - started,
+                error=f"{type(e).__name__}: {e}",
+            )
+        return LeagueFetchResult(
+            country=country, league=league, matches=matches, latency=time.perf_counter() - started
+        )
+
+    def iter_all_football_matches(
+        self, include_live: bool = False, timeout: int = 15, chunk_size: int = 64 * 1024
+    ) -> Iterator[KambiMatch]:
+        """
+        Stream all football matches, yielding each one as soon as it is parsed.
+
+        Unlike get_all_football_matches, errors are raised rather than swallowed,
+        since some matches may already have been yielded.
+
+        Args:
+            include_live: Include live/in-play matches
+            timeout: Request timeout in seconds (connect and between chunks)
+            chunk_size: Bytes read from the response per chunk
+
+        Yields:
+            KambiMatch objects in payload order
+
+        Raises:
+            KambiServiceError: If the endpoint is unreachable after retries, or
+                its circuit is open (CircuitOpenError)
+            requests.exceptions.RequestException: On non-retryable HTTP errors
+            ValueError: If the payload is not valid JSON
+        """
+        return self._iter_matches(self._all_matches_url(), include_live, timeout, chunk_size)
+
+    def _all_matches_url(self) -> str:
+        """Build the listView URL covering every football event."""
+        return f"{self.BASE_URL}/listView/football/all/all/all/matches.json"
+
+    def _league_url(self, country: str, league: str) -> str:
+        """Build the listView URL for a country/league pair."""
+        # Normalize country/league for URL
+        country_slug = country.lower().replace(" ", "-")
+        league_slug = league.lower().replace(" ", "-")
+        return f"{self.BASE_URL}/listView/football/{country_slug}/{league_slug}/all/matches.json"
+
+    def _cache_key(self, url: str) -> str:
+        """HTTP cache key of a request: the URL with the client's query parameters, sorted."""
+        request = requests.Request("GET", url, params=sorted(self.default_params.items()))
+        return request.prepare().url
+
+    def _fetch_matches(self, url: str, include_live: bool, timeout: int) -> List[KambiMatch]:
+        """
+        Download a listView payload and parse its events.
+
+        A fresh cached payload is served without a request; otherwise a
+        conditional request is sent and a 304 reuses the cached matches.
+
+        Raises:
+            KambiServiceError: If the endpoint is unreachable after retries, or
+                its circuit is open (CircuitOpenError)
+            requests.exceptions.RequestException: On non-retryable HTTP errors
+            ValueError: If the body is not valid JSON
+        """
+        cache_key = self._cache_key(url)
+        entry = self.http_cache.get(cache_key)
+        if entry is not None and entry.is_fresh:
+            self.http_cache.record_hit()
+            return _without_live(entry.matches, include_live)
+
+        response = self._conditional_get(url, entry, timeout)
+        if entry is not None and response.status_code == 304:
+            self.http_cache.revalidated(entry, response.headers)
+            return _without_live(entry.matches, include_live)
+
+        response.raise_for_status()
+        data = response.json()
+
+        matches = []
+        for event_data in data.get("events", []):
+            match = self._parse_event(event_data, include_live=True)
+            if match:
+                matches.append(match)
+        self.http_cache.store(cache_key, matches, response.headers)
+        return _without_live(matches, include_live)
+
+    def _iter_matches(
+        self, url: str, include_live: bool, timeout: int, chunk_size: int = 64 * 1024
+    ) -> Iterator[KambiMatch]:
+        """Stream a listView payload, parsing events while the body downloads."""
+        cache_key = self._cache_key(url)
+        entry = self.http_cache.get(cache_key)
+        if entry is not None and entry.is_fresh:
+            self.http_cache.record_hit()
+            yield from _without_live(entry.matches, include_live)
+            return
+
+        response = self._conditional_get(url, entry, timeout, stream=True)
+        with closing(response):
+            if entry is not None and response.status_code == 304:
+                self.http_cache.revalidated(entry, response.headers)
+                yield from _without_live(entry.matches, include_live)
+                return
+
+            response.raise_for_status()
+            matches = []
+            for event_data in iter_json_array(response.iter_content(chunk_size), "events"):
+                match = self._parse_event(event_data, include_live=True)
+                if match:
+                    matches.append(match)
+                    if include_live or match.state != "STARTED":
+                        yield match
+            self.http_cache.store(cache_key, matches, response.headers)
+
+    def _conditional_get(
+        self,
+        url: str,
+        entry: Optional[HttpCacheEntry],
+        timeout: int,
+        stream: bool = False,
+    ) -> requests.Response:
+        """Send a GET, adding validators from a cached entry when available."""
+        headers = entry.conditional_headers() if entry is not None else {}
+        return self._request(url, timeout, headers=headers, stream=stream)
+
+    def _request(
+        self, url: str, timeout: int, headers: Dict[str, str], stream: bool = False
+    ) -> requests.Response:
+        """
+        GET a URL with retries, backoff and the endpoint's circuit breaker.
+
+        Connection errors, timeouts and retryable statuses (429/5xx) are retried
+        within the policy's attempt count and time budget. Other responses,
+        including 4xx, are returned for the caller to handle.
+
+        Raises:
+            CircuitOpenError: If the endpoint's circuit is open
+            KambiServiceError: If every attempt failed
+        """
+        policy = self.retry_policy
+        breaker = self._breaker(url)
+        if not breaker.allow():
+            self._observe(url, "circuit_open")
+            raise CircuitOpenError(f"Circuit open for Kambi endpoint {url}", endpoint=url)
+
+        deadline = time.monotonic() + policy.budget
+        failure = "no attempt made within the time budget"
+        attempts = 0
+        while attempts < max(policy.max_attempts, 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if attempts:
+                self._observe(url, "retry")
+                time.sleep(min(policy.backoff(attempts - 1), remaining))
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+            attempts += 1
+
+            started = time.perf_counter()
+            try:
+                response = self.session.get(
+                    url,
+                    params=self.default_params,
+                    timeout=min(timeout, remaining),
+                    headers=headers,
+                    stream=stream,
+                )
+            except requests.exceptions.RequestException as e:
+                self._observe(url, _classify_failure(e), time.perf_counter() - started)
+                failure = f"{type(e).__name__}: {e}"
+                continue
+            except Exception:
+                # Record anything else too, so a half-open trial cannot wedge the circuit
+                self._observe(url, "error", time.perf_counter() - started)
+                breaker.record_failure()
+                raise
+
+            latency = time.perf_counter() - started
+            if response.status_code in policy.retry_statuses:
+                response.close()
+                self._observe(url, f"http_{response.status_code}", latency)
+                failure = f"HTTP {response.status_code}"
+                continue
+
+            self._observe(url, "ok", latency)
+            breaker.record_success()
+            return response
+
+        breaker.record_failure()
+        raise KambiServiceError(
+            f"Kambi request failed after {attempts} attempt(s): {failure}", endpoint=url
+        )
+
+    def _breaker(self, url: str) -> CircuitBreaker:
+        with self._metrics_lock:
+            breaker = self._breakers.get(url)
+            if breaker is None:
+                breaker = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+                self._breakers[url] = breaker
+            return breaker
+
+    def _observe(self, url: str, outcome: str, latency: Optional[float] = None) -> None:
+        with self._metrics_lock:
+            metrics = self._metrics.get(url)
+            if metrics is None:
+                metrics = self._metrics[url] = EndpointMetrics(endpoint=url)
+            if outcome == "retry":
+                metrics.retries += 1
+            else:
+                metrics.observe(outcome, latency)
+
+    def request_metrics(self) -> Dict[str, EndpointMetrics]:
+        """
+        Return per-endpoint latency histograms, outcome counts and circuit states.
+
+        Returns:
+            Dict mapping endpoint URL to a snapshot copy of its EndpointMetrics
+        """
+        with self._metrics_lock:
+            snapshot = {
+                url: EndpointMetrics(
+                    endpoint=url,
+                    latency_buckets=list(metrics.latency_buckets),
+                    latency_sum=metrics.latency_sum,
+                    outcomes=dict(metrics.outcomes),
+                    retries=metrics.retries,
+                )
+                for url, metrics in self._metrics.items()
+            }
+            breakers = dict(self._breakers)
+        for url, metrics in snapshot.items():
+            if url in breakers:
+                metrics.circuit_state = breakers[url].state
+        return snapshot
+
+    def cache_stats(self) -> HttpCacheStats:
+        """Return hit/revalidation/miss counters for the HTTP cache."""
+        return self.http_cache.stats()
+
     def find_match(
         self, home_team: str, away_team: str, league: Optional[str] = None, threshold: int = 85
     ) -> Optional[KambiMatch]:
@@ -172,57 +1056,14 @@ class KambiClient:
 
         Returns:
             KambiMatch if found, None otherwise
-        """
-        matches = self.get_all_football_matches()
-
-        # Normalize search terms
-        home_normalized = self._normalize_team_name(home_team)
-        away_normalized = self._normalize_team_name(away_team)
-
-        best_match = None
-        best_score = 0
-
-        for match in matches:
-            match_home = self._normalize_team_name(match.home_team)
-            match_away = self._normalize_team_name(match.away_team)
-
-            # Calculate fuzzy match scores
-            home_score = fuzz.token_sort_ratio(home_normalized, match_home)
-            away_score = fuzz.token_sort_ratio(away_normalized, match_away)
-
-            # Average score for both teams
-            avg_score = (home_score + away_score) / 2
-
-            # If league specified, boost score for matches in that league
-            if league:
-                league_normalized = self._normalize_team_name(league)
-                match_league = self._normalize_team_name(match.league)
-                league_score = fuzz.partial_ratio(league_normalized, match_league)
-
-                # If league matches well, boost the score
-                if league_score > 70:
-                    avg_score = avg_score * 1.1  # 10% boost for league match
-
-            # Exact match - return immediately
-            if home_score == 100 and away_score == 100:
-                if league:
-                    league_normalized = self._normalize_team_name(league)
-                    match_league = self._normalize_team_name(match.league)
-                    if league_normalized not in match_league and fuzz.partial_ratio(league_normalized, match_league) < 70:
-                        continue
-                return match
-
-            # Track best match
-            if avg_score > best_score and avg_score >= threshold:
-                best_score = avg_score
-                best_match = match
-
-        if best_match:
-            logger.info(f"Found match with {best_score:.0f}% confidence: {best_match.home_team} vs {best_match.away_team}")
-            return best_match
 
-        logger.warning(f"Match not found in Kambi: {home_team} vs {away_team}")
-        return None
+        Note:
+            This downloads the match list; to look up several matches build a
+            MatchIndex once (or use OddsSnapshot.index) and call its find().
+        """
+        return MatchIndex(self.get_all_football_matches()).find(
+            home_team, away_team, league=league, threshold=threshold
+        )
 
     def _parse_event(
         self, event_data: Dict, include_live: bool = False
@@ -372,3 +1213,114 @@ class KambiClient:
         normalized = " ".join(normalized.split())
 
         return normalized
+
+
+def _token_key(normalized: str) -> str:
+    """Sorted-token form; equal keys are exactly the token_sort_ratio == 100 pairs."""
+    return " ".join(sorted(normalized.split()))
+
+
+class MatchIndex:
+    """
+    Lookup structure over one snapshot of matches for fast find_match calls.
+
+    Team and league names are normalized once at build time. Exact pairings
+    resolve through a hash of sorted-token names; otherwise every event is
+    scored in a single rapidfuzz cdist call per side instead of a Python loop.
+    """
+
+    def __init__(self, matches: Iterable[KambiMatch]):
+        """
+        Build the index.
+
+        Args:
+            matches: Matches to index, in priority order (earlier wins ties)
+        """
+        normalize = KambiClient._normalize_team_name
+        self.matches = list(matches)
+        self._home_names = [normalize(match.home_team) for match in self.matches]
+        self._away_names = [normalize(match.away_team) for match in self.matches]
+
+        self._exact: Dict[Tuple[str, str], List[int]] = {}
+        for position, (home, away) in enumerate(zip(self._home_names, self._away_names)):
+            self._exact.setdefault((_token_key(home), _token_key(away)), []).append(position)
+
+        # Leagues repeat across events, so score each distinct league once
+        league_names = [normalize(match.league) for match in self.matches]
+        self._leagues = list(dict.fromkeys(league_names))
+        positions = {name: i for i, name in enumerate(self._leagues)}
+        self._league_of_event = np.array([positions[name] for name in league_names], dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self.matches)
+
+    def find(
+        self, home_team: str, away_team: str, league: Optional[str] = None, threshold: int = 85
+    ) -> Optional[KambiMatch]:
+        """
+        Find a match by team names, with the same scoring as KambiClient.find_match.
+
+        Args:
+            home_team: Home team name
+            away_team: Away team name
+            league: Optional league name; events in a matching league get a 10% boost
+            threshold: Fuzzy matching threshold (0-100, default 85)
+
+        Returns:
+            KambiMatch if found, None otherwise
+        """
+        if not self.matches:
+            logger.warning(f"Match not found in Kambi: {home_team} vs {away_team}")
+            return None
+
+        normalize = KambiClient._normalize_team_name
+        home_normalized = normalize(home_team)
+        away_normalized = normalize(away_team)
+        league_normalized = normalize(league) if league else None
+
+        league_scores = None
+        if league_normalized:
+            league_scores = process.cdist(
+                [league_normalized], self._leagues, scorer=fuzz.partial_ratio, dtype=np.float64
+            )[0]
+
+        # Exact match - first indexed event passing the league check
+        exact_key = (_token_key(home_normalized), _token_key(away_normalized))
+        rejected = []
+        for position in self._exact.get(exact_key, []):
+            if league_normalized:
+                league_id = self._league_of_event[position]
+                if (
+                    league_normalized not in self._leagues[league_id]
+                    and league_scores[league_id] < 70
+                ):
+                    rejected.append(position)
+                    continue
+            return self.matches[position]
+
+        home_scores = process.cdist(
+            [home_normalized], self._home_names, scorer=fuzz.token_sort_ratio, dtype=np.float64
+        )[0]
+        away_scores = process.cdist(
+            [away_normalized], self._away_names, scorer=fuzz.token_sort_ratio, dtype=np.float64
+        )[0]
+        avg_scores = (home_scores + away_scores) / 2
+        if league_scores is not None:
+            # 10% boost for events whose league matches well
+            boosted = league_scores[self._league_of_event] > 70
+            avg_scores = np.where(boosted, avg_scores * 1.1, avg_scores)
+        # Exact pairings in the wrong league are excluded, not just unboosted
+        avg_scores[rejected] = -np.inf
+
+        best = int(np.argmax(avg_scores))
+        best_score = float(avg_scores[best])
+        if best_score > 0 and best_score >= threshold:
+            best_match = self.matches[best]
+            logger.info(
+                f"Found match with {best_score:.0f}% confidence: "
+                f"{best_match.home_team} vs {best_match.away_team}"
+            )
+            return best_match
+
+        logger.warning(f"Match not found in Kambi: {home_team} vs {away_team}")
+        return None
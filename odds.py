@@ -3,10 +3,28 @@ from __future__ import annotations
 
 import logging
 import math
-from typing import Dict, List, Tuple
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+import config
 
 logger = logging.getLogger(__name__)
 
+ENGINE_PYTHON = "python"
+ENGINE_NUMPY = "numpy"
+ENGINES = (ENGINE_PYTHON, ENGINE_NUMPY)
+
+# Default market ladder lines, in quarter-goal steps (Asian lines).
+TOTAL_LINES = tuple(step / 4 for step in range(2, 27))
+HANDICAP_LINES = tuple(step / 4 for step in range(-12, 13))
+TEAM_TOTAL_LINES = tuple(step / 2 for step in range(1, 10, 2))
+
 
 def _poisson_pmf(k: int, lam: float) -> float:
     """Calculate Poisson probability mass function.
@@ -61,6 +79,68 @@ def _build_poisson_distribution(lam: float, max_goals: int) -> List[float]:
     return [max(p / total, 0.0) for p in probabilities]
 
 
+def _build_poisson_array(lam: float, max_goals: int) -> np.ndarray:
+    """Return a truncated Poisson distribution as a NumPy array.
+
+    The PMF is built with the recurrence ``p(k) = p(k - 1) * lam / k`` instead of
+    evaluating factorials per element. The last bucket holds the tail mass so the
+    result matches :func:`_build_poisson_distribution`.
+
+    Args:
+        lam: Poisson parameter (lambda)
+        max_goals: Maximum number of goals to consider
+
+    Returns:
+        Array of probabilities for 0 to max_goals (inclusive)
+    """
+    try:
+        lam = max(float(lam), 0.0)
+        max_goals = max(int(max_goals), 1)
+    except (ValueError, TypeError) as e:
+        logger.error(f"Invalid inputs for Poisson distribution: lam={lam}, max_goals={max_goals}")
+        raise TypeError(f"Invalid parameter types: {e}") from e
+
+    probabilities = np.empty(max_goals + 1)
+    probabilities[0] = math.exp(-lam)
+    if max_goals > 1:
+        probabilities[1:max_goals] = probabilities[0] * np.cumprod(lam / np.arange(1, max_goals))
+    head = float(probabilities[:max_goals].sum())
+    probabilities[max_goals] = max(1.0 - head, 0.0)
+
+    total = head + probabilities[max_goals]
+    if total <= 0:
+        probs = np.zeros(max_goals + 1)
+        probs[0] = 1.0
+        return probs
+
+    probabilities /= total
+    return probabilities
+
+
+def _matrix_outcome_probabilities(goal_matrix: np.ndarray) -> Tuple[float, float, float]:
+    """Calculate normalised 1X2 probabilities from a score matrix.
+
+    Rows are home goals and columns away goals, so home wins sit below the
+    diagonal, draws on it and away wins above it.
+
+    Args:
+        goal_matrix: Array where ``goal_matrix[i, j]`` is P(home=i, away=j)
+
+    Returns:
+        Tuple of (p_home, p_draw, p_away)
+    """
+    p_home = float(np.tril(goal_matrix, -1).sum())
+    p_draw = float(np.trace(goal_matrix))
+    p_away = float(np.triu(goal_matrix, 1).sum())
+
+    total = p_home + p_draw + p_away
+    if total > 0:
+        return p_home / total, p_draw / total, p_away / total
+
+    logger.warning("Total probability is zero, returning default draw")
+    return 0.0, 1.0, 0.0
+
+
 def _match_probabilities(home_dist: List[float], away_dist: List[float]) -> Tuple[float, float, float]:
     """Calculate match outcome probabilities from goal distributions.
 
@@ -129,16 +209,124 @@ def _conditional_home_win_probability(
     return p_home / denom, home_dist, away_dist
 
 
-def _solve_strength_split(pi_home: float, lambda_total: float, max_goals: int) -> Tuple[float, List[float], List[float]]:
-    """Solve for strength split using bisection method.
+def _poisson_mean_derivative(dist: np.ndarray) -> np.ndarray:
+    """Return d/dmu of a truncated Poisson distribution.
+
+    For ``k < max_goals`` the derivative is ``p(k - 1) - p(k)``; the tail bucket
+    gains whatever the head loses, which telescopes to ``p(max_goals - 1)``.
+    Works on a single distribution or on stacked rows (last axis is goals).
+    """
+    deriv = np.empty_like(dist)
+    deriv[..., 0] = -dist[..., 0]
+    deriv[..., 1:-1] = dist[..., :-2] - dist[..., 1:-1]
+    deriv[..., -1] = dist[..., -2]
+    return deriv
+
+
+def _outscore_probability(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Return ``sum_{i > j} first[i] * second[j]`` along the last axis.
+
+    Bilinear, so it also gives derivatives when one argument is a derivative.
+    """
+    if first.ndim == 1:
+        return second @ (first.sum() - np.cumsum(first))
+    upper_tail = first.sum(axis=-1, keepdims=True) - np.cumsum(first, axis=-1)
+    return np.einsum("ij,ij->i", second, upper_tail)
+
+
+def _conditional_home_win_with_derivative(
+    s, lambda_total, max_goals: int, rho: float = 0.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Conditional home win probability and its analytic derivative in ``s``.
+
+    ``s`` and ``lambda_total`` may be scalars or 1-D arrays (one per fixture).
+
+    Args:
+        s: Strength split parameter (0 to 1, home's share of total strength)
+        lambda_total: Total expected goals
+        max_goals: Maximum goals to consider
+        rho: Dixon-Coles dependence parameter (see :func:`dixon_coles_adjust`)
+
+    Returns:
+        Tuple of (conditional probability, derivative, home distribution, away distribution)
+    """
+    if np.ndim(s) == 0:
+        home_dist = _build_poisson_array(lambda_total * s, max_goals)
+        away_dist = _build_poisson_array(lambda_total * (1.0 - s), max_goals)
+    else:
+        home_dist = _build_poisson_rows(lambda_total * s, max_goals)
+        away_dist = _build_poisson_rows(lambda_total * (1.0 - s), max_goals)
+    home_deriv = _poisson_mean_derivative(home_dist)
+    away_deriv = _poisson_mean_derivative(away_dist)
+
+    # xg_home = lambda * s and xg_away = lambda * (1 - s), hence the +/- lambda chain rule.
+    p_home = _outscore_probability(home_dist, away_dist)
+    p_away = _outscore_probability(away_dist, home_dist)
+    dp_home = lambda_total * (
+        _outscore_probability(home_deriv, away_dist) - _outscore_probability(home_dist, away_deriv)
+    )
+    dp_away = lambda_total * (
+        _outscore_probability(away_dist, home_deriv) - _outscore_probability(away_deriv, home_dist)
+    )
+
+    if rho:
+        # Only the 1-0 and 0-1 cells of the Dixon-Coles correction are decisive:
+        # P(1-0) gains rho * xg_away * p(1-0) and P(0-1) gains rho * xg_home * p(0-1).
+        xg_home = lambda_total * s
+        xg_away = lambda_total * (1.0 - s)
+        home_one_nil = home_dist[..., 1] * away_dist[..., 0]
+        away_one_nil = home_dist[..., 0] * away_dist[..., 1]
+        p_home = p_home + rho * xg_away * home_one_nil
+        p_away = p_away + rho * xg_home * away_one_nil
+        dp_home = dp_home + rho * lambda_total * (
+            xg_away * (home_deriv[..., 1] * away_dist[..., 0] - home_dist[..., 1] * away_deriv[..., 0])
+            - home_one_nil
+        )
+        dp_away = dp_away + rho * lambda_total * (
+            xg_home * (home_deriv[..., 0] * away_dist[..., 1] - home_dist[..., 0] * away_deriv[..., 1])
+            + away_one_nil
+        )
+
+    denom = p_home + p_away
+    if np.ndim(denom) == 0:
+        if denom <= 0:
+            return 0.5, 0.0, home_dist, away_dist
+        return p_home / denom, (dp_home * p_away - p_home * dp_away) / denom**2, home_dist, away_dist
+
+    safe_denom = np.where(denom > 0, denom, 1.0)
+    conditional = np.where(denom > 0, p_home / safe_denom, 0.5)
+    derivative = np.where(denom > 0, (dp_home * p_away - p_home * dp_away) / safe_denom**2, 0.0)
+    return conditional, derivative, home_dist, away_dist
+
+
+def _newton_strength_split(
+    pi_home: float,
+    lambda_total: float,
+    max_goals: int,
+    tol: float = 1e-6,
+    max_iterations: int = 50,
+    initial_split: Optional[float] = None,
+    rho: float = 0.0,
+) -> Tuple[float, np.ndarray, np.ndarray, int]:
+    """Solve for strength split with a bracket-safeguarded Newton iteration.
+
+    The conditional home win probability is increasing in ``s``, so every
+    evaluation also tightens a ``[lower, upper]`` bracket. Newton steps that
+    leave the bracket fall back to bisection, which keeps the solver robust at
+    the extremes while usually converging in three or four evaluations.
 
     Args:
         pi_home: Target home win probability (excluding draws)
         lambda_total: Total expected goals
         max_goals: Maximum goals to consider
+        tol: Absolute tolerance on the conditional home win probability
+        max_iterations: Maximum number of function evaluations
+        initial_split: Starting point, e.g. from :class:`StrengthSplitTable`
+            (defaults to ``pi_home``)
+        rho: Dixon-Coles dependence parameter the target is matched under
 
     Returns:
-        Tuple of (strength split, home distribution, away distribution)
+        Tuple of (strength split, home distribution, away distribution, iterations)
     """
     if lambda_total <= 0 or not 0 < pi_home < 1:
         logger.debug(
@@ -146,45 +334,231 @@ def _solve_strength_split(pi_home: float, lambda_total: float, max_goals: int) -
             f"pi_home={pi_home}. Returning neutral split."
         )
         s = 0.5
-        _, home_dist, away_dist = _conditional_home_win_probability(s, lambda_total, max_goals)
-        return s, home_dist, away_dist
+        home_dist = _build_poisson_array(lambda_total * s, max_goals)
+        away_dist = _build_poisson_array(lambda_total * (1.0 - s), max_goals)
+        return s, home_dist, away_dist, 0
+
+    eps = 1e-6
+    lower = eps
+    upper = 1.0 - eps
+    s = min(max(pi_home if initial_split is None else initial_split, lower), upper)
+
+    iteration = 0
+    for iteration in range(1, max_iterations + 1):
+        cond, deriv, home_dist, away_dist = _conditional_home_win_with_derivative(
+            s, lambda_total, max_goals, rho
+        )
+        residual = float(cond) - pi_home
+        if abs(residual) < tol:
+            logger.debug(f"Newton converged in {iteration} iterations")
+            return s, home_dist, away_dist, iteration
+
+        if residual > 0:
+            upper = s
+        else:
+            lower = s
+        if upper - lower < 1e-12:
+            break
+
+        deriv = float(deriv)
+        candidate = s - residual / deriv if deriv > 0 else lower - 1.0
+        s = candidate if lower < candidate < upper else 0.5 * (lower + upper)
+
+    logger.debug(f"Newton stopped at bracket [{lower:.6g}, {upper:.6g}] with split s={s:.6f}")
+    home_dist = _build_poisson_array(lambda_total * s, max_goals)
+    away_dist = _build_poisson_array(lambda_total * (1.0 - s), max_goals)
+    return s, home_dist, away_dist, iteration
+
+
+class StrengthSplitTable:
+    """Precomputed strength splits ``s(pi_home, lambda_total)`` for one ``max_goals``.
+
+    The grid is uniform in ``logit(pi_home)`` and ``log(lambda_total)``, where the
+    split is close to linear, so bilinear interpolation lands within ~1e-4 of the
+    exact solution. It is built lazily with the batch solver on first use and
+    persisted as ``.npz`` under ``config.DATA_DIR`` for later processes.
+    """
+
+    VERSION = 1
+    LOGIT_RANGE = (-6.0, 6.0)
+    LOG_LAMBDA_RANGE = (math.log(0.05), math.log(12.0))
+    GRID_SHAPE = (161, 129)
+
+    def __init__(self, max_goals: int = 15, path: Optional[Union[str, Path]] = None):
+        self.max_goals = max(int(max_goals), 1)
+        self.path = (
+            Path(path)
+            if path is not None
+            else config.DATA_DIR / f"strength_split_g{self.max_goals}.npz"
+        )
+        self._grid: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @property
+    def grid(self) -> np.ndarray:
+        """Return the split grid, loading or building it on first access."""
+        if self._grid is None:
+            with self._lock:
+                if self._grid is None:
+                    grid = self._load()
+                    if grid is None:
+                        grid = self.build()
+                        self._save(grid)
+                    self._grid = grid
+        return self._grid
+
+    def build(self) -> np.ndarray:
+        """Solve the split at every grid node to near machine precision."""
+        logits = np.linspace(*self.LOGIT_RANGE, self.GRID_SHAPE[0])
+        log_lambdas = np.linspace(*self.LOG_LAMBDA_RANGE, self.GRID_SHAPE[1])
+        pi_nodes, lambda_nodes = np.meshgrid(
+            1.0 / (1.0 + np.exp(-logits)), np.exp(log_lambdas), indexing="ij"
+        )
+        splits = _solve_strength_split_batch(
+            pi_nodes.ravel(), lambda_nodes.ravel(), self.max_goals, tol=1e-12
+        )
+        logger.info(f"Built strength split table for max_goals={self.max_goals}")
+        return splits.reshape(self.GRID_SHAPE)
+
+    def _load(self) -> Optional[np.ndarray]:
+        try:
+            with np.load(self.path) as data:
+                header = data["header"]
+                grid = data["grid"]
+        except (OSError, KeyError, ValueError) as e:
+            logger.debug(f"No usable strength split table at {self.path}: {e}")
+            return None
+
+        expected = np.array(
+            [self.VERSION, self.max_goals, *self.LOGIT_RANGE, *self.LOG_LAMBDA_RANGE]
+        )
+        if grid.shape != self.GRID_SHAPE or not np.array_equal(header, expected):
+            logger.info(f"Ignoring stale strength split table at {self.path}")
+            return None
+        return grid
+
+    def _save(self, grid: np.ndarray) -> None:
+        header = np.array(
+            [self.VERSION, self.max_goals, *self.LOGIT_RANGE, *self.LOG_LAMBDA_RANGE]
+        )
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as handle:
+                np.savez(handle, header=header, grid=grid)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not persist strength split table to {self.path}: {e}")
+
+    def lookup(self, pi_home, lambda_total) -> np.ndarray:
+        """Interpolate splits for scalar or array inputs.
+
+        Returns:
+            Array of splits; NaN where the inputs fall outside the grid
+        """
+        pi_home = np.asarray(pi_home, dtype=float)
+        lambda_total = np.asarray(lambda_total, dtype=float)
+        grid = self.grid
+        n_pi, n_lambda = self.GRID_SHAPE
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            logit = np.log(pi_home / (1.0 - pi_home))
+            log_lambda = np.log(lambda_total)
+        x = (logit - self.LOGIT_RANGE[0]) / (self.LOGIT_RANGE[1] - self.LOGIT_RANGE[0]) * (n_pi - 1)
+        y = (
+            (log_lambda - self.LOG_LAMBDA_RANGE[0])
+            / (self.LOG_LAMBDA_RANGE[1] - self.LOG_LAMBDA_RANGE[0])
+            * (n_lambda - 1)
+        )
+        inside = (x >= 0) & (x <= n_pi - 1) & (y >= 0) & (y <= n_lambda - 1)
+
+        i = np.clip(np.where(inside, x, 0).astype(int), 0, n_pi - 2)
+        j = np.clip(np.where(inside, y, 0).astype(int), 0, n_lambda - 2)
+        tx = np.where(inside, x - i, 0.0)
+        ty = np.where(inside, y - j, 0.0)
+        splits = (
+            (1 - tx) * (1 - ty) * grid[i, j]
+            + tx * (1 - ty) * grid[i + 1, j]
+            + (1 - tx) * ty * grid[i, j + 1]
+            + tx * ty * grid[i + 1, j + 1]
+        )
+        return np.where(inside, splits, np.nan)
+
+
+_split_tables: Dict[int, StrengthSplitTable] = {}
+
+
+def get_strength_split_table(max_goals: int = 15) -> StrengthSplitTable:
+    """Get or create the shared strength split table for ``max_goals``."""
+    max_goals = max(int(max_goals), 1)
+    table = _split_tables.get(max_goals)
+    if table is None:
+        table = _split_tables.setdefault(max_goals, StrengthSplitTable(max_goals))
+    return table
+
+
+def _bisect_strength_split(
+    pi_home: float, lambda_total: float, max_goals: int, tol: float = 1e-6
+) -> Tuple[float, List[float], List[float], int]:
+    """Solve for strength split using the reference bisection method.
+
+    Args:
+        pi_home: Target home win probability (excluding draws)
+        lambda_total: Total expected goals
+        max_goals: Maximum goals to consider
+        tol: Absolute tolerance on the conditional home win probability
+
+    Returns:
+        Tuple of (strength split, home distribution, away distribution, iterations)
+    """
+    conditional = _conditional_home_win_probability
+
+    if lambda_total <= 0 or not 0 < pi_home < 1:
+        logger.debug(
+            f"Invalid inputs for strength split: lambda_total={lambda_total}, "
+            f"pi_home={pi_home}. Returning neutral split."
+        )
+        s = 0.5
+        _, home_dist, away_dist = conditional(s, lambda_total, max_goals)
+        return s, home_dist, away_dist, 0
 
     eps = 1e-6
     lower = eps
     upper = 1.0 - eps
 
     try:
-        lower_cond, _, _ = _conditional_home_win_probability(lower, lambda_total, max_goals)
-        upper_cond, _, _ = _conditional_home_win_probability(upper, lambda_total, max_goals)
+        lower_cond, _, _ = conditional(lower, lambda_total, max_goals)
+        upper_cond, _, _ = conditional(upper, lambda_total, max_goals)
     except Exception as e:
         logger.error(f"Error computing boundary conditions: {e}")
         s = 0.5
-        _, home_dist, away_dist = _conditional_home_win_probability(s, lambda_total, max_goals)
-        return s, home_dist, away_dist
+        _, home_dist, away_dist = conditional(s, lambda_total, max_goals)
+        return s, home_dist, away_dist, 0
 
     if pi_home <= lower_cond:
         logger.debug(f"pi_home ({pi_home}) at or below lower bound ({lower_cond})")
-        _, home_dist, away_dist = _conditional_home_win_probability(lower, lambda_total, max_goals)
-        return lower, home_dist, away_dist
+        _, home_dist, away_dist = conditional(lower, lambda_total, max_goals)
+        return lower, home_dist, away_dist, 0
 
     if pi_home >= upper_cond:
         logger.debug(f"pi_home ({pi_home}) at or above upper bound ({upper_cond})")
-        _, home_dist, away_dist = _conditional_home_win_probability(upper, lambda_total, max_goals)
-        return upper, home_dist, away_dist
+        _, home_dist, away_dist = conditional(upper, lambda_total, max_goals)
+        return upper, home_dist, away_dist, 0
 
     max_iterations = 60
     for iteration in range(max_iterations):
         mid = 0.5 * (lower + upper)
         try:
-            cond_mid, _, _ = _conditional_home_win_probability(mid, lambda_total, max_goals)
+            cond_mid, _, _ = conditional(mid, lambda_total, max_goals)
         except Exception as e:
             logger.warning(f"Error in bisection iteration {iteration}: {e}")
+            max_iterations = iteration
             break
 
-        if abs(cond_mid - pi_home) < 1e-6:
-            _, home_dist, away_dist = _conditional_home_win_probability(mid, lambda_total, max_goals)
+        if abs(cond_mid - pi_home) < tol:
+            _, home_dist, away_dist = conditional(mid, lambda_total, max_goals)
             logger.debug(f"Converged in {iteration + 1} iterations")
-            return mid, home_dist, away_dist
+            return mid, home_dist, away_dist, iteration + 1
 
         if cond_mid > pi_home:
             upper = mid
@@ -192,8 +566,40 @@ def _solve_strength_split(pi_home: float, lambda_total: float, max_goals: int) -
             lower = mid
 
     s = 0.5 * (lower + upper)
-    _, home_dist, away_dist = _conditional_home_win_probability(s, lambda_total, max_goals)
+    _, home_dist, away_dist = conditional(s, lambda_total, max_goals)
     logger.debug(f"Bisection completed with final split s={s:.6f}")
+    return s, home_dist, away_dist, max_iterations
+
+
+_STRENGTH_SPLIT_SOLVERS = {
+    ENGINE_PYTHON: _bisect_strength_split,
+    ENGINE_NUMPY: _newton_strength_split,
+}
+
+
+def _solve_strength_split(
+    pi_home: float,
+    lambda_total: float,
+    max_goals: int,
+    engine: str = ENGINE_NUMPY,
+    tol: float = 1e-6,
+) -> Tuple[float, Union[List[float], np.ndarray], Union[List[float], np.ndarray]]:
+    """Solve for the strength split that reproduces the DNB home probability.
+
+    Args:
+        pi_home: Target home win probability (excluding draws)
+        lambda_total: Total expected goals
+        max_goals: Maximum goals to consider
+        engine: ``"python"`` bisects with list distributions, ``"numpy"`` runs the
+            safeguarded Newton solver on arrays
+        tol: Absolute tolerance on the conditional home win probability
+
+    Returns:
+        Tuple of (strength split, home distribution, away distribution)
+    """
+    s, home_dist, away_dist, _ = _STRENGTH_SPLIT_SOLVERS[engine](
+        pi_home, lambda_total, max_goals, tol=tol
+    )
     return s, home_dist, away_dist
 
 
@@ -216,12 +622,406 @@ def _total_goals_distribution(goal_matrix: Dict[Tuple[int, int], float]) -> Dict
     return totals
 
 
+def _python_market_probabilities(
+    home_dist: List[float], away_dist: List[float]
+) -> Tuple[float, float, float, float, float]:
+    """Reference pure-Python market pass over the goal matrix.
+
+    Args:
+        home_dist: Home team goal distribution
+        away_dist: Away team goal distribution
+
+    Returns:
+        Tuple of (p_home, p_draw, p_away, p_under25, p_btts)
+    """
+    goal_matrix: Dict[Tuple[int, int], float] = {}
+    p_home = 0.0
+    p_draw = 0.0
+    p_away = 0.0
+    for i, p_i in enumerate(home_dist):
+        for j, p_j in enumerate(away_dist):
+            prob = p_i * p_j
+            goal_matrix[(i, j)] = prob
+            if i > j:
+                p_home += prob
+            elif i == j:
+                p_draw += prob
+            else:
+                p_away += prob
+
+    total = p_home + p_draw + p_away
+    if total > 0:
+        p_home /= total
+        p_draw /= total
+        p_away /= total
+    else:
+        p_home = p_away = 0.0
+        p_draw = 1.0
+
+    total_goals = _total_goals_distribution(goal_matrix)
+    p_under25 = sum(prob for goals, prob in total_goals.items() if goals <= 2)
+
+    p_home_clean = home_dist[0] if home_dist else 0.0
+    p_away_clean = away_dist[0] if away_dist else 0.0
+    p_btts = 1.0 - (p_home_clean + p_away_clean - (p_home_clean * p_away_clean))
+    return p_home, p_draw, p_away, p_under25, p_btts
+
+
+def _matrix_total_goals(goal_matrix: np.ndarray) -> np.ndarray:
+    """Calculate the total goals distribution from a score matrix.
+
+    Args:
+        goal_matrix: Array where ``goal_matrix[i, j]`` is P(home=i, away=j)
+
+    Returns:
+        Array where index ``n`` holds P(home + away = n)
+    """
+    rows, cols = goal_matrix.shape
+    goal_sums = np.add.outer(np.arange(rows), np.arange(cols))
+    return np.bincount(goal_sums.ravel(), weights=goal_matrix.ravel(), minlength=rows + cols - 1)
+
+
+def _validate_rho(rho: float) -> float:
+    """Convert a Dixon-Coles ``rho`` to float, rejecting values outside (-1, 1)."""
+    try:
+        rho = float(rho)
+    except (ValueError, TypeError) as e:
+        logger.error(f"Invalid rho: {rho}")
+        raise TypeError(f"Rho must be numeric: {e}") from e
+    if not -1.0 < rho < 1.0:
+        raise ValueError(f"Rho must be between -1 and 1, got {rho}")
+    return rho
+
+
+def dixon_coles_adjust(goal_matrix: np.ndarray, xg_home, xg_away, rho: float) -> np.ndarray:
+    """Apply the Dixon-Coles low-score dependence correction to score matrices.
+
+    Independent Poissons misprice 0-0, 1-0, 0-1 and 1-1; Dixon and Coles scale
+    those four cells by
+
+    * ``tau(0, 0) = 1 - xg_home * xg_away * rho``
+    * ``tau(0, 1) = 1 + xg_home * rho``
+    * ``tau(1, 0) = 1 + xg_away * rho``
+    * ``tau(1, 1) = 1 - rho``
+
+    which leaves the total mass unchanged. Negative ``rho`` (the usual fitted
+    value) raises the draw and low-score probabilities. The correction is a
+    single multiply on the top-left 2x2 block, so it works unchanged on a
+    batch of matrices.
+
+    Args:
+        goal_matrix: Score matrix ``[..., home_goals, away_goals]``
+        xg_home: Expected home goals (scalar or one per matrix)
+        xg_away: Expected away goals (scalar or one per matrix)
+        rho: Dependence parameter; ``0`` returns an unchanged copy
+
+    Returns:
+        New adjusted score matrix with the same shape
+    """
+    adjusted = np.array(goal_matrix, dtype=float)
+    if not rho or adjusted.shape[-1] < 2 or adjusted.shape[-2] < 2:
+        return adjusted
+
+    xg_home = np.asarray(xg_home, dtype=float)
+    xg_away = np.asarray(xg_away, dtype=float)
+    tau = np.empty(np.broadcast_shapes(xg_home.shape, xg_away.shape) + (2, 2))
+    tau[..., 0, 0] = 1.0 - xg_home * xg_away * rho
+    tau[..., 0, 1] = 1.0 + xg_home * rho
+    tau[..., 1, 0] = 1.0 + xg_away * rho
+    tau[..., 1, 1] = 1.0 - rho
+    # Extreme rho/xg combinations can push a factor below zero; clip and renormalise.
+    adjusted[..., :2, :2] *= np.maximum(tau, 0.0)
+    total = adjusted.sum(axis=(-2, -1), keepdims=True)
+    return adjusted / np.where(total > 0, total, 1.0)
+
+
+def _poisson_pmf_table(lams: np.ndarray, max_k: int) -> np.ndarray:
+    """Build untruncated Poisson PMFs for ``k = 0..max_k`` along the last axis.
+
+    Args:
+        lams: Array of Poisson means
+        max_k: Largest count to tabulate
+
+    Returns:
+        Array of shape ``lams.shape + (max_k + 1,)``
+    """
+    lams = np.maximum(np.asarray(lams, dtype=float), 0.0)
+    table = np.empty(lams.shape + (max_k + 1,))
+    table[..., 0] = 1.0
+    if max_k > 0:
+        table[..., 1:] = np.cumprod(lams[..., None] / np.arange(1, max_k + 1), axis=-1)
+    table *= np.exp(-lams)[..., None]
+    return table
+
+
+def skellam_market_probabilities(
+    xg_home,
+    xg_away,
+    total_lines: Sequence[float] = (2.5,),
+    rho: float = 0.0,
+) -> Dict[str, object]:
+    """Price 1X2, Over/Under and BTTS without building a score matrix.
+
+    For independent Poisson scores the goal difference is Skellam distributed
+    and the total is Poisson(xg_home + xg_away), so every market reduces to a
+    one-dimensional sum or a closed form:
+
+    * draw: ``exp(-(h + a)) * I0(2 * sqrt(h * a))``, evaluated through the I0
+      power series, whose terms are exactly ``P(H = k) * P(A = k)``
+    * home win: ``sum_j P(A = j) * P(H > j)`` (the Skellam upper tail)
+    * totals: Poisson CDF of the combined mean at the line
+    * BTTS: ``(1 - exp(-h)) * (1 - exp(-a))``
+
+    A Dixon-Coles ``rho`` only moves mass between the 0-0, 1-0, 0-1 and 1-1
+    cells, so it is added as a closed-form correction to the draw, home, away
+    and BTTS terms and to the probabilities of 0, 1 and 2 total goals (lines
+    of 2.5 and above are unaffected).
+
+    Unlike the matrix path the scores are not truncated at ``max_goals``, so
+    results differ from it only by the (negligible) truncated tail mass.
+
+    Args:
+        xg_home: Expected home goals (scalar or array)
+        xg_away: Expected away goals (scalar or array, broadcastable with ``xg_home``)
+        total_lines: Over/Under lines to price; integer lines also report a push
+        rho: Dixon-Coles dependence parameter (see :func:`dixon_coles_adjust`)
+
+    Returns:
+        Dictionary with ``home``, ``draw``, ``away``, ``btts_yes``, ``btts_no`` and
+        ``totals`` mapping each line to ``over``/``under``/``push`` probabilities.
+        Values are floats for scalar inputs and arrays otherwise.
+
+    Raises:
+        ValueError: If a total line is negative
+    """
+    lines = [float(line) for line in total_lines]
+    if any(line < 0 for line in lines):
+        raise ValueError(f"Total lines must be non-negative, got {lines}")
+
+    scalar = np.ndim(xg_home) == 0 and np.ndim(xg_away) == 0
+    xg_home, xg_away = np.broadcast_arrays(
+        np.maximum(np.asarray(xg_home, dtype=float), 0.0),
+        np.maximum(np.asarray(xg_away, dtype=float), 0.0),
+    )
+    xg_total = xg_home + xg_away
+
+    # Sum far enough into the tail that the dropped mass is below double precision.
+    peak = float(xg_total.max(initial=0.0))
+    cutoff = max(int(math.ceil(peak + 10.0 * math.sqrt(peak) + 10.0)), int(max(lines, default=0.0)))
+    home_pmf, away_pmf, total_pmf = _poisson_pmf_table(np.stack([xg_home, xg_away, xg_total]), cutoff)
+    home_above = np.maximum(1.0 - np.cumsum(home_pmf, axis=-1), 0.0)
+
+    p_draw = np.minimum(np.einsum("...k,...k->...", away_pmf, home_pmf), 1.0)
+    p_home = np.minimum(np.einsum("...k,...k->...", away_pmf, home_above), 1.0 - p_draw)
+    p_away = 1.0 - p_home - p_draw
+
+    btts_yes = np.expm1(-xg_home) * np.expm1(-xg_away)
+
+    if rho:
+        nil_nil = home_pmf[..., 0] * away_pmf[..., 0]
+        one_one = home_pmf[..., 1] * away_pmf[..., 1]
+        p_home = p_home + rho * xg_away * home_pmf[..., 1] * away_pmf[..., 0]
+        p_draw = p_draw - rho * (xg_home * xg_away * nil_nil + one_one)
+        p_away = 1.0 - p_home - p_draw
+        btts_yes = btts_yes - rho * one_one
+        # 0-0 and 1-1 each lose rho * h * a * P(0-0); 1-0 and 0-1 together gain twice that.
+        shift = rho * xg_home * xg_away * nil_nil
+        total_pmf = total_pmf.copy()
+        total_pmf[..., 0] -= shift
+        total_pmf[..., 1] += 2.0 * shift
+        total_pmf[..., 2] -= shift
+
+    totals = {}
+    total_cdf = np.minimum(np.cumsum(total_pmf, axis=-1), 1.0)
+    for line in lines:
+        whole = int(math.floor(line))
+        if line == whole:
+            under = total_cdf[..., whole - 1] if whole > 0 else np.zeros_like(xg_total)
+            push = total_cdf[..., whole] - under
+        else:
+            under = total_cdf[..., whole]
+            push = np.zeros_like(xg_total)
+        totals[line] = {"over": 1.0 - under - push, "under": under, "push": push}
+
+    def _out(value):
+        return float(value) if scalar else value
+
+    return {
+        "home": _out(p_home),
+        "draw": _out(p_draw),
+        "away": _out(p_away),
+        "btts_yes": _out(btts_yes),
+        "btts_no": _out(1.0 - btts_yes),
+        "totals": {
+            line: {key: _out(value) for key, value in probs.items()}
+            for line, probs in totals.items()
+        },
+    }
+
+
+def _settle_over_lines(cdf: np.ndarray, lines: np.ndarray, start: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Settle "over the line" bets on an integer variable for many lines at once.
+
+    Whole lines push when the variable lands on the line; quarter lines are
+    split into half stakes on the two neighbouring lines (e.g. 2.25 is half on
+    2.0 and half on 2.5), so their win/push/lose are the average of the halves.
+
+    Args:
+        cdf: Cumulative distribution where ``cdf[k - start]`` is P(X <= k)
+        lines: Lines to settle (multiples of 0.25)
+        start: Value of the variable at ``cdf[0]``
+
+    Returns:
+        Tuple of (win, push, lose) arrays, one element per line
+    """
+    quarter = np.round(lines * 4) % 2 == 1
+    # Prepend P(X <= start - 1) = 0 and clamp lookups beyond the support to the last value.
+    padded = np.concatenate(([0.0], np.minimum(cdf, 1.0)))
+    last = padded.size - 1
+
+    win = push = lose = 0.0
+    for half in (np.where(quarter, lines - 0.25, lines), np.where(quarter, lines + 0.25, lines)):
+        floors = np.floor(half)
+        index = floors.astype(int) - start + 1
+        at_or_below = padded[np.minimum(np.maximum(index, 0), last)]
+        below = np.where(half == floors, padded[np.minimum(np.maximum(index - 1, 0), last)], at_or_below)
+        win = win + 0.5 * (1.0 - at_or_below)
+        push = push + 0.5 * np.maximum(at_or_below - below, 0.0)
+        lose = lose + 0.5 * below
+    return win, push, lose
+
+
+def _line_odds(win: float, push: float) -> float:
+    """Fair decimal odds for a line bet whose stake is returned with probability ``push``."""
+    if win <= 0:
+        return float("inf")
+    return (1.0 - push) / win
+
+
+def _two_way_ladder(
+    cdf: np.ndarray, lines: np.ndarray, start: int, over_key: str, under_key: str
+) -> Dict[float, Dict[str, float]]:
+    """Build ``{line: {<over>_prob, <under>_prob, push_prob, <over>_odds, <under>_odds}}``."""
+    win, push, lose = _settle_over_lines(cdf, lines, start)
+    ladder = {}
+    for line, p_over, p_push, p_under in zip(lines.tolist(), win.tolist(), push.tolist(), lose.tolist()):
+        ladder[line] = {
+            f"{over_key}_prob": p_over,
+            f"{under_key}_prob": p_under,
+            "push_prob": p_push,
+            f"{over_key}_odds": _line_odds(p_over, p_push),
+            f"{under_key}_odds": _line_odds(p_under, p_push),
+        }
+    return ladder
+
+
+def _validate_lines(lines: Sequence[float], name: str) -> np.ndarray:
+    """Convert market lines to an array, rejecting lines that are not multiples of 0.25."""
+    quarters = np.asarray(lines, dtype=float).reshape(-1) * 4
+    rounded = np.round(quarters)
+    if np.abs(quarters - rounded).max(initial=0.0) > 1e-9:
+        raise ValueError(f"{name} must be multiples of 0.25, got {list(lines)}")
+    return rounded / 4
+
+
+def project_markets(
+    goal_matrix: np.ndarray,
+    total_lines: Sequence[float] = TOTAL_LINES,
+    handicap_lines: Sequence[float] = HANDICAP_LINES,
+    team_total_lines: Sequence[float] = TEAM_TOTAL_LINES,
+    max_correct_score: int = 5,
+) -> Dict[str, object]:
+    """Price a full market ladder from a single score matrix.
+
+    The matrix is reduced once to the total-goals, goal-difference and
+    per-team distributions; every line is then read from their cumulative
+    sums, so adding lines costs an index lookup rather than another pass
+    over the matrix. Lines use Asian settlement: whole lines can push and
+    quarter lines are split across the neighbouring half and whole lines.
+    Fair odds for lines are ``(1 - push) / win``.
+
+    Args:
+        goal_matrix: Array where ``goal_matrix[i, j]`` is P(home=i, away=j)
+        total_lines: Match Over/Under lines
+        handicap_lines: Asian handicap lines from the home team's perspective
+            (``-0.5`` means the home team gives half a goal)
+        team_total_lines: Over/Under lines for each team's goals
+        max_correct_score: Largest per-team score listed individually in the
+            correct-score grid; the remaining mass is reported as ``"other"``
+
+    Returns:
+        Dictionary with ``totals``, ``asian_handicap``, ``team_totals``
+        (``home``/``away``), ``double_chance`` and ``correct_score`` markets
+
+    Raises:
+        ValueError: If the matrix is not square or a line is not a multiple of 0.25
+    """
+    goal_matrix = np.asarray(goal_matrix, dtype=float)
+    if goal_matrix.ndim != 2 or goal_matrix.shape[0] != goal_matrix.shape[1]:
+        raise ValueError(f"Score matrix must be square, got shape {goal_matrix.shape}")
+    total_lines = _validate_lines(total_lines, "Total lines")
+    handicap_lines = _validate_lines(handicap_lines, "Handicap lines")
+    team_total_lines = _validate_lines(team_total_lines, "Team total lines")
+
+    total_mass = goal_matrix.sum()
+    if total_mass > 0:
+        goal_matrix = goal_matrix / total_mass
+    size = goal_matrix.shape[0]
+    goals = np.arange(size)
+
+    total_cdf = np.cumsum(_matrix_total_goals(goal_matrix))
+    difference_cdf = np.cumsum(
+        np.bincount(np.subtract.outer(goals, goals).ravel() + size - 1, weights=goal_matrix.ravel(), minlength=2 * size - 1)
+    )
+    home_cdf = np.cumsum(goal_matrix.sum(axis=1))
+    away_cdf = np.cumsum(goal_matrix.sum(axis=0))
+
+    # Home covers handicap h when (home - away) + h > 0, i.e. the difference is over -h.
+    handicap = _two_way_ladder(difference_cdf, -handicap_lines, 1 - size, "home", "away")
+    asian_handicap = {
+        float(line): handicap[float(-line)] for line in handicap_lines.tolist()
+    }
+
+    p_away = float(difference_cdf[size - 2]) if size > 1 else 0.0
+    p_draw = float(difference_cdf[size - 1]) - p_away
+    p_home = 1.0 - p_away - p_draw
+    double_chance = {}
+    for key, prob in (("home_draw", p_home + p_draw), ("draw_away", p_draw + p_away), ("home_away", p_home + p_away)):
+        double_chance[f"{key}_prob"] = prob
+        double_chance[f"{key}_odds"] = _line_odds(prob, 0.0)
+
+    shown = min(max(int(max_correct_score), 0), size - 1) + 1
+    correct_score = {
+        f"{home}-{away}": float(goal_matrix[home, away]) for home in range(shown) for away in range(shown)
+    }
+    correct_score["other"] = max(1.0 - float(goal_matrix[:shown, :shown].sum()), 0.0)
+
+    return {
+        "totals": _two_way_ladder(total_cdf, total_lines, 0, "over", "under"),
+        "asian_handicap": asian_handicap,
+        "team_totals": {
+            "home": _two_way_ladder(home_cdf, team_total_lines, 0, "over", "under"),
+            "away": _two_way_ladder(away_cdf, team_total_lines, 0, "over", "under"),
+        },
+        "double_chance": double_chance,
+        "correct_score": correct_score,
+    }
+
+
 def calculate_poisson_markets_from_dnb(
     home_dnb_odds: float,
     away_dnb_odds: float,
     avg_league_goals: float,
     beta: float = 0.5,
     max_goals: int = 15,
+    engine: str = ENGINE_NUMPY,
+    tol: float = 1e-6,
+    use_split_table: bool = False,
+    strict: bool = False,
+    matrix_free: bool = False,
+    include_matrix: bool = False,
+    include_ladder: bool = False,
+    rho: float = 0.0,
 ) -> Dict[str, object]:
     """Generate Poisson-based odds that align with the supplied DNB prices.
 
@@ -231,6 +1031,23 @@ def calculate_poisson_markets_from_dnb(
         avg_league_goals: Average goals per match in the league (must be non-negative)
         beta: Weight for imbalance adjustment (default: 0.5, range: 0.0-1.0)
         max_goals: Maximum goals to consider in distribution (default: 15, minimum: 1)
+        engine: ``"numpy"`` (default) builds the score matrix as an outer product and
+            reads markets from triangular/diagonal sums; ``"python"`` uses the
+            reference pure-Python loops
+        tol: Tolerance on the DNB home probability for the strength-split solver
+        use_split_table: Interpolate the split from :class:`StrengthSplitTable`
+            instead of solving for it (NumPy engine only)
+        strict: With ``use_split_table``, polish the interpolated split with the
+            exact solver until ``tol`` is met
+        matrix_free: Price the markets from the Skellam/Poisson closed forms in
+            :func:`skellam_market_probabilities` instead of a score matrix
+        include_matrix: Also return the ``(max_goals + 1)``-square score matrix
+            under ``"score_matrix"`` (e.g. for display)
+        include_ladder: Also return the full market ladder from
+            :func:`project_markets` under ``"ladder"``
+        rho: Dixon-Coles low-score dependence (``0`` = independent scores, NumPy
+            engine only). The split is solved under the corrected matrix, so the
+            DNB target is still matched; a split-table lookup only seeds the solver
 
     Returns:
         Dictionary containing calculated odds, probabilities, and distributions
@@ -264,6 +1081,14 @@ def calculate_poisson_markets_from_dnb(
         logger.error(f"Invalid max_goals: {max_goals}")
         raise TypeError(f"Max goals must be an integer: {e}") from e
 
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+    if use_split_table and engine != ENGINE_NUMPY:
+        raise ValueError("The strength split table requires the numpy engine")
+    rho = _validate_rho(rho)
+    if rho and engine != ENGINE_NUMPY:
+        raise ValueError("The Dixon-Coles correction requires the numpy engine")
+
     # Validate ranges
     if avg_goals < 0:
         logger.warning(f"Negative avg_league_goals ({avg_goals}) will be treated as 0")
@@ -290,42 +1115,59 @@ def calculate_poisson_markets_from_dnb(
     imbalance = abs(pi_home - 0.5)
     lambda_total = avg_goals * (1.0 + beta * imbalance)
 
-    s, home_dist, away_dist = _solve_strength_split(pi_home, lambda_total, max_goals)
+    table_split = float("nan")
+    if use_split_table and lambda_total > 0 and 0 < pi_home < 1:
+        table_split = float(get_strength_split_table(max_goals).lookup(pi_home, lambda_total))
+
+    if rho:
+        # The table is built for independent scores, so it can only seed the solver.
+        s, home_dist, away_dist, solver_iterations = _newton_strength_split(
+            pi_home,
+            lambda_total,
+            max_goals,
+            tol=tol,
+            initial_split=None if math.isnan(table_split) else table_split,
+            rho=rho,
+        )
+    elif math.isnan(table_split):
+        s, home_dist, away_dist, solver_iterations = _STRENGTH_SPLIT_SOLVERS[engine](
+            pi_home, lambda_total, max_goals, tol=tol
+        )
+    elif strict:
+        s, home_dist, away_dist, solver_iterations = _newton_strength_split(
+            pi_home, lambda_total, max_goals, tol=tol, initial_split=table_split
+        )
+    else:
+        s = table_split
+        home_dist = _build_poisson_array(lambda_total * s, max_goals)
+        away_dist = _build_poisson_array(lambda_total * (1.0 - s), max_goals)
+        solver_iterations = 0
     xg_home = lambda_total * s
     xg_away = lambda_total * (1.0 - s)
 
-    goal_matrix: Dict[Tuple[int, int], float] = {}
-    p_home = 0.0
-    p_draw = 0.0
-    p_away = 0.0
-    for i, p_i in enumerate(home_dist):
-        for j, p_j in enumerate(away_dist):
-            prob = p_i * p_j
-            goal_matrix[(i, j)] = prob
-            if i > j:
-                p_home += prob
-            elif i == j:
-                p_draw += prob
-            else:
-                p_away += prob
-
-    total = p_home + p_draw + p_away
-    if total > 0:
-        p_home /= total
-        p_draw /= total
-        p_away /= total
+    goal_matrix = None
+    if matrix_free:
+        closed_form = skellam_market_probabilities(xg_home, xg_away, rho=rho)
+        p_home, p_draw, p_away = closed_form["home"], closed_form["draw"], closed_form["away"]
+        p_under25 = closed_form["totals"][2.5]["under"]
+        p_btts = closed_form["btts_yes"]
+    elif engine == ENGINE_NUMPY:
+        goal_matrix = dixon_coles_adjust(np.outer(home_dist, away_dist), xg_home, xg_away, rho)
+        p_home, p_draw, p_away = _matrix_outcome_probabilities(goal_matrix)
+        p_under25 = float(_matrix_total_goals(goal_matrix)[:3].sum())
+        p_btts = float(goal_matrix[1:, 1:].sum())
     else:
-        p_home = p_away = 0.0
-        p_draw = 1.0
+        p_home, p_draw, p_away, p_under25, p_btts = _python_market_probabilities(home_dist, away_dist)
+
+    if (include_matrix or include_ladder) and goal_matrix is None:
+        goal_matrix = dixon_coles_adjust(np.outer(home_dist, away_dist), xg_home, xg_away, rho)
+    if isinstance(home_dist, np.ndarray):
+        home_dist = home_dist.tolist()
+        away_dist = away_dist.tolist()
 
-    total_goals = _total_goals_distribution(goal_matrix)
-    p_under25 = sum(prob for goals, prob in total_goals.items() if goals <= 2)
     p_under25 = min(max(p_under25, 0.0), 1.0)
     p_over25 = 1.0 - p_under25
 
-    p_home_clean = home_dist[0] if home_dist else 0.0
-    p_away_clean = away_dist[0] if away_dist else 0.0
-    p_btts = 1.0 - (p_home_clean + p_away_clean - (p_home_clean * p_away_clean))
     p_btts = min(max(p_btts, 0.0), 1.0)
     p_no_btts = 1.0 - p_btts
 
@@ -337,7 +1179,7 @@ def calculate_poisson_markets_from_dnb(
             return float("inf")
         return 1.0 / prob
 
-    return {
+    result = {
         "lambda_total": lambda_total,
         "xg_home": xg_home,
         "xg_away": xg_away,
@@ -367,4 +1209,590 @@ def calculate_poisson_markets_from_dnb(
         "away_distribution": away_dist,
         "pi_home_target": pi_home,
         "pi_home_model": pi_model,
+        "solver_iterations": solver_iterations,
     }
+    if include_matrix:
+        result["score_matrix"] = goal_matrix
+    if include_ladder:
+        result["ladder"] = project_markets(goal_matrix)
+    return result
+
+
+@dataclass(frozen=True)
+class BatchPricingResult:
+    """Fair market probabilities for a batch of fixtures (one array element per fixture)."""
+
+    home: np.ndarray
+    draw: np.ndarray
+    away: np.ndarray
+    dnb_home: np.ndarray
+    dnb_away: np.ndarray
+    over25: np.ndarray
+    under25: np.ndarray
+    btts_yes: np.ndarray
+    btts_no: np.ndarray
+    lambda_total: np.ndarray
+    xg_home: np.ndarray
+    xg_away: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.home)
+
+
+def _scatter_batch_result(result: BatchPricingResult, mask: np.ndarray) -> BatchPricingResult:
+    """Spread a result priced for ``mask``'s True positions over the full batch, NaN elsewhere."""
+    spread = {}
+    for field in fields(BatchPricingResult):
+        values = np.full(mask.shape, np.nan)
+        values[mask] = getattr(result, field.name)
+        spread[field.name] = values
+    return BatchPricingResult(**spread)
+
+
+def _build_poisson_rows(lams: np.ndarray, max_goals: int) -> np.ndarray:
+    """Return one truncated Poisson distribution per lambda, stacked as rows.
+
+    Args:
+        lams: 1-D array of Poisson parameters
+        max_goals: Maximum number of goals to consider
+
+    Returns:
+        Array of shape ``(len(lams), max_goals + 1)`` whose rows sum to one
+    """
+    lams = np.maximum(np.asarray(lams, dtype=float), 0.0)
+    terms = np.empty((lams.shape[0], max_goals))
+    terms[:, 0] = np.exp(-lams)
+    terms[:, 1:] = lams[:, None] / np.arange(1, max_goals)
+    head = np.cumprod(terms, axis=1)
+    tail = np.maximum(1.0 - head.sum(axis=1), 0.0)
+
+    rows = np.concatenate([head, tail[:, None]], axis=1)
+    total = rows.sum(axis=1, keepdims=True)
+    degenerate = total[:, 0] <= 0
+    if degenerate.any():
+        rows[degenerate] = 0.0
+        rows[degenerate, 0] = 1.0
+        total[degenerate] = 1.0
+    return rows / total
+
+
+def _solve_strength_split_batch(
+    pi_home: np.ndarray,
+    lambda_total: np.ndarray,
+    max_goals: int,
+    tol: float = 1e-6,
+    initial_splits: Optional[np.ndarray] = None,
+    rho: float = 0.0,
+) -> np.ndarray:
+    """Run the safeguarded Newton solver for every fixture in the batch at once.
+
+    Fixtures drop out of the active set as soon as they converge, so later
+    iterations only rebuild distributions for the stragglers.
+
+    Args:
+        pi_home: Target home win probabilities (excluding draws)
+        lambda_total: Total expected goals per fixture
+        max_goals: Maximum goals to consider
+        tol: Absolute tolerance on the conditional home win probability
+        initial_splits: Optional starting points; NaN entries start from ``pi_home``
+        rho: Dixon-Coles dependence parameter the targets are matched under
+
+    Returns:
+        Array of strength splits, ``0.5`` where the inputs are degenerate
+    """
+    eps = 1e-6
+    n_fixtures = pi_home.shape[0]
+    splits = np.full(n_fixtures, 0.5)
+    lower = np.full(n_fixtures, eps)
+    upper = np.full(n_fixtures, 1.0 - eps)
+    active = np.flatnonzero((lambda_total > 0) & (pi_home > 0) & (pi_home < 1))
+    start = pi_home if initial_splits is None else np.where(np.isnan(initial_splits), pi_home, initial_splits)
+    splits[active] = np.clip(start[active], eps, 1.0 - eps)
+
+    max_iterations = 50
+    for _ in range(max_iterations):
+        if active.size == 0:
+            break
+        current = splits[active]
+        cond, deriv, _, _ = _conditional_home_win_with_derivative(
+            current, lambda_total[active], max_goals, rho
+        )
+        residual = cond - pi_home[active]
+
+        too_high = residual > 0
+        upper[active[too_high]] = current[too_high]
+        lower[active[~too_high]] = current[~too_high]
+
+        lo, hi = lower[active], upper[active]
+        safe_deriv = np.where(deriv > 0, deriv, 1.0)
+        candidate = np.where(deriv > 0, current - residual / safe_deriv, lo - 1.0)
+        inside = (candidate > lo) & (candidate < hi)
+        next_split = np.where(inside, candidate, 0.5 * (lo + hi))
+
+        done = (np.abs(residual) < tol) | (hi - lo < 1e-12)
+        splits[active[~done]] = next_split[~done]
+        active = active[~done]
+
+    return splits
+
+
+def _bradley_terry_davidson_batch(
+    home_ratings: np.ndarray,
+    away_ratings: np.ndarray,
+    draw_rates: np.ndarray,
+    avg_goals: np.ndarray,
+    draw_weight: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized Bradley-Terry-Davidson 1X2 step used by ``calculate_outcome_probabilities``."""
+    rating_diff = home_ratings - away_ratings
+    strength_ratio = 10 ** (rating_diff / 400)
+
+    mu = np.maximum(avg_goals, 0.0)
+    gap_ratio = (
+        np.abs(rating_diff) / config.ELO_GOAL_SCALE_DIVISOR
+        if config.ELO_GOAL_SCALE_DIVISOR
+        else np.zeros_like(rating_diff)
+    )
+    goal_scale = 1 + np.minimum(gap_ratio * config.ELO_GOAL_SCALE_FACTOR, config.ELO_GOAL_SCALE_CAP)
+    mu_adjusted = mu * goal_scale
+    poisson_draw = np.exp(-mu_adjusted) * np.i0(mu_adjusted)
+
+    alpha = 0.0 if draw_weight is None else min(max(draw_weight, 0.0), 1.0)
+    observed_draw = np.clip(draw_rates, 0.0, 0.95)
+    blended_draw = alpha * observed_draw + (1 - alpha) * poisson_draw
+    blended_draw = np.clip(blended_draw, 1e-6, 0.999999)
+
+    nu = blended_draw / (1 - blended_draw)
+    nu = np.maximum(nu * max(config.DRAW_RATE_SCALE, 1e-6), 0.0)
+
+    denominator = strength_ratio + 1 + (2 * nu)
+    return strength_ratio / denominator, (2 * nu) / denominator, 1 / denominator
+
+
+def price_fixtures_batch(
+    home_ratings,
+    away_ratings,
+    draw_rates,
+    avg_goals,
+    draw_weight: float = config.DRAW_OBS_WEIGHT,
+    beta: float = 0.5,
+    max_goals: int = 15,
+    use_split_table: bool = False,
+    strict: bool = False,
+    matrix_free: bool = False,
+    rho: float = 0.0,
+    cache: Optional[PricingCache] = None,
+) -> BatchPricingResult:
+    """Price many fixtures at once from Elo ratings and league context.
+
+    This is the array equivalent of calling ``calculate_outcome_probabilities``
+    and then :func:`calculate_poisson_markets_from_dnb` with the fair DNB odds for
+    each fixture. ``draw_rates`` and ``avg_goals`` may be scalars, in which case
+    they are broadcast across the batch (the usual single-league scan).
+
+    Args:
+        home_ratings: Home team Elo ratings
+        away_ratings: Away team Elo ratings
+        draw_rates: Observed league draw rates
+        avg_goals: League average goals per match
+        draw_weight: Weight for blending observed draw rate
+        beta: Weight for imbalance adjustment of the goal total
+        max_goals: Maximum goals to consider in distributions
+        use_split_table: Interpolate splits from :class:`StrengthSplitTable`;
+            fixtures outside the grid are still solved exactly
+        strict: With ``use_split_table``, polish interpolated splits with the solver
+        matrix_free: Price from the Skellam/Poisson closed forms instead of
+            building an ``(N, max_goals + 1, max_goals + 1)`` score tensor
+        rho: Dixon-Coles low-score dependence applied to every fixture; splits
+            are solved under the correction (table lookups only seed the solver)
+        cache: Optional :class:`PricingCache`; fixtures are looked up by quantized
+            (rating difference, draw rate, average goals) and only misses are priced
+
+    Returns:
+        BatchPricingResult with one element per fixture; every field is NaN
+        for fixtures whose home or away rating is NaN
+
+    Raises:
+        ValueError: If the inputs cannot be broadcast to a common 1-D shape
+        TypeError: If inputs cannot be converted to floats
+    """
+    rho = _validate_rho(rho)
+    try:
+        home_ratings, away_ratings, draw_rates, avg_goals = np.broadcast_arrays(
+            np.asarray(home_ratings, dtype=float),
+            np.asarray(away_ratings, dtype=float),
+            np.asarray(draw_rates, dtype=float),
+            np.asarray(avg_goals, dtype=float),
+        )
+    except (ValueError, TypeError) as e:
+        logger.error(f"Invalid batch pricing inputs: {e}")
+        raise
+    if home_ratings.ndim != 1:
+        raise ValueError("Batch pricing inputs must be one-dimensional")
+
+    rated = ~(np.isnan(home_ratings) | np.isnan(away_ratings))
+    if not rated.all():
+        # A missing rating has no fair price; don't let it pass as an even matchup
+        result = price_fixtures_batch(
+            home_ratings[rated],
+            away_ratings[rated],
+            draw_rates[rated],
+            avg_goals[rated],
+            draw_weight=draw_weight,
+            beta=beta,
+            max_goals=max_goals,
+            use_split_table=use_split_table,
+            strict=strict,
+            matrix_free=matrix_free,
+            rho=rho,
+            cache=cache,
+        )
+        return _scatter_batch_result(result, rated)
+
+    max_goals = max(int(max_goals), 1)
+    draw_rates = np.where(np.isnan(draw_rates), config.DEFAULT_DRAW_RATE, draw_rates)
+    avg_goals = np.where(np.isnan(avg_goals), config.DEFAULT_AVG_GOALS, avg_goals)
+
+    if cache is not None:
+        return _price_fixtures_cached(
+            cache,
+            home_ratings,
+            away_ratings,
+            draw_rates,
+            avg_goals,
+            draw_weight=draw_weight,
+            beta=beta,
+            max_goals=max_goals,
+            use_split_table=use_split_table,
+            strict=strict,
+            matrix_free=matrix_free,
+            rho=rho,
+        )
+
+    p_home_bt, _, p_away_bt = _bradley_terry_davidson_batch(
+        home_ratings, away_ratings, draw_rates, avg_goals, draw_weight
+    )
+    decisive = p_home_bt + p_away_bt
+    dnb_home = np.where(decisive > 0, p_home_bt / np.where(decisive > 0, decisive, 1.0), 0.5)
+    dnb_away = 1.0 - dnb_home
+
+    # Mirror the fair DNB odds round-trip (1 / max(p, 1e-6)) of the scalar path.
+    min_prob = 1e-6
+    implied_home = np.maximum(dnb_home, min_prob)
+    implied_away = np.maximum(dnb_away, min_prob)
+    pi_home = implied_home / (implied_home + implied_away)
+
+    lambda_total = np.maximum(avg_goals, 0.0) * (1.0 + float(beta) * np.abs(pi_home - 0.5))
+    if use_split_table:
+        table_splits = get_strength_split_table(max_goals).lookup(pi_home, lambda_total)
+        if strict or rho:
+            splits = _solve_strength_split_batch(
+                pi_home, lambda_total, max_goals, initial_splits=table_splits, rho=rho
+            )
+        else:
+            splits = table_splits
+            missing = np.flatnonzero(np.isnan(table_splits))
+            if missing.size:
+                splits[missing] = _solve_strength_split_batch(
+                    pi_home[missing], lambda_total[missing], max_goals
+                )
+    else:
+        splits = _solve_strength_split_batch(pi_home, lambda_total, max_goals, rho=rho)
+    xg_home = lambda_total * splits
+    xg_away = lambda_total * (1.0 - splits)
+
+    if matrix_free:
+        closed_form = skellam_market_probabilities(xg_home, xg_away, rho=rho)
+        under25 = closed_form["totals"][2.5]["under"]
+        return BatchPricingResult(
+            home=closed_form["home"],
+            draw=closed_form["draw"],
+            away=closed_form["away"],
+            dnb_home=dnb_home,
+            dnb_away=dnb_away,
+            over25=1.0 - under25,
+            under25=under25,
+            btts_yes=closed_form["btts_yes"],
+            btts_no=closed_form["btts_no"],
+            lambda_total=lambda_total,
+            xg_home=xg_home,
+            xg_away=xg_away,
+        )
+
+    home_dists = _build_poisson_rows(xg_home, max_goals)
+    away_dists = _build_poisson_rows(xg_away, max_goals)
+    goal_matrices = home_dists[:, :, None] * away_dists[:, None, :]
+    if rho:
+        goal_matrices = dixon_coles_adjust(goal_matrices, xg_home, xg_away, rho)
+
+    p_home = np.tril(goal_matrices, -1).sum(axis=(1, 2))
+    p_draw = np.trace(goal_matrices, axis1=1, axis2=2)
+    p_away = np.triu(goal_matrices, 1).sum(axis=(1, 2))
+    total = p_home + p_draw + p_away
+    p_home, p_draw, p_away = p_home / total, p_draw / total, p_away / total
+
+    goal_sums = np.add.outer(np.arange(max_goals + 1), np.arange(max_goals + 1))
+    under25 = np.clip(goal_matrices[:, goal_sums <= 2].sum(axis=1), 0.0, 1.0)
+    btts_yes = np.clip(goal_matrices[:, 1:, 1:].sum(axis=(1, 2)), 0.0, 1.0)
+
+    return BatchPricingResult(
+        home=p_home,
+        draw=p_draw,
+        away=p_away,
+        dnb_home=dnb_home,
+        dnb_away=dnb_away,
+        over25=1.0 - under25,
+        under25=under25,
+        btts_yes=btts_yes,
+        btts_no=1.0 - btts_yes,
+        lambda_total=lambda_total,
+        xg_home=xg_home,
+        xg_away=xg_away,
+    )
+
+
+# Config constants the pricing functions read at call time; cached prices are
+# dropped whenever any of them changes.
+PRICING_CONFIG_KEYS = (
+    "DEFAULT_DRAW_RATE",
+    "DEFAULT_AVG_GOALS",
+    "DRAW_RATE_SCALE",
+    "ELO_GOAL_SCALE_FACTOR",
+    "ELO_GOAL_SCALE_DIVISOR",
+    "ELO_GOAL_SCALE_CAP",
+)
+
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class PricingCacheStats:
+    """Snapshot of :class:`PricingCache` counters."""
+
+    hits: int
+    misses: int
+    invalidations: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class PricingCache:
+    """Bounded, thread-safe LRU cache for the pure pricing functions.
+
+    Keys are tuples whose float members are rounded to ``precision`` decimals,
+    so inputs that differ by less than the quantization step share an entry
+    (the cached value is the one computed for the first such input). Entries
+    are dropped when a constant in ``config_keys`` changes, or on
+    :meth:`invalidate`. Cached values are shared between callers and must be
+    treated as read-only.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = config.PRICING_CACHE_SIZE,
+        precision: int = config.PRICING_CACHE_PRECISION,
+        config_keys: Sequence[str] = PRICING_CONFIG_KEYS,
+    ):
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries before the least recently used is evicted
+            precision: Decimal places float key members are rounded to
+            config_keys: Names of ``config`` constants whose change invalidates the cache
+
+        Raises:
+            ValueError: If ``maxsize`` is not positive
+        """
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+        self.maxsize = int(maxsize)
+        self.precision = int(precision)
+        self.config_keys = tuple(config_keys)
+        self._entries: "OrderedDict[Tuple, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint = self._config_fingerprint()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def _config_fingerprint(self) -> Tuple:
+        return tuple(getattr(config, name, None) for name in self.config_keys)
+
+    def _check_config(self) -> None:
+        """Drop every entry if a watched config constant changed (lock held)."""
+        fingerprint = self._config_fingerprint()
+        if fingerprint != self._fingerprint:
+            logger.info("Pricing config changed, invalidating pricing cache")
+            self._entries.clear()
+            self._fingerprint = fingerprint
+            self._invalidations += 1
+
+    def make_key(self, *parts) -> Tuple:
+        """Build a cache key, rounding float members to the configured precision."""
+        return tuple(
+            round(part, self.precision) + 0.0 if isinstance(part, float) else part for part in parts
+        )
+
+    def get(self, key: Tuple, default=None):
+        """Return the entry for ``key`` (marking it recently used) and count the hit or miss."""
+        with self._lock:
+            self._check_config()
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def get_many(self, keys: Sequence[Tuple]) -> List[object]:
+        """Look up several keys under one lock; missing entries come back as ``None``."""
+        values = []
+        with self._lock:
+            self._check_config()
+            for key in keys:
+                value = self._entries.get(key, _MISSING)
+                if value is _MISSING:
+                    self._misses += 1
+                    values.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    values.append(value)
+        return values
+
+    def put(self, key: Tuple, value) -> None:
+        """Store ``value`` under ``key``, evicting the least recently used entry if full."""
+        with self._lock:
+            self._check_config()
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Tuple, compute):
+        """Return the cached value for ``key``, calling ``compute()`` on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def invalidate(self) -> None:
+        """Drop all entries, e.g. after changing model constants at runtime."""
+        with self._lock:
+            self._entries.clear()
+            self._fingerprint = self._config_fingerprint()
+            self._invalidations += 1
+
+    def stats(self) -> PricingCacheStats:
+        """Return the current hit/miss/invalidation counters."""
+        with self._lock:
+            return PricingCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                invalidations=self._invalidations,
+                size=len(self._entries),
+                maxsize=self.maxsize,
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_pricing_cache: Optional[PricingCache] = None
+
+
+def get_pricing_cache() -> PricingCache:
+    """Get or create the shared pricing cache."""
+    global _pricing_cache
+    if _pricing_cache is None:
+        _pricing_cache = PricingCache()
+    return _pricing_cache
+
+
+def cached_poisson_markets_from_dnb(
+    home_dnb_odds: float,
+    away_dnb_odds: float,
+    avg_league_goals: float,
+    cache: Optional[PricingCache] = None,
+    **options,
+) -> Dict[str, object]:
+    """Memoized :func:`calculate_poisson_markets_from_dnb`.
+
+    Keyed on the quantized DNB home probability and league goals plus the
+    keyword ``options``, so repeated fixtures and Streamlit reruns skip the
+    split solve. Invalid inputs are not cached and raise as usual.
+
+    Args:
+        home_dnb_odds: Draw No Bet odds for home team
+        away_dnb_odds: Draw No Bet odds for away team
+        avg_league_goals: Average goals per match in the league
+        cache: Cache to use (defaults to :func:`get_pricing_cache`)
+        **options: Keyword arguments for :func:`calculate_poisson_markets_from_dnb`
+
+    Returns:
+        The (shared, read-only) market dictionary
+    """
+    if cache is None:
+        cache = get_pricing_cache()
+    try:
+        home_prob = 1.0 / float(home_dnb_odds) if home_dnb_odds else 0.0
+        away_prob = 1.0 / float(away_dnb_odds) if away_dnb_odds else 0.0
+        goals = float(avg_league_goals)
+    except (ValueError, TypeError, ZeroDivisionError):
+        return calculate_poisson_markets_from_dnb(home_dnb_odds, away_dnb_odds, avg_league_goals, **options)
+    pi_home = home_prob / (home_prob + away_prob) if home_prob > 0 and away_prob > 0 else 0.5
+
+    key = cache.make_key("poisson_markets", pi_home, goals, *sorted(options.items()))
+    return cache.get_or_compute(
+        key,
+        lambda: calculate_poisson_markets_from_dnb(home_dnb_odds, away_dnb_odds, avg_league_goals, **options),
+    )
+
+
+def _price_fixtures_cached(
+    cache: PricingCache,
+    home_ratings: np.ndarray,
+    away_ratings: np.ndarray,
+    draw_rates: np.ndarray,
+    avg_goals: np.ndarray,
+    **options,
+) -> BatchPricingResult:
+    """Serve :func:`price_fixtures_batch` rows from ``cache``, pricing only the misses.
+
+    Pricing depends on the ratings only through their difference, so that is
+    what the fixture key uses.
+    """
+    names = [field.name for field in fields(BatchPricingResult)]
+    option_key = tuple(sorted(options.items()))
+    keys = [
+        cache.make_key("fixture", diff, draw, goals, *option_key)
+        for diff, draw, goals in zip(
+            (home_ratings - away_ratings).tolist(), draw_rates.tolist(), avg_goals.tolist()
+        )
+    ]
+    rows = cache.get_many(keys)
+
+    missing = [index for index, row in enumerate(rows) if row is None]
+    if missing:
+        subset = np.asarray(missing)
+        priced = price_fixtures_batch(
+            home_ratings[subset], away_ratings[subset], draw_rates[subset], avg_goals[subset], **options
+        )
+        priced_rows = np.column_stack([getattr(priced, name) for name in names]).tolist()
+        for index, row in zip(missing, priced_rows):
+            rows[index] = tuple(row)
+            if not math.isnan(keys[index][1]):
+                cache.put(keys[index], rows[index])
+
+    table = np.array(rows, dtype=float).reshape(len(rows), len(names))
+    return BatchPricingResult(**{name: table[:, column] for column, name in enumerate(names)})
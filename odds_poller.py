@@ -0,0 +1,226 @@
+"""Background Kambi odds poller with a shared, thread-safe snapshot store."""
+
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import cached_property
+from typing import List, Optional
+
+import requests
+
+import config
+from kambi_client import (
+    KambiClient,
+    KambiMatch,
+    KambiServiceError,
+    MatchIndex,
+    SnapshotDiff,
+    diff_snapshots,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OddsSnapshot:
+    """Matches from one successful poll, with the delta from the poll before."""
+
+    matches: List[KambiMatch]  # Includes live matches; see matches_for()
+    fetched_at: datetime
+    version: int  # Increments with every published snapshot
+    diff: SnapshotDiff = field(default_factory=SnapshotDiff)
+    fetched_monotonic: float = field(default_factory=time.monotonic)
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was fetched."""
+        return max(time.monotonic() - self.fetched_monotonic, 0.0)
+
+    @cached_property
+    def index(self) -> MatchIndex:
+        """Fuzzy lookup index over the non-live matches, built on first use."""
+        return MatchIndex(self.matches_for(include_live=False))
+
+    def matches_for(self, include_live: bool = False) -> List[KambiMatch]:
+        """Return the snapshot's matches, optionally excluding live ones."""
+        if include_live:
+            return list(self.matches)
+        return [match for match in self.matches if match.state != "STARTED"]
+
+
+class OddsStore:
+    """Thread-safe holder of the latest odds snapshot and the last poll error."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._snapshot: Optional[OddsSnapshot] = None
+        self._last_error: Optional[Exception] = None
+
+    def publish(self, matches: List[KambiMatch]) -> OddsSnapshot:
+        """Replace the current snapshot, diffing it against the previous one."""
+        with self._condition:
+            previous = self._snapshot
+            snapshot = OddsSnapshot(
+                matches=list(matches),
+                fetched_at=datetime.now(),
+                version=previous.version + 1 if previous else 1,
+                diff=diff_snapshots(previous.matches if previous else [], matches),
+            )
+            self._snapshot = snapshot
+            self._last_error = None
+            self._condition.notify_all()
+        return snapshot
+
+    def record_error(self, error: Exception) -> None:
+        """Remember a failed poll; the previous snapshot stays available."""
+        with self._condition:
+            self._last_error = error
+
+    def latest(self) -> Optional[OddsSnapshot]:
+        """Return the most recent snapshot, or None before the first poll succeeds."""
+        with self._condition:
+            return self._snapshot
+
+    @property
+    def last_error(self) -> Optional[Exception]:
+        """Exception from the most recent poll, None if it succeeded."""
+        with self._condition:
+            return self._last_error
+
+    def wait_for_snapshot(
+        self, timeout: Optional[float] = None, newer_than: int = 0
+    ) -> Optional[OddsSnapshot]:
+        """
+        Block until a snapshot with version > newer_than is available.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+            newer_than: Version the caller already has (0 for any snapshot)
+
+        Returns:
+            The latest snapshot, which may still be older if the wait timed out
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._snapshot is not None and self._snapshot.version > newer_than,
+                timeout,
+            )
+            return self._snapshot
+
+
+class OddsPoller:
+    """Daemon thread that refreshes an OddsStore from Kambi on a jittered interval."""
+
+    def __init__(
+        self,
+        client: KambiClient,
+        store: Optional[OddsStore] = None,
+        interval: float = config.ODDS_POLL_INTERVAL,
+        jitter: float = config.ODDS_POLL_JITTER,
+        timeout: int = 15,
+    ):
+        """
+        Initialize the poller (call start() to begin polling).
+
+        Args:
+            client: Kambi client used for fetching
+            store: Store to publish snapshots to (default: a new OddsStore)
+            interval: Seconds between polls
+            jitter: Relative random spread of the interval (0.1 = +/-10%)
+            timeout: Request timeout in seconds
+
+        Raises:
+            ValueError: If interval is not positive or jitter is outside [0, 1)
+        """
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+        if not 0 <= jitter < 1:
+            raise ValueError(f"jitter must be in [0, 1), got {jitter}")
+        self.client = client
+        self.store = store if store is not None else OddsStore()
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the polling thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "OddsPoller":
+        """Start the polling thread if it is not already running."""
+        with self._lock:
+            if not self.is_running:
+                self._stopping.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="kambi-odds-poller", daemon=True
+                )
+                self._thread.start()
+                logger.info(
+                    f"Started Kambi odds poller (interval {self.interval:.0f}s, "
+                    f"jitter {self.jitter:.0%})"
+                )
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the polling thread and wait for it to exit."""
+        with self._lock:
+            thread = self._thread
+            self._stopping.set()
+            self._wake.set()
+        if thread is not None:
+            thread.join(timeout)
+
+    def refresh(self) -> None:
+        """Poll now instead of waiting for the next interval."""
+        self._wake.set()
+
+    def poll_once(self) -> Optional[OddsSnapshot]:
+        """
+        Fetch all matches and publish them.
+
+        Returns:
+            The new snapshot, or None if the fetch failed (the error is
+            recorded on the store and the previous snapshot is kept)
+        """
+        started = time.perf_counter()
+        try:
+            matches = list(
+                self.client.iter_all_football_matches(include_live=True, timeout=self.timeout)
+            )
+        except (requests.exceptions.RequestException, KambiServiceError, ValueError) as e:
+            logger.warning(f"Kambi odds poll failed: {e}")
+            self.store.record_error(e)
+            return None
+
+        snapshot = self.store.publish(matches)
+        _ = snapshot.index  # Build the lookup index here rather than in a page rerun
+        diff = snapshot.diff
+        logger.info(
+            f"Polled {len(matches)} Kambi matches in {time.perf_counter() - started:.2f}s "
+            f"(v{snapshot.version}: {len(diff.added)} added, {len(diff.changed)} changed, "
+            f"{len(diff.removed)} removed)"
+        )
+        return snapshot
+
+    def next_delay(self) -> float:
+        """Seconds until the next poll: the interval with random jitter applied."""
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            # Clear before polling so a refresh() requested mid-poll triggers another poll
+            self._wake.clear()
+            try:
+                self.poll_once()
+            except Exception as e:  # Keep polling whatever a single poll raises
+                logger.error(f"Unexpected error in Kambi odds poller: {e}", exc_info=True)
+                self.store.record_error(e)
+            self._wake.wait(self.next_delay())
@@ -0,0 +1,1229 @@
+"""soccer-rating.com scraper for the Elo rating tables shown in the app."""
+
+import gzip
+import hashlib
+import itertools
+import logging
+import os
+import pickle
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import lxml.html
+import pandas as pd
+import requests
+from lxml import etree
+from pandas.io.parsers import TextParser
+from requests.adapters import HTTPAdapter
+
+import config
+
+logger = logging.getLogger(__name__)
+
+LeagueKey = Tuple[str, str]  # (country, league code) as in config.LEAGUES_DATA
+
+
+def all_league_keys() -> List[LeagueKey]:
+    """Every (country, league) pair in config.LEAGUES_DATA, men's leagues first."""
+    return list(
+        dict.fromkeys(
+            (country, league)
+            for leagues_by_country in config.LEAGUES_DATA.values()
+            for country, leagues in leagues_by_country.items()
+            for league in leagues
+        )
+    )
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: at most `rate` acquisitions per second on average.
+
+    Up to `burst` acquisitions go through immediately after an idle period.
+    Callers reserve their slot under the lock and sleep outside it, so waiting
+    threads are released in arrival order at the configured rate.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialize the limiter with a full bucket.
+
+        Args:
+            rate: Sustained acquisitions per second
+            burst: Bucket size (acquisitions allowed back to back)
+            clock: Monotonic time source (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+
+        Raises:
+            ValueError: If rate or burst is not positive
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}")
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, sleeping until it is available.
+
+        Returns:
+            Seconds spent waiting
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+@dataclass
+class LeagueTables:
+    """Rating tables scraped for one league."""
+
+    country: str
+    league: str
+    home: Optional[pd.DataFrame] = None  # Team, Rating, URL
+    away: Optional[pd.DataFrame] = None  # Team, Rating, URL
+    league_table: Optional[pd.DataFrame] = None
+    fetched_at: datetime = field(default_factory=datetime.now)
+    latency: float = 0.0  # Seconds spent fetching and parsing
+    error: Optional[str] = None  # Failure description, None on success
+
+    @property
+    def ok(self) -> bool:
+        """Check if the league was scraped and has a home rating table."""
+        return self.error is None and self.home is not None and not self.home.empty
+
+    @property
+    def age(self) -> float:
+        """Seconds since the tables were fetched."""
+        return max((datetime.now() - self.fetched_at).total_seconds(), 0.0)
+
+    def as_tuple(
+        self,
+    ) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame], Optional[pd.DataFrame]]:
+        """Return (home, away, league_table), all None if the scrape failed."""
+        if not self.ok:
+            return None, None, None
+        return self.home, self.away, self.league_table
+
+    @cached_property
+    def home_index(self) -> Optional["EloTableIndex"]:
+        """Lookup index over the home ratings, built on first use."""
+        return EloTableIndex(self.home) if self.home is not None else None
+
+    @cached_property
+    def away_index(self) -> Optional["EloTableIndex"]:
+        """Lookup index over the away ratings, built on first use."""
+        return EloTableIndex(self.away) if self.away is not None else None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Indexes are cheap to rebuild; keep them out of the disk cache and snapshots
+        state = dict(self.__dict__)
+        state.pop("home_index", None)
+        state.pop("away_index", None)
+        return state
+
+
+@dataclass
+class PrefetchReport:
+    """Per-league outcome of a prefetch_leagues() run."""
+
+    results: Dict[LeagueKey, LeagueTables] = field(default_factory=dict)
+    elapsed: float = 0.0  # Wall-clock seconds for the whole run
+    workers: int = 0
+
+    @property
+    def failed(self) -> List[LeagueTables]:
+        """Leagues that could not be scraped."""
+        return [result for result in self.results.values() if not result.ok]
+
+    @property
+    def total_latency(self) -> float:
+        """Sum of per-league latencies (what a serial run would roughly take)."""
+        return sum(result.latency for result in self.results.values())
+
+    def slowest(self, count: int = 5) -> List[LeagueTables]:
+        """The `count` leagues that took longest."""
+        return sorted(self.results.values(), key=lambda result: result.latency, reverse=True)[
+            :count
+        ]
+
+    @property
+    def summary(self) -> str:
+        """One-line description of the run for logs and the UI."""
+        return (
+            f"{len(self.results) - len(self.failed)}/{len(self.results)} leagues in "
+            f"{self.elapsed:.1f}s ({self.total_latency:.1f}s of requests, {self.workers} workers)"
+        )
+
+
+@dataclass
+class RatingsPage:
+    """Tables extracted from one soccer-rating.com league page."""
+
+    home: Optional[pd.DataFrame] = None  # Home rating table (Team, Rating, URL)
+    away: Optional[pd.DataFrame] = None  # Away rating table (Team, Rating, URL)
+    league_table: Optional[pd.DataFrame] = None  # Standings, as pd.read_html would parse them
+
+
+LEAGUE_TABLE_COLUMNS = frozenset({"M", "P.", "Goals", "Home", "Away"})
+
+_WHITESPACE = re.compile(r"[\r\n]+|\s{2,}")  # pandas.io.html._RE_WHITESPACE
+_CHARSET = re.compile(r"charset=([^;\s]+)", re.IGNORECASE)
+_RATING_TABLES = etree.XPath(
+    "//table[contains(concat(' ', normalize-space(@class), ' '), ' rattab ')]"
+)
+# Row and cell selection mirrors pandas.read_html's lxml flavor
+_THEAD_ROWS = etree.XPath(".//thead//tr")
+_BODY_ROWS = etree.XPath(".//tbody//tr | ./tr")
+_TFOOT_ROWS = etree.XPath(".//tfoot//tr")
+_CELLS = etree.XPath("./td | ./th")
+_STYLE_ELEMENTS = etree.XPath(".//style")
+_STYLED_ELEMENTS = etree.XPath(".//*[@style]")
+
+
+def _text(element) -> str:
+    """
+    Element text as pandas.read_html reads cells.
+
+    The text is stripped, then newline runs and runs of two or more
+    whitespace characters become one space. A single interior space or
+    &nbsp; is kept as it is.
+    """
+    return _WHITESPACE.sub(" ", element.text_content().strip())
+
+
+def _is_hidden(element) -> bool:
+    """Check for an inline display:none style, the test read_html's displayed_only uses."""
+    return "display:none" in element.get("style", "").replace(" ", "")
+
+
+def _drop_hidden(table) -> None:
+    """Remove <style> elements and hidden descendants from a table, as displayed_only does."""
+    for element in _STYLE_ELEMENTS(table):
+        element.drop_tree()
+    for element in _STYLED_ELEMENTS(table):
+        if _is_hidden(element):
+            element.drop_tree()
+
+
+def _parse_document(content: Union[bytes, str], encoding: Optional[str] = None):
+    """Parse a page once into an lxml tree (bytes are decoded by lxml itself)."""
+    parser = (
+        lxml.html.HTMLParser(encoding=encoding) if encoding and isinstance(content, bytes) else None
+    )
+    return lxml.html.document_fromstring(content, parser=parser)
+
+
+def _rating_table(table) -> pd.DataFrame:
+    """Team, Rating and URL of every five-column row below a rating table's header."""
+    teams_data = []
+    for row in itertools.islice(table.iter("tr"), 1, None):
+        cols = list(row.iter("td"))
+        if len(cols) != 5:
+            continue
+        team_link = next(cols[1].iter("a"), None)
+        team_url = team_link.get("href") if team_link is not None else None
+        if team_url is None:
+            continue
+        teams_data.append(
+            {
+                "Team": team_url.split("/")[1].replace("-", " "),
+                "Rating": float(cols[4].text_content().strip()),
+                "URL": team_url,
+            }
+        )
+    return pd.DataFrame(teams_data)
+
+
+def _row_texts(rows) -> List[List[str]]:
+    """Cell texts per row, copying colspan/rowspan cells the way pandas.read_html does."""
+    all_texts = []
+    remainder: List[Tuple[int, str, int]] = []  # (column, text, rows still spanned)
+    for tr in rows:
+        texts: List[str] = []
+        next_remainder = []
+        index = 0
+        for td in _CELLS(tr):
+            while remainder and remainder[0][0] <= index:
+                prev_index, prev_text, prev_rowspan = remainder.pop(0)
+                texts.append(prev_text)
+                if prev_rowspan > 1:
+                    next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+                index += 1
+            text = _text(td)
+            rowspan = int(td.get("rowspan") or 1)
+            for _ in range(int(td.get("colspan") or 1)):
+                texts.append(text)
+                if rowspan > 1:
+                    next_remainder.append((index, text, rowspan - 1))
+                index += 1
+        for prev_index, prev_text, prev_rowspan in remainder:
+            texts.append(prev_text)
+            if prev_rowspan > 1:
+                next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+        all_texts.append(texts)
+        remainder = next_remainder
+    while remainder:
+        all_texts.append([text for _, text, _ in remainder])
+        remainder = [(i, text, span - 1) for i, text, span in remainder if span > 1]
+    return all_texts
+
+
+def _league_table(root) -> Optional[pd.DataFrame]:
+    """
+    First table whose single header row has the standings columns.
+
+    Hidden tables are skipped and hidden rows and cells are removed from each
+    candidate first, as read_html's default displayed_only=True does (this
+    modifies the tree). Only the header row of each candidate is read until
+    one matches. Its cells then go through pandas' TextParser so types, NaNs
+    and duplicate column names come out exactly as pd.read_html(...) would
+    produce them.
+    """
+    for table in list(root.iter("table")):  # Fixed up front, like read_html's table list
+        if _is_hidden(table):
+            continue
+        _drop_hidden(table)
+        header_rows = _THEAD_ROWS(table)
+        body_rows = _BODY_ROWS(table)
+        if not header_rows:
+            while body_rows and all(cell.tag == "th" for cell in _CELLS(body_rows[0])):
+                header_rows.append(body_rows.pop(0))
+        if len(header_rows) != 1:
+            continue  # read_html would build MultiIndex or integer columns
+        header = _row_texts(header_rows)
+        if not LEAGUE_TABLE_COLUMNS.issubset(header[0]):
+            continue
+
+        rows = header + _row_texts(body_rows) + _row_texts(_TFOOT_ROWS(table))
+        width = max(len(row) for row in rows)
+        rows = [row + [""] * (width - len(row)) for row in rows]
+        with TextParser(rows, header=0, thousands=",") as parser:
+            return parser.read()
+    return None
+
+
+def parse_ratings_page(
+    content: Union[bytes, str],
+    encoding: Optional[str] = None,
+    league_table: bool = True,
+) -> RatingsPage:
+    """
+    Extract the rating tables and standings from a league page in one parse.
+
+    The raw response body is parsed once with lxml; the rating tables are
+    located with a compiled XPath and the standings are read straight from
+    the same tree, without re-serializing the page for pandas.
+
+    Args:
+        content: Page body (bytes are decoded by lxml, honouring <meta charset>)
+        encoding: Charset declared by the server, if any
+        league_table: Also extract the standings table
+
+    Returns:
+        RatingsPage with whichever tables were found
+    """
+    root = _parse_document(content, encoding)
+    page = RatingsPage()
+    for table in _RATING_TABLES(root):
+        header = next(table.iter("th"), None)
+        if header is None:
+            continue
+        header_text = header.text_content()
+        if page.home is None and "Home" in header_text:
+            page.home = _rating_table(table)
+        if page.away is None and "Away" in header_text:
+            page.away = _rating_table(table)
+    if league_table:
+        page.league_table = _league_table(root)
+    return page
+
+
+def normalize_team_name(name: Any) -> str:
+    """Robustly cleans and standardizes a team name for reliable matching.
+
+    Args:
+        name: Team name to normalize
+
+    Returns:
+        Normalized team name
+    """
+    if not isinstance(name, str):
+        return ""
+    name = name.lower()
+    name = name.replace("ö", "oe").replace("ü", "ue").replace("ä", "ae")
+    name = name.replace("ø", "oe").replace("å", "aa").replace("æ", "ae")
+    name = re.sub(r"[\&\-\.]+", " ", name)
+    name = re.sub(r"[^a-z0-9\s]", "", name)
+    name = re.sub(r"\s\([ns]\)$", "", name)
+    return " ".join(name.split())
+
+
+class EloTableIndex:
+    """
+    Name lookups over one Elo rating table, built once per scraped table.
+
+    Holds the team names and their normalized forms as plain lists plus
+    dicts from each to the first row with that name, so resolving a team
+    never iterates or normalizes the table again.
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        """
+        Build the index.
+
+        Args:
+            table: Rating table with a Team column (Team, Rating, URL)
+        """
+        self.table = table
+        self.names: List[str] = table["Team"].tolist() if "Team" in table.columns else []
+        self.normalized_names: List[str] = [normalize_team_name(name) for name in self.names]
+        self._position_by_name: Dict[str, int] = {}
+        self._position_by_normalized: Dict[str, int] = {}
+        for position, (name, normalized) in enumerate(zip(self.names, self.normalized_names)):
+            self._position_by_name.setdefault(name, position)
+            self._position_by_normalized.setdefault(normalized, position)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def position(self, name: Optional[str]) -> Optional[int]:
+        """Row position of the first team named exactly name, or None."""
+        return self._position_by_name.get(name)
+
+    def normalized_position(self, name: Any) -> Optional[int]:
+        """Row position of the first team whose normalized name equals name's, or None."""
+        return self._position_by_normalized.get(normalize_team_name(name))
+
+    def row(self, position: int) -> pd.Series:
+        """The table row at a position returned by position() or normalized_position()."""
+        return self.table.iloc[position]
+
+
+@dataclass
+class TeamPage:
+    """Lineup, squad and recent league form scraped from one team page."""
+
+    team_name: str
+    team_url: str
+    lineup: Optional[List[Dict[str, Any]]] = None  # name, position, stats, rating
+    squad: Optional[List[Dict[str, Any]]] = None  # name, age, rating
+    last_matches: Optional[Dict[str, Any]] = None  # matches (date, opponent, result), points
+    fetched_at: datetime = field(default_factory=datetime.now)
+    error: Optional[str] = None  # Failure description, None on success
+
+    @property
+    def ok(self) -> bool:
+        """Check if the page was fetched and parsed."""
+        return self.error is None
+
+    @property
+    def age(self) -> float:
+        """Seconds since the page was fetched."""
+        return max((datetime.now() - self.fetched_at).total_seconds(), 0.0)
+
+    def as_tuple(
+        self,
+    ) -> Tuple[
+        Optional[List[Dict[str, Any]]], Optional[List[Dict[str, Any]]], Optional[Dict[str, Any]]
+    ]:
+        """Return (lineup, squad, last_matches), all None if the scrape failed."""
+        if not self.ok:
+            return None, None, None
+        return self.lineup, self.squad, self.last_matches
+
+
+@dataclass
+class LeagueTeamPages:
+    """Team pages of one league, keyed by team URL, as stored in the table cache."""
+
+    country: str
+    league: str
+    pages: Dict[str, TeamPage] = field(default_factory=dict)
+    fetched_at: datetime = field(default_factory=datetime.now)  # Last time any page was added
+    elapsed: float = 0.0  # Wall-clock seconds of the batch that produced this value
+
+    @property
+    def failed(self) -> List[TeamPage]:
+        """Pages that could not be scraped."""
+        return [page for page in self.pages.values() if not page.ok]
+
+
+_ANY_TH = etree.XPath("//th")
+_NEXT_TR = etree.XPath("(descendant::tr | following::tr)[1]")
+_TABLE_BY_ID = etree.XPath("//table[@id = $table_id][1]")
+_NOMOBIL_DIV = etree.XPath(
+    ".//div[contains(concat(' ', normalize-space(@class), ' '), ' nomobil ')][1]"
+)
+_MATCHES_TABLE = etree.XPath(
+    "//table[contains(concat(' ', normalize-space(@class), ' '), ' bigtable ')]"
+    "[@cellspacing = '0'][1]"
+)
+_PLAYER_POSITION = re.compile(r"(.+?)\s*\((.+)\)")
+_PLAYER_AGE = re.compile(r"(.+?)\s*\((\d+)\)")
+_PARENTHESES = re.compile(r"\s*\([^)]*\)")
+
+
+def _strings(element) -> List[str]:
+    """Non-blank text nodes of an element, stripped (BeautifulSoup's stripped_strings)."""
+    return [text.strip() for text in element.itertext() if text.strip()]
+
+
+def _stripped_text(element) -> str:
+    """Element text the way BeautifulSoup's get_text(strip=True) joins it."""
+    return "".join(_strings(element))
+
+
+def _first(xpath: etree.XPath, element, **variables):
+    found = xpath(element, **variables)
+    return found[0] if found else None
+
+
+def _team_table(
+    root, team_name: str, team_url: str, header_text: str, table_id_1: str, table_id_2: str
+):
+    """
+    Find one team's table in a two-team section (lineups or squads).
+
+    The section's header row links both teams; the target is matched by URL
+    first and by normalized name second, and picks table_id_1 or table_id_2.
+    """
+    header = next((th for th in _ANY_TH(root) if header_text in th.text_content()), None)
+    if header is None:
+        return None
+    team_name_row = _first(_NEXT_TR, header)
+    if team_name_row is None:
+        return None
+    team_links = list(team_name_row.iter("a"))
+    table_ids = (table_id_1, table_id_2)
+    normalized_target_url = team_url.strip("/")
+
+    for position, link in enumerate(team_links[:2]):
+        if position == 1 and len(team_links) != 2:
+            break
+        href = link.get("href")
+        if (
+            href is not None
+            and not href.startswith("javascript:")
+            and href.strip("/") == normalized_target_url
+        ):
+            return _first(_TABLE_BY_ID, root, table_id=table_ids[position])
+
+    normalized_target_name = normalize_team_name(team_name)
+    for position, link in enumerate(team_links[:2]):
+        if position == 1 and len(team_links) != 2:
+            break
+        header_team = _PARENTHESES.sub("", _stripped_text(link)).strip()
+        if normalize_team_name(header_team) == normalized_target_name:
+            return _first(_TABLE_BY_ID, root, table_id=table_ids[position])
+    return None
+
+
+def _player_text(cell) -> Optional[str]:
+    """Player label from a cell's 'nomobil' div: the text after the flag image."""
+    player_div = _first(_NOMOBIL_DIV, cell)
+    if player_div is None:
+        return None
+    img_tag = next(player_div.iter("img"), None)
+    if img_tag is not None and img_tag.tail:
+        return img_tag.tail.strip()
+    return _stripped_text(player_div)
+
+
+def _parse_lineup(table) -> List[Dict[str, Any]]:
+    lineup_data = []
+    for row in table.iter("tr"):
+        cols = list(row.iter("td"))
+        if len(cols) != 4:
+            continue
+        try:
+            full_text = _player_text(cols[1])
+            if full_text is None:
+                continue
+            match = _PLAYER_POSITION.match(full_text)
+            name, pos = (
+                (match.group(1).strip(), match.group(2).strip())
+                if match
+                else (full_text.strip(), "N/A")
+            )
+            rating = int(_stripped_text(cols[3]))
+            lineup_data.append(
+                {"name": name, "position": pos, "stats": _stripped_text(cols[2]), "rating": rating}
+            )
+        except (ValueError, IndexError):
+            continue
+    return lineup_data
+
+
+def _parse_squad(table) -> List[Dict[str, Any]]:
+    squad_data = []
+    for row in table.iter("tr"):
+        if next(row.iter("th", "hr"), None) is not None:
+            continue
+        cols = list(row.iter("td"))
+        if len(cols) != 3:
+            continue
+        try:
+            full_text = _player_text(cols[0])
+            if full_text is None:
+                continue
+            match = _PLAYER_AGE.match(full_text)
+            name, age = (
+                (match.group(1).strip(), int(match.group(2))) if match else (full_text, "N/A")
+            )
+            squad_data.append({"name": name, "age": age, "rating": int(_stripped_text(cols[2]))})
+        except (ValueError, IndexError):
+            continue
+    return squad_data
+
+
+def _parse_last_matches(root, team_name: str) -> Dict[str, Any]:
+    last_matches_data, points, league_matches_count = [], 0, 0
+    matches_table = _first(_MATCHES_TABLE, root)
+    if matches_table is not None:
+        for row in matches_table.iter("tr"):
+            if league_matches_count >= 5:
+                break
+            cols = list(row.iter("td"))
+            if len(cols) <= 9 or "cup" in _stripped_text(cols[7]).lower():
+                continue
+            date = " ".join(_strings(cols[1])).split(" ")[0]
+            opponent = _stripped_text(cols[2])
+            result = _stripped_text(cols[10])
+            if not result:
+                continue
+            last_matches_data.append({"date": date, "opponent": opponent, "result": result})
+            try:
+                own_score, opp_score = map(int, result.split(":"))
+                is_home_match = team_name.lower() in opponent.split("-")[0].lower()
+                if (is_home_match and own_score > opp_score) or (
+                    not is_home_match and own_score < opp_score
+                ):
+                    points += 3
+                elif own_score == opp_score:
+                    points += 1
+            except (ValueError, IndexError):
+                pass
+            league_matches_count += 1
+    return {"matches": last_matches_data, "points": points}
+
+
+def parse_team_page(
+    content: Union[bytes, str],
+    team_name: str,
+    team_url: str,
+    encoding: Optional[str] = None,
+) -> TeamPage:
+    """
+    Extract a team's expected lineup, squad and last five league matches.
+
+    Team pages show two teams side by side; the right lineup and squad tables
+    are picked by matching team_url (then team_name) against the section
+    header links. Uses compiled XPath over a single lxml parse.
+
+    Args:
+        content: Page body
+        team_name: Team name, used for the name fallback and for home/away
+            detection in the points tally
+        team_url: Team URL path as found in the rating table
+        encoding: Charset declared by the server, if any
+
+    Returns:
+        TeamPage (empty lists when a section is missing)
+    """
+    root = _parse_document(content, encoding)
+    lineup_table = _team_table(root, team_name, team_url, "Expected Lineup", "line1", "line2")
+    squad_table = _team_table(root, team_name, team_url, "Squad", "squad1", "squad2")
+    return TeamPage(
+        team_name=team_name,
+        team_url=team_url,
+        lineup=_parse_lineup(lineup_table) if lineup_table is not None else [],
+        squad=_parse_squad(squad_table) if squad_table is not None else [],
+        last_matches=_parse_last_matches(root, team_name),
+    )
+
+
+class TableCache:
+    """
+    Scraped tables keyed by a tuple such as (country, league).
+
+    Values are objects with a ``fetched_at`` datetime (e.g. LeagueTables).
+    Entries are kept in memory and, when ``cache_dir`` is given, mirrored to
+    one gzip-compressed pickle per key so they survive restarts and are
+    shared by every worker on the host: get() reloads a key whose file was
+    rewritten (newer mtime) by another process. A whole cache can also be written
+    to a single snapshot file and loaded elsewhere to warm a cold start.
+    Thread-safe. Only load files this app wrote: they are pickles.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for the on-disk store (default: memory only)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._entries: Dict[Tuple[str, ...], Any] = {}
+        self._mtimes: Dict[Tuple[str, ...], int] = {}  # File mtime (ns) each entry matches
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: Tuple[str, ...]) -> Optional[Any]:
+        """Return the entry for a key, (re)loading it from disk if the file is newer."""
+        with self._lock:
+            entry = self._entries.get(key)
+            known_mtime = self._mtimes.get(key)
+        if self.cache_dir is None:
+            return entry
+        path = self._path(key)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return entry
+        if entry is not None and known_mtime is not None and mtime <= known_mtime:
+            return entry
+
+        loaded = self._load(path, key)
+        with self._lock:
+            self._mtimes[key] = mtime
+            current = self._entries.get(key)
+            if loaded is not None and (current is None or current.fetched_at <= loaded.fetched_at):
+                self._entries[key] = loaded
+                return loaded
+            return current
+
+    def put(self, key: Tuple[str, ...], entry: Any) -> None:
+        """Store an entry in memory and on disk."""
+        with self._lock:
+            self._entries[key] = entry
+        mtime = self._save(key, entry)
+        if mtime is not None:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    self._mtimes[key] = mtime
+
+    def clear(self) -> None:
+        """Drop all entries (memory and disk)."""
+        with self._lock:
+            self._entries.clear()
+            self._mtimes.clear()
+        if self.cache_dir is not None:
+            for path in self.cache_dir.glob("*.pkl.gz"):
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logger.warning(f"Could not remove cached rating table {path}: {e}")
+
+    def write_snapshot(self, path: Union[str, Path]) -> int:
+        """
+        Write every entry in memory to one compressed snapshot file.
+
+        Returns:
+            Number of entries written
+        """
+        with self._lock:
+            entries = dict(self._entries)
+        self._write(Path(path), {"version": self.VERSION, "entries": entries})
+        logger.info(f"Wrote {len(entries)} cached rating tables to {path}")
+        return len(entries)
+
+    def load_snapshot(self, path: Union[str, Path]) -> int:
+        """
+        Add a snapshot's entries that are newer than what the cache holds.
+
+        Entries keep their original fetch time, so old ones are served as
+        stale and revalidated on first use rather than trusted as fresh.
+
+        Returns:
+            Number of entries taken from the snapshot
+        """
+        data = self._read(Path(path))
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return 0
+        loaded = 0
+        for key, entry in data.get("entries", {}).items():
+            current = self.get(key)
+            if current is None or current.fetched_at < entry.fetched_at:
+                self.put(key, entry)
+                loaded += 1
+        logger.info(f"Loaded {loaded} rating tables from snapshot {path}")
+        return loaded
+
+    def _path(self, key: Tuple[str, ...]) -> Path:
+        digest = hashlib.sha1("\x1f".join(key).encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.pkl.gz"
+
+    def _load(self, path: Path, key: Tuple[str, ...]) -> Optional[Any]:
+        data = self._read(path)
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != self.VERSION
+            or data.get("key") != key
+        ):
+            return None
+        return data.get("entry")
+
+    def _save(self, key: Tuple[str, ...], entry: Any) -> Optional[int]:
+        """Write an entry's file, returning its mtime (ns) or None if nothing was written."""
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        if not self._write(path, {"version": self.VERSION, "key": key, "entry": entry}):
+            return None
+        try:
+            return path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read(path: Path) -> Optional[Any]:
+        try:
+            with gzip.open(path, "rb") as handle:
+                return pickle.load(handle)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            logger.debug(f"Ignoring unreadable cached rating table {path}: {e}")
+            return None
+
+    @staticmethod
+    def _write(path: Path, data: Dict[str, Any]) -> bool:
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(tmp_path, "wb", compresslevel=5) as handle:
+                pickle.dump(data, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not persist rating tables to {path}: {e}")
+            return False
+        return True
+
+
+_table_cache: Optional[TableCache] = None
+
+
+def get_table_cache() -> TableCache:
+    """
+    Get the shared disk-backed rating table cache (singleton).
+
+    On first use the cache is warmed from config.RATING_TABLE_SNAPSHOT if
+    that file exists, so a fresh deploy starts with every league's tables.
+    """
+    global _table_cache
+    if _table_cache is None:
+        _table_cache = TableCache(config.RATING_TABLE_CACHE_DIR)
+        if Path(config.RATING_TABLE_SNAPSHOT).exists():
+            _table_cache.load_snapshot(config.RATING_TABLE_SNAPSHOT)
+    return _table_cache
+
+
+def _team_pages_key(country: str, league: str) -> Tuple[str, ...]:
+    """Table cache key of a league's team pages (league tables use (country, league))."""
+    return ("team_pages", country, league)
+
+
+class SoccerRatingClient:
+    """Pooled, rate-limited client for soccer-rating.com league and team pages."""
+
+    BASE_URL = "https://www.soccer-rating.com"
+
+    def __init__(
+        self,
+        max_connections: int = config.SOCCER_RATING_MAX_CONNECTIONS,
+        rate_limit: float = config.SOCCER_RATING_RATE_LIMIT,
+        burst: int = config.SOCCER_RATING_BURST,
+        timeout: float = config.SOCCER_RATING_TIMEOUT,
+        ttl: float = config.RATING_TABLE_TTL,
+        max_stale: float = config.RATING_TABLE_MAX_STALE,
+        table_cache: Optional[TableCache] = None,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            max_connections: HTTP connection pool size, also the number of
+                page fetches that may be in flight at once
+            rate_limit: Sustained requests per second allowed per host
+            burst: Requests per host allowed back to back after an idle period
+            timeout: Request timeout in seconds
+            ttl: Seconds scraped tables are fresh
+            max_stale: Seconds past which stale tables are no longer served
+                while a background refresh runs, but refetched first
+            table_cache: Store for scraped tables (default: a new in-memory
+                cache; pass get_table_cache() to share one on disk)
+        """
+        self.max_connections = max(int(max_connections), 1)
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.timeout = timeout
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.table_cache = table_cache if table_cache is not None else TableCache()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.max_connections, pool_maxsize=self.max_connections
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(config.BASE_HEADERS)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_connections, thread_name_prefix="soccer-rating"
+        )
+        # Separate pool so background refreshes never wait on their own page fetches
+        self._refresh_executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="rating-refresh"
+        )
+        self._refreshing: set = set()
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._lock = threading.Lock()
+        self._team_pages_lock = threading.Lock()  # Serializes read-merge-write of team pages
+
+    def league_url(self, country: str, league: str) -> str:
+        """URL of a league's ratings page (the home/ and away/ pages live below it)."""
+        return f"{self.BASE_URL}/{country}/{league}/"
+
+    def fetch_page(self, url: str, referer: Optional[str] = None) -> Tuple[bytes, Optional[str]]:
+        """
+        Fetch a page through the pooled session, respecting the host's rate limit.
+
+        Args:
+            url: Absolute URL
+            referer: Referer header value (default: the site root)
+
+        Returns:
+            (raw body, charset declared in the Content-Type header or None).
+            The body is left undecoded so the parser can decode it directly.
+
+        Raises:
+            requests.RequestException: If the request fails or returns an error status
+        """
+        self._limiter(url).acquire()
+        response = self.session.get(
+            url, headers={"Referer": referer or f"{self.BASE_URL}/"}, timeout=self.timeout
+        )
+        response.raise_for_status()
+        charset = _CHARSET.search(response.headers.get("Content-Type", ""))
+        return response.content, charset.group(1).strip("\"'") if charset else None
+
+    def fetch_tables(
+        self,
+        country: str,
+        league: str,
+        max_age: Optional[float] = None,
+        background_refresh: bool = True,
+    ) -> LeagueTables:
+        """
+        Return a league's home ratings, away ratings and standings.
+
+        Stored tables younger than max_age are returned as they are. Older
+        ones, up to max_stale, are returned immediately while a background
+        refresh replaces them (stale-while-revalidate). Otherwise the league
+        is scraped now, with the home and away pages requested concurrently.
+
+        Args:
+            country: Country identifier
+            league: League code
+            max_age: Seconds stored tables count as fresh (default: the client's ttl)
+            background_refresh: Serve stale tables while refreshing them in the
+                background; when False stale tables are refetched before returning
+
+        Returns:
+            LeagueTables; failures are reported in its error field, not raised
+        """
+        max_age = self.ttl if max_age is None else max_age
+        stored = self.table_cache.get((country, league))
+        if stored is not None:
+            if stored.age < max_age:
+                return stored
+            if background_refresh and stored.age < self.max_stale:
+                self._refresh_in_background(country, league)
+                return stored
+        return self._scrape(country, league)
+
+    def _scrape(self, country: str, league: str) -> LeagueTables:
+        """Fetch and parse a league's pages, storing the tables on success."""
+        started = time.perf_counter()
+        base_url = self.league_url(country, league)
+        try:
+            home_page = self._executor.submit(self.fetch_page, f"{base_url}home/", base_url)
+            away_page = self._executor.submit(self.fetch_page, f"{base_url}away/", base_url)
+            home = parse_ratings_page(*home_page.result())
+            away = parse_ratings_page(*away_page.result(), league_table=False)
+            result = LeagueTables(
+                country=country,
+                league=league,
+                home=home.home,
+                away=away.away,
+                league_table=home.league_table,
+            )
+        except Exception as e:  # Parsing can fail in many ways on unexpected markup
+            logger.warning(f"Failed to scrape rating tables for {country}/{league}: {e}")
+            return LeagueTables(
+                country=country,
+                league=league,
+                latency=time.perf_counter() - started,
+                error=f"{type(e).__name__}: {e}",
+            )
+
+        result.latency = time.perf_counter() - started
+        if result.ok:
+            # Build the lookup indexes here rather than in a page rerun
+            _ = result.home_index
+            _ = result.away_index
+            self.table_cache.put((country, league), result)
+        else:
+            result.error = "No home rating table found"
+        return result
+
+    def _refresh_in_background(self, country: str, league: str) -> None:
+        """Queue one refresh per league; a failed refresh keeps the stale tables."""
+        if self._submit_background((country, league), self._scrape, country, league):
+            logger.info(f"Serving stale rating tables for {country}/{league} while refreshing")
+
+    def _submit_background(self, key: Tuple[str, ...], fn: Callable[..., Any], *args: Any) -> bool:
+        """Run fn on the refresh pool unless a job with the same key is queued or running."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+
+        def done(_future) -> None:
+            with self._lock:
+                self._refreshing.discard(key)
+
+        self._refresh_executor.submit(fn, *args).add_done_callback(done)
+        return True
+
+    def team_url(self, team_url: str) -> str:
+        """Absolute URL of a team page from the path in a rating table's URL column."""
+        return f"{self.BASE_URL}{team_url}"
+
+    def fetch_team_page(self, team_name: str, team_url: str) -> TeamPage:
+        """
+        Fetch and parse one team page, bypassing the cache.
+
+        Args:
+            team_name: Team name as shown in the rating table
+            team_url: Team URL path from the rating table
+
+        Returns:
+            TeamPage; failures are reported in its error field, not raised
+        """
+        try:
+            content, encoding = self.fetch_page(self.team_url(team_url))
+            return parse_team_page(content, team_name, team_url, encoding)
+        except Exception as e:  # Parsing can fail in many ways on unexpected markup
+            logger.warning(f"Failed to scrape team page {team_url}: {e}")
+            return TeamPage(
+                team_name=team_name, team_url=team_url, error=f"{type(e).__name__}: {e}"
+            )
+
+    def cached_team_page(
+        self, country: str, league: str, team_url: str, max_age: Optional[float] = None
+    ) -> Optional[TeamPage]:
+        """Return a stored, successfully scraped team page younger than max_age, else None."""
+        max_age = self.ttl if max_age is None else max_age
+        stored = self.table_cache.get(_team_pages_key(country, league))
+        page = stored.pages.get(team_url) if stored is not None else None
+        if page is None or not page.ok or page.age >= max_age:
+            return None
+        return page
+
+    def team_page(
+        self,
+        country: str,
+        league: str,
+        team_name: str,
+        team_url: str,
+        max_age: Optional[float] = None,
+    ) -> TeamPage:
+        """
+        Return a team's page from the league's cache, scraping it only on a miss.
+
+        Args:
+            country: Country identifier
+            league: League code the team was selected from
+            team_name: Team name as shown in the rating table
+            team_url: Team URL path from the rating table
+            max_age: Seconds a stored page counts as fresh (default: the client's ttl)
+
+        Returns:
+            TeamPage; failures are reported in its error field, not raised
+        """
+        page = self.cached_team_page(country, league, team_url, max_age)
+        if page is None:
+            page = self.fetch_team_page(team_name, team_url)
+            self._store_team_pages(country, league, [page], 0.0)
+        return page
+
+    def fetch_team_pages(
+        self,
+        country: str,
+        league: str,
+        teams: Iterable[Tuple[str, str]],
+        max_age: Optional[float] = None,
+    ) -> LeagueTeamPages:
+        """
+        Scrape every team page of a league concurrently into the league's cache.
+
+        Pages already stored and younger than max_age are not refetched. The
+        fetches share the page pool and the per-host rate limit with table
+        scraping, so a batch never exceeds max_connections requests in flight.
+
+        Args:
+            country: Country identifier
+            league: League code
+            teams: (team name, team URL path) pairs, e.g. from the home rating table
+            max_age: Seconds stored pages count as fresh (default: the client's ttl)
+
+        Returns:
+            The league's stored pages after the batch
+        """
+        started = time.perf_counter()
+        teams = list(dict((url, name) for name, url in teams if isinstance(url, str)).items())
+        missing = [
+            (url, name)
+            for url, name in teams
+            if self.cached_team_page(country, league, url, max_age) is None
+        ]
+        futures = [self._executor.submit(self.fetch_team_page, name, url) for url, name in missing]
+        pages = [future.result() for future in futures]
+        result = self._store_team_pages(country, league, pages, time.perf_counter() - started)
+        failed = sum(not page.ok for page in pages)
+        logger.info(
+            f"Fetched {len(pages) - failed}/{len(pages)} team pages for {country}/{league} "
+            f"in {result.elapsed:.2f}s ({len(teams) - len(missing)} cached)"
+        )
+        return result
+
+    def prefetch_team_pages(
+        self, country: str, league: str, teams: Iterable[Tuple[str, str]]
+    ) -> bool:
+        """
+        Queue fetch_team_pages() on the background refresh pool.
+
+        Returns:
+            False if a batch for this league is already queued or running
+        """
+        return self._submit_background(
+            _team_pages_key(country, league), self.fetch_team_pages, country, league, list(teams)
+        )
+
+    def _store_team_pages(
+        self, country: str, league: str, pages: List[TeamPage], elapsed: float
+    ) -> LeagueTeamPages:
+        """Merge pages into the league's stored pages; failures never replace a good page."""
+        key = _team_pages_key(country, league)
+        with self._team_pages_lock:
+            stored = self.table_cache.get(key)
+            merged = LeagueTeamPages(
+                country=country,
+                league=league,
+                pages=dict(stored.pages) if stored is not None else {},
+                elapsed=elapsed,
+            )
+            if not pages:
+                return merged
+            for page in pages:
+                previous = merged.pages.get(page.team_url)
+                if page.ok or previous is None or not previous.ok:
+                    merged.pages[page.team_url] = page
+            self.table_cache.put(key, merged)
+        return merged
+
+    def prefetch_leagues(
+        self,
+        leagues: Optional[Iterable[LeagueKey]] = None,
+        max_workers: Optional[int] = None,
+        max_age: Optional[float] = None,
+    ) -> PrefetchReport:
+        """
+        Scrape many leagues concurrently so later fetch_tables() calls hit the cache.
+
+        Concurrency is bounded by max_workers leagues (each with its home and
+        away pages in flight) and by the per-host rate limit.
+
+        Args:
+            leagues: (country, league) pairs (default: every league in config.LEAGUES_DATA)
+            max_workers: Leagues scraped at once (default: half the connection pool)
+            max_age: Passed to fetch_tables(); fresher stored leagues are
+                skipped and older ones are refetched (not served stale)
+
+        Returns:
+            PrefetchReport with per-league timings and failures, in input order
+        """
+        leagues = list(dict.fromkeys(leagues if leagues is not None else all_league_keys()))
+        if not leagues:
+            return PrefetchReport()
+
+        workers = min(max_workers or max(self.max_connections // 2, 1), len(leagues))
+        started = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="rating-prefetch"
+        ) as executor:
+            results = list(
+                executor.map(
+                    lambda pair: self.fetch_tables(
+                        pair[0], pair[1], max_age, background_refresh=False
+                    ),
+                    leagues,
+                )
+            )
+
+        report = PrefetchReport(
+            results=dict(zip(leagues, results)),
+            elapsed=time.perf_counter() - started,
+            workers=workers,
+        )
+        logger.info(f"Prefetched soccer-rating tables: {report.summary}")
+        for result in report.failed:
+            logger.warning(f"Prefetch failed for {result.country}/{result.league}: {result.error}")
+        return report
+
+    def close(self) -> None:
+        """Shut down the refresh and page-fetch threads and the HTTP session."""
+        self._refresh_executor.shutdown(wait=True)
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def _limiter(self, url: str) -> RateLimiter:
+        host = urlsplit(url).netloc
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = RateLimiter(self.rate_limit, self.burst)
+            return limiter
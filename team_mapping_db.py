@@ -5,15 +5,140 @@ Manages team name mappings between Kambi API and Elo ratings sources.
 Provides fuzzy matching with manual override capabilities.
 """
 
-import sqlite3
+import atexit
+import csv
+import json
 import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, List, Dict, Tuple
 from pathlib import Path
-from rapidfuzz import fuzz
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
 
 logger = logging.getLogger(__name__)
 
+@dataclass
+class MappingSnapshot:
+    """In-memory copy of the team and league mapping tables."""
+
+    version: int  # mapping_version.version the snapshot reflects
+    teams: Dict[Tuple[str, Optional[str]], str] = field(default_factory=dict)  # (kambi, league_filter) -> elo
+    leagues: Dict[str, str] = field(default_factory=dict)  # kambi league -> elo league key
+
+
+TEAM_MAPPING_COLUMNS = (
+    "id", "kambi_team_name", "elo_team_name", "league_filter",
+    "confidence", "created_at", "updated_at",
+)
+LEAGUE_MAPPING_COLUMNS = (
+    "id", "kambi_league_name", "elo_league_key", "confidence", "created_at", "updated_at",
+)
+EXPORT_FORMATS = ("jsonl", "csv")
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a bulk mapping import."""
+
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0  # Conflicting rows left alone because overwrite was off
+    # One dict per row whose target disagrees with the database or an earlier
+    # row of the same import: key columns, 'existing', 'incoming', 'row', 'source'
+    conflicts: List[Dict[str, Any]] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)  # Rows rejected as malformed
+
+    @property
+    def written(self) -> int:
+        """Rows inserted or updated."""
+        return self.inserted + self.updated
+
+    @property
+    def summary(self) -> str:
+        """One-line description of the import for logs and the UI."""
+        text = (
+            f"{self.inserted} added, {self.updated} updated, {self.unchanged} unchanged, "
+            f"{len(self.conflicts)} conflicts"
+        )
+        if self.skipped:
+            text += f" ({self.skipped} skipped)"
+        if self.errors:
+            text += f", {len(self.errors)} invalid rows"
+        return text
+
+
+def write_mapping_rows(
+    rows: Iterable[Dict[str, Any]],
+    fp: TextIO,
+    columns: Tuple[str, ...],
+    fmt: str = "jsonl"
+) -> int:
+    """
+    Stream mapping rows to a text file as JSON Lines or CSV.
+
+    Args:
+        rows: Row dicts, typically from iter_mappings()/iter_league_mappings()
+        fp: Text file opened for writing (open CSV files with newline="")
+        columns: Column order for CSV output
+        fmt: 'jsonl' or 'csv'
+
+    Returns:
+        Number of rows written
+
+    Raises:
+        ValueError: If fmt is not a supported export format
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format {fmt!r}, expected one of {EXPORT_FORMATS}")
+
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(fp, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in rows:
+            fp.write(json.dumps(row, ensure_ascii=False))
+            fp.write("\n")
+            count += 1
+    return count
+
+
+def read_mapping_rows(fp: TextIO, fmt: str = "jsonl") -> Iterator[Dict[str, Any]]:
+    """
+    Read mapping rows written by write_mapping_rows() (or a JSON export).
+
+    Args:
+        fp: Text file opened for reading
+        fmt: 'jsonl', 'csv' or 'json' (a single JSON array)
+
+    Yields:
+        One dict per row; empty CSV cells become None
+
+    Raises:
+        ValueError: If fmt is not supported or a line is not valid JSON
+    """
+    if fmt == "json":
+        yield from json.load(fp)
+    elif fmt == "jsonl":
+        for line in fp:
+            if line.strip():
+                yield json.loads(line)
+    elif fmt == "csv":
+        for row in csv.DictReader(fp):
+            yield {key: (value if value != "" else None) for key, value in row.items()}
+    else:
+        raise ValueError(f"Unsupported import format {fmt!r}")
+
 
 class TeamMapping:
     """Represents a team name mapping between Kambi and Elo systems."""
@@ -80,12 +205,220 @@ class LeagueMapping:
         }
 
 
+class UnmappedRecorder:
+    """
+    Buffers unmapped team and league sightings and writes them in batches.
+
+    Sightings are coalesced in memory by (team, source, league) and by league
+    name, so a team missed on every page rerun costs a dict update rather than
+    a database commit. A daemon thread flushes the buffer in one transaction
+    every flush_interval seconds, or as soon as max_pending distinct entries
+    are waiting; close() (registered with atexit while the thread runs)
+    flushes whatever is left.
+    """
+
+    def __init__(
+        self,
+        service: "TeamMappingService",
+        flush_interval: float = 2.0,
+        max_pending: int = 256
+    ):
+        """
+        Initialize the recorder (the flush thread starts on the first record).
+
+        Args:
+            service: Mapping service whose database receives the rows
+            flush_interval: Maximum seconds a sighting waits in memory
+            max_pending: Distinct buffered entries that trigger an early flush
+
+        Raises:
+            ValueError: If flush_interval or max_pending is not positive
+        """
+        if flush_interval <= 0:
+            raise ValueError(f"flush_interval must be positive, got {flush_interval}")
+        if max_pending <= 0:
+            raise ValueError(f"max_pending must be positive, got {max_pending}")
+        self.service = service
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        # key -> [occurrences, last_seen]
+        self._teams: Dict[Tuple[str, str, Optional[str]], List] = {}
+        self._leagues: Dict[str, List] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._atexit_registered = False
+
+    @property
+    def pending(self) -> int:
+        """Number of distinct team and league entries waiting to be written."""
+        with self._lock:
+            return len(self._teams) + len(self._leagues)
+
+    def record_team(self, team_name: str, source: str, league: Optional[str] = None):
+        """Buffer one sighting of an unmapped team."""
+        self._record(self._teams, (team_name, source, league))
+
+    def record_league(self, league_name: str):
+        """Buffer one sighting of an unmapped league."""
+        self._record(self._leagues, league_name)
+
+    def _record(self, buffer: Dict, key) -> None:
+        now = datetime.now().isoformat()
+        with self._lock:
+            entry = buffer.get(key)
+            if entry is None:
+                buffer[key] = [1, now]
+            else:
+                entry[0] += 1
+                entry[1] = now
+            full = len(self._teams) + len(self._leagues) >= self.max_pending
+            self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def _ensure_thread(self) -> None:
+        """Start the flush thread if needed (caller holds self._lock)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if not self._atexit_registered:
+            atexit.register(self.close)
+            self._atexit_registered = True
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="unmapped-recorder", daemon=True
+        )
+        self._thread.start()
+
+    def flush(self) -> int:
+        """
+        Write all buffered sightings in a single transaction.
+
+        Returns:
+            Number of coalesced rows written
+
+        If the write fails the batch is merged back into the buffer so the
+        next flush retries it.
+        """
+        with self._flush_lock:
+            with self._lock:
+                teams, self._teams = self._teams, {}
+                leagues, self._leagues = self._leagues, {}
+            if not teams and not leagues:
+                return 0
+
+            try:
+                with self.service.transaction() as conn:
+                    if teams:
+                        conn.executemany("""
+                            INSERT INTO unmapped_teams
+                            (team_name, source, league, last_seen, occurrence_count)
+                            VALUES (?, ?, ?, ?, ?)
+                            ON CONFLICT(team_name, source, league)
+                            DO UPDATE SET
+                                last_seen = excluded.last_seen,
+                                occurrence_count = occurrence_count + excluded.occurrence_count
+                        """, [
+                            (team, source, league, last_seen, count)
+                            for (team, source, league), (count, last_seen) in teams.items()
+                        ])
+                    if leagues:
+                        conn.executemany("""
+                            INSERT INTO unmapped_leagues
+                            (league_name, last_seen, occurrence_count)
+                            VALUES (?, ?, ?)
+                            ON CONFLICT(league_name)
+                            DO UPDATE SET
+                                last_seen = excluded.last_seen,
+                                occurrence_count = occurrence_count + excluded.occurrence_count
+                        """, [
+                            (league_name, last_seen, count)
+                            for league_name, (count, last_seen) in leagues.items()
+                        ])
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to flush unmapped teams/leagues, will retry: {e}")
+                with self._lock:
+                    self._merge(self._teams, teams)
+                    self._merge(self._leagues, leagues)
+                return 0
+
+            return len(teams) + len(leagues)
+
+    @staticmethod
+    def _merge(buffer: Dict, batch: Dict) -> None:
+        """Fold an unwritten batch back into a buffer that kept filling meanwhile."""
+        for key, (count, last_seen) in batch.items():
+            entry = buffer.get(key)
+            if entry is None:
+                buffer[key] = [count, last_seen]
+            else:
+                entry[0] += count
+                entry[1] = max(entry[1], last_seen)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop the flush thread and write anything still buffered."""
+        with self._lock:
+            thread = self._thread
+            self._stopping.set()
+            self._wake.set()
+            if self._atexit_registered:
+                # Don't let atexit keep closed recorders (and their service) alive
+                atexit.unregister(self.close)
+                self._atexit_registered = False
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:  # Keep the thread alive whatever one flush raises
+                logger.error(f"Unexpected error flushing unmapped teams: {e}", exc_info=True)
+
+
 class TeamMappingService:
     """Service for managing team name mappings with SQLite database."""
 
-    def __init__(self, db_path: str = "data/team_mappings.db"):
-        """Initialize the service with database path."""
+    def __init__(
+        self,
+        db_path: str = "data/team_mappings.db",
+        persistent: bool = True,
+        snapshot_check_interval: float = 1.0,
+        unmapped_flush_interval: float = 2.0,
+        unmapped_batch_size: int = 256
+    ):
+        """
+        Initialize the service with database path.
+
+        Args:
+            db_path: SQLite database file
+            persistent: Keep one open connection per thread (WAL journaling,
+                synchronous=NORMAL, cached statements) instead of opening and
+                closing a connection for every call
+            snapshot_check_interval: Seconds between checks of the mapping
+                version for changes made by other processes or services
+            unmapped_flush_interval: Maximum seconds unmapped team/league
+                sightings are buffered before being written
+            unmapped_batch_size: Buffered unmapped entries that trigger an
+                early write
+        """
         self.db_path = db_path
+        self.persistent = persistent
+        self.snapshot_check_interval = snapshot_check_interval
+        self._snapshot: Optional[MappingSnapshot] = None
+        self._snapshot_checked = 0.0
+        self._snapshot_lock = threading.RLock()
+        self._local = threading.local()
+        self._connections: Dict[int, Tuple[threading.Thread, sqlite3.Connection]] = {}
+        self._connections_lock = threading.Lock()
+        self.unmapped_recorder = UnmappedRecorder(
+            self, unmapped_flush_interval, unmapped_batch_size
+        )
         self._ensure_db_directory()
         self._init_database()
 
@@ -94,16 +427,95 @@ class TeamMappingService:
         db_dir = Path(self.db_path).parent
         db_dir.mkdir(parents=True, exist_ok=True)
 
-    def _get_connection(self) -> sqlite3.Connection:
-        """Get a database connection."""
-        conn = sqlite3.Connection(self.db_path)
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open and configure a new database connection."""
+        conn = sqlite3.connect(
+            self.db_path, timeout=5.0, cached_statements=256, check_same_thread=False
+        )
         conn.row_factory = sqlite3.Row
+        if self.persistent:
+            # WAL lets readers proceed during writes; NORMAL syncs at checkpoints only
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
         return conn
 
-    def _init_database(self):
-        """Initialize database schema."""
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get a database connection (this thread's persistent one if enabled)."""
+        if not self.persistent:
+            return self._open_connection()
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open_connection()
+            self._local.conn = conn
+            with self._connections_lock:
+                # Close connections left behind by threads that have exited
+                for ident, (thread, stale) in list(self._connections.items()):
+                    if not thread.is_alive():
+                        stale.close()
+                        del self._connections[ident]
+                self._connections[threading.get_ident()] = (threading.current_thread(), conn)
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Provide a connection for reads, closing it afterwards unless persistent."""
+        conn = getattr(self._local, "transaction_conn", None)
+        if conn is not None:
+            # Inside transaction(): read through it to see uncommitted writes
+            yield conn
+            return
+
         conn = self._get_connection()
         try:
+            yield conn
+        finally:
+            if not self.persistent:
+                conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run statements atomically on this thread's connection.
+
+        Commits when the block exits normally and rolls back on an exception.
+        Nested transaction() blocks join the outermost one, so several service
+        calls can be grouped into a single commit::
+
+            with service.transaction():
+                service.add_mapping("Man Utd", "Manchester United")
+                service.delete_mapping(old_id)
+        """
+        outer = getattr(self._local, "transaction_conn", None)
+        if outer is not None:
+            yield outer
+            return
+
+        with self._connection() as conn:
+            self._local.transaction_conn = conn
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                self.invalidate_snapshot()
+                raise
+            finally:
+                self._local.transaction_conn = None
+
+    def close(self):
+        """Flush buffered unmapped sightings and close every persistent connection."""
+        self.unmapped_recorder.close()
+        with self._connections_lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for _, conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def _init_database(self):
+        """Initialize database schema."""
+        with self.transaction() as conn:
             cursor = conn.cursor()
 
             # Create team_mappings table
@@ -181,10 +593,90 @@ class TeamMappingService:
                 ON unmapped_leagues(league_name)
             """)
 
-            conn.commit()
+            # Version counter bumped by every change to the mapping tables, so
+            # in-memory snapshots can detect edits made by other processes
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS mapping_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    version INTEGER NOT NULL
+                )
+            """)
+            cursor.execute("INSERT OR IGNORE INTO mapping_version (id, version) VALUES (1, 0)")
+            for table in ("team_mappings", "league_mappings"):
+                for event in ("INSERT", "UPDATE", "DELETE"):
+                    cursor.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                        AFTER {event} ON {table}
+                        BEGIN
+                            UPDATE mapping_version SET version = version + 1 WHERE id = 1;
+                        END
+                    """)
+
             logger.info(f"Database initialized at {self.db_path}")
-        finally:
-            conn.close()
+
+    def _mapping_snapshot(self) -> MappingSnapshot:
+        """
+        Return the in-memory mapping snapshot, loading or reloading it as needed.
+
+        The version counter is checked at most every snapshot_check_interval
+        seconds; between checks lookups never touch the database.
+        """
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            now = time.monotonic()
+            if snapshot is not None and now - self._snapshot_checked < self.snapshot_check_interval:
+                return snapshot
+
+            with self._connection() as conn:
+                version = conn.execute("SELECT version FROM mapping_version WHERE id = 1").fetchone()[0]
+                if snapshot is None or snapshot.version != version:
+                    snapshot = MappingSnapshot(version=version)
+                    # Oldest row wins for duplicate keys, as in get_mapping's queries
+                    for row in conn.execute("""
+                        SELECT kambi_team_name, league_filter, elo_team_name
+                        FROM team_mappings ORDER BY id
+                    """):
+                        snapshot.teams.setdefault(
+                            (row['kambi_team_name'], row['league_filter']), row['elo_team_name']
+                        )
+                    for row in conn.execute("SELECT kambi_league_name, elo_league_key FROM league_mappings"):
+                        snapshot.leagues[row['kambi_league_name']] = row['elo_league_key']
+                    logger.debug(
+                        f"Loaded mapping snapshot v{version}: {len(snapshot.teams)} teams, "
+                        f"{len(snapshot.leagues)} leagues"
+                    )
+
+            self._snapshot = snapshot
+            self._snapshot_checked = now
+            return snapshot
+
+    def _write_through(self, conn: sqlite3.Connection, apply) -> None:
+        """
+        Apply a single-row mapping change to the loaded snapshot.
+
+        Each such change bumps the version by exactly one; any other difference
+        means someone else wrote too, so the snapshot is dropped and reloaded.
+        """
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                return
+            version = conn.execute("SELECT version FROM mapping_version WHERE id = 1").fetchone()[0]
+            if version == snapshot.version + 1:
+                apply(snapshot)
+                snapshot.version = version
+            else:
+                self._snapshot = None
+
+    def invalidate_snapshot(self):
+        """Drop the in-memory mappings so the next lookup reloads them."""
+        with self._snapshot_lock:
+            self._snapshot = None
+
+    @property
+    def mapping_version(self) -> int:
+        """Version of the mapping tables reflected by the in-memory snapshot."""
+        return self._mapping_snapshot().version
 
     def add_mapping(
         self,
@@ -194,8 +686,7 @@ class TeamMappingService:
         confidence: str = "manual"
     ) -> TeamMapping:
         """Add or update a team mapping."""
-        conn = self._get_connection()
-        try:
+        with self.transaction() as conn:
             cursor = conn.cursor()
             now = datetime.now().isoformat()
 
@@ -210,8 +701,13 @@ class TeamMappingService:
                     updated_at = excluded.updated_at
             """, (kambi_team_name, elo_team_name, league_filter, confidence, now, now))
 
-            conn.commit()
             mapping_id = cursor.lastrowid
+            key = (kambi_team_name, league_filter)
+            if league_filter is None:
+                # NULL filters never conflict, so the oldest unfiltered row stays in effect
+                self._write_through(conn, lambda snap: snap.teams.setdefault(key, elo_team_name))
+            else:
+                self._write_through(conn, lambda snap: snap.teams.__setitem__(key, elo_team_name))
 
             logger.info(f"Added/updated mapping: {kambi_team_name} -> {elo_team_name}")
 
@@ -224,8 +720,6 @@ class TeamMappingService:
                 created_at=datetime.fromisoformat(now),
                 updated_at=datetime.fromisoformat(now)
             )
-        finally:
-            conn.close()
 
     def get_mapping(
         self,
@@ -236,38 +730,38 @@ class TeamMappingService:
         Get the Elo team name for a Kambi team name.
 
         First tries exact match with league filter, then without.
-        Returns None if no mapping found.
+        Returns None if no mapping found. Served from the in-memory snapshot.
         """
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-
-            # Try with league filter first if provided
-            if league_filter:
-                cursor.execute("""
-                    SELECT elo_team_name FROM team_mappings
-                    WHERE kambi_team_name = ? AND league_filter = ?
-                """, (kambi_team_name, league_filter))
-
-                row = cursor.fetchone()
-                if row:
-                    return row['elo_team_name']
+        teams = self._mapping_snapshot().teams
+        if league_filter:
+            elo_team_name = teams.get((kambi_team_name, league_filter))
+            if elo_team_name:
+                return elo_team_name
+        return teams.get((kambi_team_name, None))
+
+    def get_mappings(
+        self,
+        kambi_team_names: Iterable[str],
+        league_filter: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Bulk version of get_mapping for many Kambi team names.
 
-            # Fallback to mapping without league filter
-            cursor.execute("""
-                SELECT elo_team_name FROM team_mappings
-                WHERE kambi_team_name = ? AND league_filter IS NULL
-            """, (kambi_team_name,))
+        Same precedence: a league-specific mapping wins over one without a filter.
 
-            row = cursor.fetchone()
-            return row['elo_team_name'] if row else None
-        finally:
-            conn.close()
+        Returns:
+            Dict of kambi_team_name -> elo_team_name for names that are mapped
+        """
+        mappings = {}
+        for kambi_team_name in dict.fromkeys(kambi_team_names):
+            elo_team_name = self.get_mapping(kambi_team_name, league_filter)
+            if elo_team_name:
+                mappings[kambi_team_name] = elo_team_name
+        return mappings
 
     def get_all_mappings(self) -> List[TeamMapping]:
         """Get all team mappings."""
-        conn = self._get_connection()
-        try:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM team_mappings
@@ -287,23 +781,19 @@ class TeamMappingService:
                 ))
 
             return mappings
-        finally:
-            conn.close()
 
     def delete_mapping(self, mapping_id: int) -> bool:
         """Delete a team mapping by ID."""
-        conn = self._get_connection()
-        try:
+        with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM team_mappings WHERE id = ?", (mapping_id,))
-            conn.commit()
 
             deleted = cursor.rowcount > 0
             if deleted:
+                # Deletes are rare admin edits; reload rather than patch the snapshot
+                self.invalidate_snapshot()
                 logger.info(f"Deleted mapping ID: {mapping_id}")
             return deleted
-        finally:
-            conn.close()
 
     def record_unmapped_team(
         self,
@@ -311,30 +801,18 @@ class TeamMappingService:
         source: str,
         league: Optional[str] = None
     ):
-        """Record a team that couldn't be mapped for future reference."""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            now = datetime.now().isoformat()
-
-            cursor.execute("""
-                INSERT INTO unmapped_teams
-                (team_name, source, league, last_seen, occurrence_count)
-                VALUES (?, ?, ?, ?, 1)
-                ON CONFLICT(team_name, source, league)
-                DO UPDATE SET
-                    last_seen = excluded.last_seen,
-                    occurrence_count = occurrence_count + 1
-            """, (team_name, source, league, now))
+        """
+        Record a team that couldn't be mapped for future reference.
 
-            conn.commit()
-        finally:
-            conn.close()
+        The sighting is buffered and written by the unmapped recorder;
+        get_unmapped_teams() flushes first, so reads always include it.
+        """
+        self.unmapped_recorder.record_team(team_name, source, league)
 
     def get_unmapped_teams(self, source: Optional[str] = None) -> List[Dict]:
         """Get list of unmapped teams."""
-        conn = self._get_connection()
-        try:
+        self.unmapped_recorder.flush()
+        with self._connection() as conn:
             cursor = conn.cursor()
 
             if source:
@@ -361,19 +839,14 @@ class TeamMappingService:
                 })
 
             return unmapped
-        finally:
-            conn.close()
 
     def clear_unmapped_teams(self):
         """Clear the unmapped teams tracking table."""
-        conn = self._get_connection()
-        try:
+        self.unmapped_recorder.flush()
+        with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM unmapped_teams")
-            conn.commit()
             logger.info("Cleared unmapped teams table")
-        finally:
-            conn.close()
 
     def find_fuzzy_match(
         self,
@@ -402,6 +875,65 @@ class TeamMappingService:
 
         return None
 
+    def find_fuzzy_matches(
+        self,
+        kambi_team_names: Iterable[str],
+        elo_team_names: List[str],
+        threshold: int = 85
+    ) -> Dict[str, Tuple[str, float]]:
+        """
+        Bulk version of find_fuzzy_match scoring all names in one cdist call.
+
+        The full token_sort_ratio score matrix is computed in parallel across
+        cores; each row keeps its first best-scoring Elo name, as in the loop.
+
+        Returns:
+            Dict of kambi_team_name -> (matched_name, score) for names with a
+            match above threshold
+        """
+        names = list(dict.fromkeys(kambi_team_names))
+        if not names or not elo_team_names:
+            return {}
+
+        scores = process.cdist(
+            names, elo_team_names, scorer=fuzz.token_sort_ratio, dtype=np.float64, workers=-1
+        )
+        best = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(names)), best]
+
+        return {
+            name: (elo_team_names[column], float(score))
+            for name, column, score in zip(names, best, best_scores)
+            if score > 0 and score >= threshold
+        }
+
+    @staticmethod
+    def _confidence_for_score(score: float) -> str:
+        """Map a fuzzy score to the confidence level stored with auto mappings."""
+        if score >= 95:
+            return "auto_high"
+        if score >= 85:
+            return "auto_medium"
+        return "auto_low"
+
+    def suggest_mappings(
+        self,
+        kambi_team_names: Iterable[str],
+        elo_team_names: List[str]
+    ) -> Dict[str, Tuple[str, float, str]]:
+        """
+        Suggest mappings for many Kambi teams at once (never auto-saves).
+
+        Returns:
+            Dict of kambi_team_name -> (elo_team_name, score, confidence_level)
+            for names that have a suggestion
+        """
+        matches = self.find_fuzzy_matches(kambi_team_names, elo_team_names, threshold=70)
+        return {
+            name: (elo_name, score, self._confidence_for_score(score))
+            for name, (elo_name, score) in matches.items()
+        }
+
     def suggest_mapping(
         self,
         kambi_team_name: str,
@@ -421,14 +953,7 @@ class TeamMappingService:
             return None
 
         elo_name, score = match_result
-
-        # Determine confidence level
-        if score >= 95:
-            confidence = "auto_high"
-        elif score >= 85:
-            confidence = "auto_medium"
-        else:
-            confidence = "auto_low"
+        confidence = self._confidence_for_score(score)
 
         # Auto-save high confidence matches
         if auto_save and score >= 90:
@@ -442,22 +967,66 @@ class TeamMappingService:
 
         return (elo_name, score, confidence)
 
+    def iter_mappings(self) -> Iterator[Dict[str, Any]]:
+        """
+        Stream all team mappings as dicts (same shape as TeamMapping.to_dict()).
+
+        Rows come straight off the cursor, so memory stays flat however large
+        the table is.
+        """
+        yield from self._iter_rows("team_mappings", TEAM_MAPPING_COLUMNS, "kambi_team_name")
+
     def export_mappings(self) -> List[Dict]:
         """Export all mappings as JSON-serializable list."""
-        mappings = self.get_all_mappings()
-        return [m.to_dict() for m in mappings]
+        return list(self.iter_mappings())
 
-    def import_mappings(self, mappings: List[Dict]):
-        """Import mappings from JSON-serializable list."""
-        for mapping_data in mappings:
-            self.add_mapping(
-                kambi_team_name=mapping_data['kambi_team_name'],
-                elo_team_name=mapping_data['elo_team_name'],
-                league_filter=mapping_data.get('league_filter'),
-                confidence=mapping_data.get('confidence', 'manual')
+    def write_mappings(self, fp: TextIO, fmt: str = "jsonl") -> int:
+        """Stream all team mappings to fp as JSON Lines or CSV; returns the row count."""
+        return write_mapping_rows(self.iter_mappings(), fp, TEAM_MAPPING_COLUMNS, fmt)
+
+    def import_mappings(
+        self,
+        mappings: Iterable[Dict],
+        overwrite: bool = True
+    ) -> ImportReport:
+        """
+        Import team mappings in a single transaction.
+
+        Rows are compared against the existing table first: new keys are
+        inserted and changed ones updated, each with one executemany call,
+        while identical rows are left untouched. An unfiltered mapping updates
+        the row in effect for that team instead of adding another one.
+
+        Args:
+            mappings: Dicts with kambi_team_name and elo_team_name, plus
+                optional league_filter and confidence (e.g. from
+                export_mappings() or read_mapping_rows())
+            overwrite: Update mappings whose Elo team differs from the
+                imported one; when False they are only reported
+
+        Returns:
+            ImportReport with counts, conflicts and rejected rows
+        """
+        report = ImportReport()
+        entries = {}
+        for row_number, data in enumerate(mappings, start=1):
+            kambi_name = data.get('kambi_team_name')
+            elo_name = data.get('elo_team_name')
+            if not kambi_name or not elo_name:
+                report.errors.append(f"Row {row_number}: kambi_team_name and elo_team_name are required")
+                continue
+            key = (kambi_name, data.get('league_filter') or None)
+            self._stage_import_row(
+                entries, report, ("kambi_team_name", "league_filter"), key,
+                elo_name, data.get('confidence') or 'manual', row_number
             )
 
-        logger.info(f"Imported {len(mappings)} mappings")
+        self._bulk_import(
+            "team_mappings", ("kambi_team_name", "league_filter"), "elo_team_name",
+            entries, overwrite, report
+        )
+        logger.info(f"Imported team mappings: {report.summary}")
+        return report
 
     # League mapping methods
     def add_league_mapping(
@@ -467,8 +1036,7 @@ class TeamMappingService:
         confidence: str = "manual"
     ) -> LeagueMapping:
         """Add or update a league mapping."""
-        conn = self._get_connection()
-        try:
+        with self.transaction() as conn:
             cursor = conn.cursor()
             now = datetime.now().isoformat()
 
@@ -483,8 +1051,10 @@ class TeamMappingService:
                     updated_at = excluded.updated_at
             """, (kambi_league_name, elo_league_key, confidence, now, now))
 
-            conn.commit()
             mapping_id = cursor.lastrowid
+            self._write_through(
+                conn, lambda snap: snap.leagues.__setitem__(kambi_league_name, elo_league_key)
+            )
 
             logger.info(f"Added/updated league mapping: {kambi_league_name} -> {elo_league_key}")
 
@@ -496,28 +1066,14 @@ class TeamMappingService:
                 created_at=datetime.fromisoformat(now),
                 updated_at=datetime.fromisoformat(now)
             )
-        finally:
-            conn.close()
 
     def get_league_mapping(self, kambi_league_name: str) -> Optional[str]:
-        """Get the Elo league key for a Kambi league name."""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT elo_league_key FROM league_mappings
-                WHERE kambi_league_name = ?
-            """, (kambi_league_name,))
-
-            row = cursor.fetchone()
-            return row['elo_league_key'] if row else None
-        finally:
-            conn.close()
+        """Get the Elo league key for a Kambi league name (from the in-memory snapshot)."""
+        return self._mapping_snapshot().leagues.get(kambi_league_name)
 
     def get_all_league_mappings(self) -> List[LeagueMapping]:
         """Get all league mappings."""
-        conn = self._get_connection()
-        try:
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM league_mappings
@@ -536,49 +1092,28 @@ class TeamMappingService:
                 ))
 
             return mappings
-        finally:
-            conn.close()
 
     def delete_league_mapping(self, mapping_id: int) -> bool:
         """Delete a league mapping by ID."""
-        conn = self._get_connection()
-        try:
+        with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM league_mappings WHERE id = ?", (mapping_id,))
-            conn.commit()
 
             deleted = cursor.rowcount > 0
             if deleted:
+                # Deletes are rare admin edits; reload rather than patch the snapshot
+                self.invalidate_snapshot()
                 logger.info(f"Deleted league mapping ID: {mapping_id}")
             return deleted
-        finally:
-            conn.close()
 
     def record_unmapped_league(self, league_name: str):
-        """Record a league that couldn't be mapped for future reference."""
-        conn = self._get_connection()
-        try:
-            cursor = conn.cursor()
-            now = datetime.now().isoformat()
-
-            cursor.execute("""
-                INSERT INTO unmapped_leagues
-                (league_name, last_seen, occurrence_count)
-                VALUES (?, ?, 1)
-                ON CONFLICT(league_name)
-                DO UPDATE SET
-                    last_seen = excluded.last_seen,
-                    occurrence_count = occurrence_count + 1
-            """, (league_name, now))
-
-            conn.commit()
-        finally:
-            conn.close()
+        """Record a league that couldn't be mapped (buffered like record_unmapped_team)."""
+        self.unmapped_recorder.record_league(league_name)
 
     def get_unmapped_leagues(self) -> List[Dict]:
         """Get list of unmapped leagues."""
-        conn = self._get_connection()
-        try:
+        self.unmapped_recorder.flush()
+        with self._connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM unmapped_leagues
@@ -595,8 +1130,6 @@ class TeamMappingService:
                 })
 
             return unmapped
-        finally:
-            conn.close()
 
     def suggest_league_mapping(
         self,
@@ -636,21 +1169,154 @@ class TeamMappingService:
 
         return (elo_key, score, confidence)
 
+    def iter_league_mappings(self) -> Iterator[Dict[str, Any]]:
+        """Stream all league mappings as dicts (same shape as LeagueMapping.to_dict())."""
+        yield from self._iter_rows("league_mappings", LEAGUE_MAPPING_COLUMNS, "kambi_league_name")
+
     def export_league_mappings(self) -> List[Dict]:
         """Export all league mappings as JSON-serializable list."""
-        mappings = self.get_all_league_mappings()
-        return [m.to_dict() for m in mappings]
+        return list(self.iter_league_mappings())
 
-    def import_league_mappings(self, mappings: List[Dict]):
-        """Import league mappings from JSON-serializable list."""
-        for mapping_data in mappings:
-            self.add_league_mapping(
-                kambi_league_name=mapping_data['kambi_league_name'],
-                elo_league_key=mapping_data['elo_league_key'],
-                confidence=mapping_data.get('confidence', 'manual')
+    def write_league_mappings(self, fp: TextIO, fmt: str = "jsonl") -> int:
+        """Stream all league mappings to fp as JSON Lines or CSV; returns the row count."""
+        return write_mapping_rows(self.iter_league_mappings(), fp, LEAGUE_MAPPING_COLUMNS, fmt)
+
+    def import_league_mappings(
+        self,
+        mappings: Iterable[Dict],
+        overwrite: bool = True
+    ) -> ImportReport:
+        """
+        Import league mappings in a single transaction (see import_mappings).
+
+        Args:
+            mappings: Dicts with kambi_league_name and elo_league_key, plus
+                optional confidence
+            overwrite: Update mappings whose Elo league differs from the
+                imported one; when False they are only reported
+
+        Returns:
+            ImportReport with counts, conflicts and rejected rows
+        """
+        report = ImportReport()
+        entries = {}
+        for row_number, data in enumerate(mappings, start=1):
+            kambi_league = data.get('kambi_league_name')
+            elo_key = data.get('elo_league_key')
+            if not kambi_league or not elo_key:
+                report.errors.append(f"Row {row_number}: kambi_league_name and elo_league_key are required")
+                continue
+            self._stage_import_row(
+                entries, report, ("kambi_league_name",), (kambi_league,),
+                elo_key, data.get('confidence') or 'manual', row_number
             )
 
-        logger.info(f"Imported {len(mappings)} league mappings")
+        self._bulk_import(
+            "league_mappings", ("kambi_league_name",), "elo_league_key",
+            entries, overwrite, report
+        )
+        logger.info(f"Imported league mappings: {report.summary}")
+        return report
+
+    def _iter_rows(
+        self,
+        table: str,
+        columns: Tuple[str, ...],
+        order_by: str
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield rows of a mapping table one at a time from a cursor."""
+        with self._connection() as conn:
+            cursor = conn.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY {order_by}")
+            for row in cursor:
+                yield dict(zip(columns, row))
+
+    @staticmethod
+    def _stage_import_row(
+        entries: Dict[Tuple, Tuple[str, str, int]],
+        report: ImportReport,
+        key_columns: Tuple[str, ...],
+        key: Tuple,
+        target: str,
+        confidence: str,
+        row_number: int
+    ) -> None:
+        """Add one import row, later rows replacing earlier ones with the same key."""
+        earlier = entries.get(key)
+        if earlier is not None and earlier[0] != target:
+            report.conflicts.append({
+                **dict(zip(key_columns, key)),
+                'existing': earlier[0],
+                'incoming': target,
+                'row': row_number,
+                'source': 'import',
+            })
+        entries[key] = (target, confidence, row_number)
+
+    def _bulk_import(
+        self,
+        table: str,
+        key_columns: Tuple[str, ...],
+        target_column: str,
+        entries: Dict[Tuple, Tuple[str, str, int]],
+        overwrite: bool,
+        report: ImportReport
+    ) -> None:
+        """Diff staged rows against a mapping table and write them in one transaction."""
+        if not entries:
+            return
+
+        keys_sql = ", ".join(key_columns)
+        with self.transaction() as conn:
+            existing = {}
+            cursor = conn.execute(
+                f"SELECT id, {keys_sql}, {target_column}, confidence FROM {table} ORDER BY id"
+            )
+            for row in cursor:
+                # Oldest row wins, matching the lookups for duplicate unfiltered rows
+                existing.setdefault(tuple(row[1:-2]), (row[0], row[-2], row[-1]))
+
+            now = datetime.now().isoformat()
+            inserts, updates = [], []
+            for key, (target, confidence, row_number) in entries.items():
+                current = existing.get(key)
+                if current is None:
+                    inserts.append((*key, target, confidence, now, now))
+                    continue
+
+                mapping_id, current_target, current_confidence = current
+                if (current_target, current_confidence) == (target, confidence):
+                    report.unchanged += 1
+                    continue
+                if current_target != target:
+                    report.conflicts.append({
+                        **dict(zip(key_columns, key)),
+                        'existing': current_target,
+                        'incoming': target,
+                        'row': row_number,
+                        'source': 'database',
+                    })
+                    if not overwrite:
+                        report.skipped += 1
+                        continue
+                updates.append((target, confidence, now, mapping_id))
+
+            placeholders = ", ".join("?" * (len(key_columns) + 4))
+            conn.executemany(f"""
+                INSERT INTO {table}
+                ({keys_sql}, {target_column}, confidence, created_at, updated_at)
+                VALUES ({placeholders})
+            """, inserts)
+            conn.executemany(f"""
+                UPDATE {table}
+                SET {target_column} = ?, confidence = ?, updated_at = ?
+                WHERE id = ?
+            """, updates)
+
+        report.inserted += len(inserts)
+        report.updated += len(updates)
+        if inserts or updates:
+            # A bulk change is cheaper to reload than to patch entry by entry
+            self.invalidate_snapshot()
 
 
 # Global singleton instance
@@ -1,12 +1,28 @@
 """Tests for Kambi API client."""
 
+import json
+import threading
+import time
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import MagicMock, patch
 
 import pytest
 import requests
 
-from kambi_client import KambiClient, KambiMatch
+from football_elo_odds.app.error_mapper import map_error_to_ui
+from kambi_client import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HttpCache,
+    KambiClient,
+    KambiMatch,
+    KambiServiceError,
+    MatchIndex,
+    RetryPolicy,
+    diff_snapshots,
+    iter_json_array,
+)
 
 
 class TestKambiMatch:
@@ -496,3 +512,532 @@ class TestKambiClient:
         assert match is not None
         assert match.league == "Premier League"
         assert "U21" not in match.home_team
+
+
+def _league_payload(event_id, home, away, group):
+    """Build a minimal listView response mock with one event."""
+    response = MagicMock()
+    response.raise_for_status.return_value = None
+    response.json.return_value = {
+        "events": [
+            {
+                "event": {
+                    "id": event_id,
+                    "homeName": home,
+                    "awayName": away,
+                    "group": group,
+                    "groupId": event_id,
+                    "start": "2026-01-30T15:00:00Z",
+                    "state": "NOT_STARTED",
+                    "path": [{"englishName": "Football"}, {"englishName": "England"}]
+                },
+                "betOffers": []
+            }
+        ]
+    }
+    return response
+
+
+class TestGetMatchesForLeagues:
+    """Tests for concurrent multi-league fetching."""
+
+    def test_results_per_league_in_order(self):
+        """Test each league gets its own result, keyed in input order."""
+        client = KambiClient(retry_policy=RetryPolicy(backoff_base=0))
+
+        def fake_get(url, params=None, timeout=None, **kwargs):
+            if "/spain/" in url:
+                raise requests.exceptions.ConnectionError("connection reset")
+            return _league_payload(1, "Arsenal", "Chelsea", "Premier League")
+
+        with patch.object(client.session, 'get', side_effect=fake_get):
+            results = client.get_matches_for_leagues(
+                [("England", "Premier League"), ("Spain", "La Liga"), ("England", "Premier League")]
+            )
+
+        assert list(results) == [("England", "Premier League"), ("Spain", "La Liga")]
+        england = results[("England", "Premier League")]
+        assert england.ok
+        assert england.matches[0].home_team == "Arsenal"
+        assert england.latency >= 0
+        spain = results[("Spain", "La Liga")]
+        assert not spain.ok
+        assert spain.matches == []
+        assert "ConnectionError" in spain.error
+
+    def test_requests_run_concurrently(self):
+        """Test leagues are fetched in parallel rather than one after another."""
+        client = KambiClient(max_connections=3)
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fake_get(url, params=None, timeout=None, **kwargs):
+            barrier.wait()  # Only passes once all three requests are in flight
+            return _league_payload(1, "Arsenal", "Chelsea", "Premier League")
+
+        with patch.object(client.session, 'get', side_effect=fake_get):
+            results = client.get_matches_for_leagues(
+                [("England", "Premier League"), ("Spain", "La Liga"), ("Italy", "Serie A")]
+            )
+
+        assert all(result.ok for result in results.values())
+
+    def test_connection_pool_sized_to_concurrency(self):
+        """Test the mounted adapter pool matches max_connections."""
+        client = KambiClient(max_connections=16)
+
+        adapter = client.session.get_adapter("https://eu1.offering-api.kambicdn.com")
+
+        assert adapter._pool_maxsize == 16
+
+    def test_empty_input(self):
+        """Test no leagues returns an empty mapping without a pool."""
+        assert KambiClient().get_matches_for_leagues([]) == {}
+
+
+class TestStreamingParser:
+    """Tests for the incremental listView parser."""
+
+    PAYLOAD = {
+        "meta": {"events": [{"decoy": True}]},
+        "count": 12345,
+        "events": [
+            {"event": {"id": i, "homeName": "Borussia Mönchengladbach", "awayName": "Köln"}, "betOffers": []}
+            for i in range(4)
+        ],
+        "terms": [],
+    }
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 17, 1 << 20])
+    def test_items_match_full_parse(self, chunk_size):
+        """Test streamed items equal a full parse regardless of chunk boundaries."""
+        body = json.dumps(self.PAYLOAD, ensure_ascii=False).encode("utf-8")
+        chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+        assert list(iter_json_array(chunks, "events")) == self.PAYLOAD["events"]
+
+    def test_yields_before_stream_ends(self):
+        """Test the first item is available before the body is fully read."""
+        body = json.dumps(self.PAYLOAD).encode("utf-8")
+        consumed = []
+
+        def chunks():
+            for i in range(0, len(body), 8):
+                consumed.append(i)
+                yield body[i:i + 8]
+
+        first = next(iter_json_array(chunks(), "events"))
+
+        assert first["event"]["id"] == 0
+        assert len(consumed) * 8 < len(body)
+
+    def test_missing_key_and_truncation(self):
+        """Test a payload without the key yields nothing and a cut-off stream raises."""
+        assert list(iter_json_array([b'{"terms": [1, 2]}'], "events")) == []
+
+        body = json.dumps(self.PAYLOAD).encode("utf-8")
+        with pytest.raises(ValueError):
+            list(iter_json_array([body[: len(body) // 2]], "events"))
+
+    def test_client_streaming_mode(self):
+        """Test stream=True parses matches from the chunked response body."""
+        body = json.dumps(_league_payload(7, "Arsenal", "Chelsea", "Premier League").json.return_value)
+        response = MagicMock()
+        response.raise_for_status.return_value = None
+        response.iter_content.return_value = [body[i:i + 10].encode() for i in range(0, len(body), 10)]
+        client = KambiClient()
+
+        with patch.object(client.session, 'get', return_value=response) as mock_get:
+            matches = client.get_all_football_matches(stream=True)
+
+        assert [match.event_id for match in matches] == [7]
+        assert mock_get.call_args.kwargs["stream"] is True
+        response.close.assert_called_once()
+        response.json.assert_not_called()
+
+
+class _StubKambiServer:
+    """Local listView server honouring If-None-Match, for HTTP cache tests."""
+
+    def __init__(self):
+        self.events = [_league_payload(1, "Arsenal", "Chelsea", "Premier League").json.return_value["events"][0]]
+        self.etag = '"v1"'
+        self.cache_control = None
+        self.requests = []  # (path, If-None-Match) per request
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append((self.path, self.headers.get("If-None-Match")))
+                not_modified = self.headers.get("If-None-Match") == stub.etag
+                self.send_response(304 if not_modified else 200)
+                self.send_header("ETag", stub.etag)
+                if stub.cache_control:
+                    self.send_header("Cache-Control", stub.cache_control)
+                if not_modified:
+                    self.end_headers()
+                    return
+                body = json.dumps({"events": stub.events}).encode("utf-8")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self.thread.start()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/offering"
+
+    def client(self, http_cache=None, **kwargs):
+        client = KambiClient(http_cache=http_cache, **kwargs)
+        client.BASE_URL = self.base_url
+        return client
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = _StubKambiServer()
+    yield server
+    server.close()
+
+
+class TestHttpCache:
+    """Tests for conditional-GET caching against a local stub server."""
+
+    def test_etag_revalidation_reuses_parsed_matches(self, stub_server):
+        """Test a 304 answer serves the cached matches without a new body."""
+        client = stub_server.client()
+
+        first = client.get_all_football_matches()
+        second = client.get_all_football_matches()
+
+        assert [m.event_id for m in first] == [m.event_id for m in second] == [1]
+        assert [etag for _, etag in stub_server.requests] == [None, '"v1"']
+        stats = client.cache_stats()
+        assert (stats.hits, stats.revalidations, stats.misses) == (0, 1, 1)
+        assert stats.hit_rate == pytest.approx(0.5)
+
+    def test_max_age_skips_request(self, stub_server):
+        """Test an unexpired Cache-Control max-age serves from memory."""
+        stub_server.cache_control = "public, max-age=60"
+        client = stub_server.client()
+
+        client.get_all_football_matches()
+        matches = client.get_matches_by_league("England", "Premier League")
+        matches = client.get_matches_by_league("England", "Premier League")
+
+        assert [m.event_id for m in matches] == [1]
+        assert len(stub_server.requests) == 2
+        stats = client.cache_stats()
+        assert (stats.hits, stats.revalidations, stats.misses, stats.size) == (1, 0, 2, 2)
+
+    def test_changed_payload_is_refetched(self, stub_server):
+        """Test a new ETag replaces the cached matches."""
+        client = stub_server.client()
+        client.get_all_football_matches()
+
+        stub_server.etag = '"v2"'
+        stub_server.events = [
+            _league_payload(2, "Everton", "Fulham", "Premier League").json.return_value["events"][0]
+        ]
+        matches = client.get_all_football_matches()
+
+        assert [m.event_id for m in matches] == [2]
+        assert client.cache_stats().misses == 2
+
+    def test_no_store_is_not_cached(self, stub_server):
+        """Test Cache-Control no-store disables caching for the URL."""
+        stub_server.cache_control = "no-store"
+        client = stub_server.client()
+
+        client.get_all_football_matches()
+        client.get_all_football_matches()
+
+        assert [etag for _, etag in stub_server.requests] == [None, None]
+        assert client.cache_stats().size == 0
+
+    def test_no_store_removes_persisted_payload(self, stub_server, tmp_path):
+        """Test a no-store answer also deletes the payload mirrored to disk."""
+        client = stub_server.client(http_cache=HttpCache(tmp_path))
+        client.get_all_football_matches()
+        assert len(list(tmp_path.glob("*.json"))) == 1
+
+        stub_server.etag = '"v2"'
+        stub_server.cache_control = "no-store"
+        client.get_all_football_matches()
+
+        assert list(tmp_path.glob("*.json")) == []
+        assert HttpCache(tmp_path).get(client._cache_key(client._all_matches_url())) is None
+
+    def test_include_live_filter_applies_to_cached_payload(self, stub_server):
+        """Test live matches are cached once and filtered per call."""
+        live = _league_payload(3, "Leeds", "Burnley", "Premier League").json.return_value["events"][0]
+        live["event"]["state"] = "STARTED"
+        stub_server.events.append(live)
+        stub_server.cache_control = "max-age=60"
+        client = stub_server.client()
+
+        assert [m.event_id for m in client.get_all_football_matches()] == [1]
+        assert [m.event_id for m in client.get_all_football_matches(include_live=True)] == [1, 3]
+        assert len(stub_server.requests) == 1
+
+    def test_streaming_mode_uses_cache(self, stub_server):
+        """Test the streaming path stores and revalidates like the buffered one."""
+        client = stub_server.client()
+
+        first = client.get_all_football_matches(stream=True)
+        second = client.get_all_football_matches(stream=True)
+
+        assert [m.event_id for m in first] == [m.event_id for m in second] == [1]
+        assert client.cache_stats().revalidations == 1
+
+    def test_clients_with_different_params_do_not_share_entries(self, stub_server, tmp_path):
+        """Test the cache key includes the query, so another market gets its own payload."""
+        stub_server.cache_control = "max-age=60"
+        cache = HttpCache(tmp_path)
+        swedish = stub_server.client(cache, market="SE", lang="sv_SE")
+        danish = stub_server.client(cache, market="DK", lang="da_DK")
+
+        swedish.get_all_football_matches()
+        danish.get_all_football_matches()
+        swedish.get_all_football_matches()
+
+        paths = [path for path, _ in stub_server.requests]
+        assert len(paths) == 2
+        assert "market=SE" in paths[0] and "market=DK" in paths[1]
+        assert [etag for _, etag in stub_server.requests] == [None, None]
+        assert cache.stats().size == 2
+
+    def test_disk_store_survives_new_client(self, stub_server, tmp_path):
+        """Test a fresh client revalidates against validators saved on disk."""
+        first = stub_server.client(HttpCache(tmp_path)).get_all_football_matches()
+
+        client = stub_server.client(HttpCache(tmp_path))
+        second = client.get_all_football_matches()
+
+        assert second == first
+        assert isinstance(second[0].start_time, datetime)
+        assert stub_server.requests[-1][1] == '"v1"'
+        assert client.cache_stats().revalidations == 1
+
+
+def _snapshot_match(event_id, odds_home=2.0, state="NOT_STARTED"):
+    return KambiMatch(
+        event_id=event_id,
+        home_team=f"Home {event_id}",
+        away_team=f"Away {event_id}",
+        league="Premier League",
+        league_id=1,
+        country="England",
+        start_time=datetime(2026, 1, 30, 15, 0),
+        state=state,
+        odds_home=odds_home,
+        odds_draw=3.4,
+        odds_away=3.5,
+    )
+
+
+class TestSnapshotDiff:
+    """Tests for diffing successive Kambi snapshots."""
+
+    def test_added_changed_removed(self):
+        """Test each event lands in exactly one bucket."""
+        previous = [_snapshot_match(1), _snapshot_match(2), _snapshot_match(3), _snapshot_match(4)]
+        current = [
+            _snapshot_match(1),
+            _snapshot_match(2, odds_home=2.1),
+            _snapshot_match(3, state="STARTED"),
+            _snapshot_match(5),
+        ]
+
+        diff = diff_snapshots(previous, current)
+
+        assert [m.event_id for m in diff.added] == [5]
+        assert [m.event_id for m in diff.changed] == [2, 3]
+        assert [m.event_id for m in diff.removed] == [4]
+
+    def test_first_poll_and_identical_snapshots(self):
+        """Test an empty previous snapshot adds everything and a repeat is empty."""
+        snapshot = [_snapshot_match(1), _snapshot_match(2)]
+
+        assert len(diff_snapshots([], snapshot).added) == 2
+        repeat = diff_snapshots(snapshot, [_snapshot_match(1), _snapshot_match(2)])
+        assert (repeat.added, repeat.changed, repeat.removed) == ([], [], [])
+
+
+def _status_response(status_code):
+    response = MagicMock()
+    response.status_code = status_code
+    return response
+
+
+class TestResilience:
+    """Tests for retries, circuit breaking and request metrics."""
+
+    def test_retries_transient_failures(self):
+        """Test connection errors and 5xx are retried until a success."""
+        client = KambiClient(retry_policy=RetryPolicy(max_attempts=3, backoff_base=0))
+        ok = _league_payload(1, "Arsenal", "Chelsea", "Premier League")
+        side_effect = [requests.exceptions.ConnectionError("reset"), _status_response(503), ok]
+
+        with patch.object(client.session, 'get', side_effect=side_effect) as mock_get:
+            matches = client.get_all_football_matches()
+
+        assert [m.event_id for m in matches] == [1]
+        assert mock_get.call_count == 3
+        metrics = client.request_metrics()[client._all_matches_url()]
+        assert metrics.outcomes == {"connection_error": 1, "http_503": 1, "ok": 1}
+        assert metrics.retries == 2
+        assert metrics.attempts == 3
+
+    def test_exhausted_retries_raise_service_error(self):
+        """Test streaming callers get a KambiServiceError naming the endpoint."""
+        client = KambiClient(retry_policy=RetryPolicy(max_attempts=2, backoff_base=0))
+
+        with patch.object(
+            client.session, 'get', side_effect=requests.exceptions.Timeout("slow")
+        ) as mock_get:
+            with pytest.raises(KambiServiceError) as excinfo:
+                list(client.iter_all_football_matches())
+            assert client.get_all_football_matches() == []
+
+        assert mock_get.call_count == 4
+        assert "after 2 attempt(s)" in str(excinfo.value)
+        assert excinfo.value.endpoint == client._all_matches_url()
+        assert map_error_to_ui(excinfo.value).title == "External data source unavailable"
+
+    def test_circuit_opens_and_fails_fast(self):
+        """Test an endpoint is short-circuited after repeated failures, then retried."""
+        client = KambiClient(
+            retry_policy=RetryPolicy(max_attempts=1), breaker_threshold=2, breaker_reset=0.05
+        )
+        url = client._league_url("England", "Premier League")
+
+        with patch.object(
+            client.session, 'get', side_effect=requests.exceptions.ConnectionError("down")
+        ) as mock_get:
+            for _ in range(3):
+                client.get_matches_by_league("England", "Premier League")
+            # Other endpoints keep their own breaker
+            client.get_all_football_matches()
+
+        assert mock_get.call_count == 3
+        metrics = client.request_metrics()[url]
+        assert metrics.outcomes["circuit_open"] == 1
+        assert metrics.circuit_state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            client._request(url, timeout=1, headers={})
+
+        time.sleep(0.06)
+        ok = _league_payload(1, "Arsenal", "Chelsea", "Premier League")
+        with patch.object(client.session, 'get', return_value=ok):
+            assert len(client.get_matches_by_league("England", "Premier League")) == 1
+        assert client.request_metrics()[url].circuit_state == CircuitBreaker.CLOSED
+
+    def test_unexpected_error_in_trial_reopens_circuit(self):
+        """Test a half-open trial that raises a non-requests error still reopens the circuit."""
+        client = KambiClient(
+            retry_policy=RetryPolicy(max_attempts=1), breaker_threshold=1, breaker_reset=0.05
+        )
+        url = client._all_matches_url()
+        with patch.object(
+            client.session, 'get', side_effect=requests.exceptions.ConnectionError("down")
+        ):
+            client.get_all_football_matches()
+        time.sleep(0.06)
+
+        with patch.object(client.session, 'get', side_effect=RuntimeError("boom")):
+            with pytest.raises(RuntimeError):
+                client._request(url, timeout=1, headers={})
+
+        breaker = client._breaker(url)
+        assert breaker.state == CircuitBreaker.OPEN
+        time.sleep(0.06)
+        assert breaker.allow()
+
+    def test_non_retryable_status_is_returned(self):
+        """Test a 404 is not retried and does not trip the breaker."""
+        client = KambiClient(retry_policy=RetryPolicy(backoff_base=0), breaker_threshold=1)
+        response = _status_response(404)
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError("404")
+
+        with patch.object(client.session, 'get', return_value=response) as mock_get:
+            assert client.get_matches_by_league("Nowhere", "League") == []
+            assert client.get_matches_by_league("Nowhere", "League") == []
+
+        assert mock_get.call_count == 2
+
+    def test_backoff_is_capped_full_jitter(self):
+        """Test backoff delays grow exponentially up to the cap."""
+        policy = RetryPolicy(backoff_base=0.5, backoff_max=2.0)
+
+        delays = [policy.backoff(retry) for retry in range(6) for _ in range(50)]
+
+        assert all(0 <= delay <= 2.0 for delay in delays)
+        assert max(policy.backoff(0) for _ in range(50)) <= 0.5
+
+    def test_latency_histogram(self):
+        """Test latencies land in buckets and quantiles read back bucket bounds."""
+        client = KambiClient()
+        for latency in (0.01, 0.2, 0.2, 30.0):
+            client._observe("endpoint", "ok", latency)
+
+        metrics = client.request_metrics()["endpoint"]
+
+        assert metrics.attempts == 4
+        assert metrics.latency_quantile(0.5) == 0.25
+        assert metrics.latency_quantile(1.0) == float("inf")
+        assert metrics.mean_latency == pytest.approx(30.41 / 4)
+
+
+class TestMatchIndex:
+    """Tests for the pre-indexed fuzzy match lookup."""
+
+    def _matches(self):
+        return [
+            KambiMatch(1, "Arsenal U21", "Chelsea U21", "U21 Premier League", 2, "England",
+                       datetime.now(), "NOT_STARTED"),
+            KambiMatch(2, "Manchester United", "Liverpool FC", "Premier League", 1, "England",
+                       datetime.now(), "NOT_STARTED"),
+            KambiMatch(3, "Arsenal", "Chelsea", "Premier League", 1, "England",
+                       datetime.now(), "NOT_STARTED"),
+            KambiMatch(4, "Arsenal", "Chelsea", "Serie A Femminile", 3, "England",
+                       datetime.now(), "NOT_STARTED"),
+        ]
+
+    def test_exact_lookup_ignores_token_order_and_case(self):
+        """Test exact pairings resolve through the hash, first event winning."""
+        index = MatchIndex(self._matches())
+
+        assert index.find("ARSENAL", "chelsea").event_id == 3
+        assert index.find("United Manchester", "FC Liverpool").event_id == 2
+
+    def test_exact_match_in_wrong_league_is_skipped(self):
+        """Test the league check rejects exact pairings from other leagues."""
+        index = MatchIndex(self._matches())
+
+        assert index.find("Arsenal", "Chelsea", league="Femminile").event_id == 4
+        assert index.find("Arsenal", "Chelsea", league="Bundesliga", threshold=100) is None
+
+    def test_fuzzy_lookup_with_league_boost(self):
+        """Test fuzzy scoring and the league boost match find_match semantics."""
+        index = MatchIndex(self._matches())
+
+        assert index.find("Manchester Utd", "Liverpool", threshold=75).event_id == 2
+        assert index.find("Arsenal U-21", "Chelsea U-21", league="U21 Premier League").event_id == 1
+        assert index.find("Barcelona", "Real Madrid") is None
+
+    def test_empty_index(self):
+        """Test an empty snapshot finds nothing."""
+        assert MatchIndex([]).find("Arsenal", "Chelsea") is None
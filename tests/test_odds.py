@@ -3,16 +3,33 @@
 import math
 from typing import Dict, Tuple
 
+import numpy as np
 import pytest
 
+import config
+import odds
+from football_elo_odds.domain.models import MatchInputs
+from football_elo_odds.domain.odds_engine import calculate_match_outcome_probabilities
 from odds import (
+    PricingCache,
+    StrengthSplitTable,
+    _build_poisson_array,
     _build_poisson_distribution,
     _conditional_home_win_probability,
+    _conditional_home_win_with_derivative,
     _match_probabilities,
+    _matrix_outcome_probabilities,
+    _matrix_total_goals,
+    _newton_strength_split,
     _poisson_pmf,
     _solve_strength_split,
     _total_goals_distribution,
+    cached_poisson_markets_from_dnb,
     calculate_poisson_markets_from_dnb,
+    dixon_coles_adjust,
+    price_fixtures_batch,
+    project_markets,
+    skellam_market_probabilities,
 )
 
 
@@ -246,6 +263,72 @@ class TestSolveStrengthSplit:
         s, home_dist, away_dist = _solve_strength_split(0.6, -1.0, 10)
         assert s == pytest.approx(0.5)
 
+    def test_engines_agree(self):
+        """Test the default (NumPy) solver matches the Python bisection."""
+        s_default, _, _ = _solve_strength_split(0.63, 2.7, 15)
+        s_python, _, _ = _solve_strength_split(0.63, 2.7, 15, engine="python")
+
+        assert s_default == pytest.approx(s_python, abs=1e-4)
+
+
+class TestNewtonStrengthSplit:
+    """Test suite for the derivative-aware strength split solver."""
+
+    @pytest.mark.parametrize("s", [0.1, 0.5, 0.77, 0.95])
+    def test_derivative_matches_finite_difference(self, s):
+        """Test the analytic derivative against a central difference."""
+        h = 1e-6
+        _, deriv, _, _ = _conditional_home_win_with_derivative(s, 2.7, 15)
+        f_plus = _conditional_home_win_with_derivative(s + h, 2.7, 15)[0]
+        f_minus = _conditional_home_win_with_derivative(s - h, 2.7, 15)[0]
+
+        assert float(deriv) == pytest.approx(float(f_plus - f_minus) / (2 * h), rel=1e-6)
+
+    def test_conditional_matches_reference(self):
+        """Test the probability agrees with the pure-Python conditional."""
+        cond, _, _, _ = _conditional_home_win_with_derivative(0.63, 2.4, 12)
+        expected, _, _ = _conditional_home_win_probability(0.63, 2.4, 12)
+
+        assert float(cond) == pytest.approx(expected, abs=1e-12)
+
+    @pytest.mark.parametrize("pi_home", [0.01, 0.2, 0.5, 0.63, 0.9, 0.999])
+    def test_converges_in_few_iterations(self, pi_home):
+        """Test the target is hit within tolerance in a handful of evaluations."""
+        s, _, _, iterations = _newton_strength_split(pi_home, 2.6, 15)
+        cond, _, _ = _conditional_home_win_probability(s, 2.6, 15)
+
+        assert abs(cond - pi_home) < 1e-6
+        assert iterations <= 6
+
+    def test_tolerance_parameter(self):
+        """Test a tighter tolerance is honoured."""
+        s, _, _, _ = _newton_strength_split(0.7, 2.6, 15, tol=1e-12)
+        cond, _, _ = _conditional_home_win_probability(s, 2.6, 15)
+
+        assert abs(cond - 0.7) < 1e-12
+
+    def test_degenerate_inputs(self):
+        """Test invalid targets return the neutral split without iterating."""
+        s, home_dist, _, iterations = _newton_strength_split(1.0, 2.5, 10)
+
+        assert s == 0.5
+        assert iterations == 0
+        assert sum(home_dist) == pytest.approx(1.0)
+
+    def test_no_iterations_allowed(self):
+        """Test max_iterations=0 returns the starting split instead of failing."""
+        s, home_dist, _, iterations = _newton_strength_split(0.6, 2.5, 10, max_iterations=0)
+
+        assert s == pytest.approx(0.6)
+        assert iterations == 0
+        assert sum(home_dist) == pytest.approx(1.0)
+
+    def test_markets_report_iterations(self):
+        """Test the market dict exposes the solver iteration count."""
+        result = calculate_poisson_markets_from_dnb(1.8, 2.2, 2.6)
+
+        assert 0 < result["solver_iterations"] <= 6
+
 
 class TestTotalGoalsDistribution:
     """Test suite for total goals distribution."""
@@ -536,3 +619,510 @@ class TestCalculatePoissonMarketsFromDNB:
         assert abs(odds["home"] - 1/probs["home"]) < 1e-6
         assert abs(odds["draw"] - 1/probs["draw"]) < 1e-6
         assert abs(odds["away"] - 1/probs["away"]) < 1e-6
+
+
+class TestNumpyEngine:
+    """Test suite for the vectorized NumPy pricing engine."""
+
+    @pytest.mark.parametrize("lam,max_goals", [(0.0, 5), (1.3, 10), (2.7, 15), (6.0, 4), (-1.0, 3)])
+    def test_array_matches_reference_distribution(self, lam, max_goals):
+        """Test the recurrence-built PMF matches the factorial-based one."""
+        expected = _build_poisson_distribution(lam, max_goals)
+        result = _build_poisson_array(lam, max_goals)
+
+        assert result.shape == (max_goals + 1,)
+        assert np.allclose(result, expected, atol=1e-12)
+
+    def test_matrix_outcomes_match_reference(self):
+        """Test triangular/diagonal sums match the nested loop."""
+        home = _build_poisson_array(1.7, 10)
+        away = _build_poisson_array(1.1, 10)
+        expected = _match_probabilities(home.tolist(), away.tolist())
+
+        result = _matrix_outcome_probabilities(np.outer(home, away))
+
+        assert result == pytest.approx(expected, abs=1e-12)
+
+    def test_matrix_total_goals(self):
+        """Test anti-diagonal sums give the total goals distribution."""
+        matrix = np.array([[0.2, 0.3], [0.3, 0.2]])
+        totals = _matrix_total_goals(matrix)
+
+        assert totals.tolist() == pytest.approx([0.2, 0.6, 0.2])
+
+    @pytest.mark.parametrize(
+        "home_dnb,away_dnb,avg_goals",
+        [(1.8, 2.2, 2.6), (1.3, 4.0, 2.5), (3.5, 1.4, 3.1), (2.0, 2.0, 0.0), (0.0, 0.0, 2.5)],
+    )
+    def test_engines_agree(self, home_dnb, away_dnb, avg_goals):
+        """Test NumPy and Python engines return the same markets."""
+        reference = calculate_poisson_markets_from_dnb(
+            home_dnb, away_dnb, avg_goals, engine="python", tol=1e-12
+        )
+        result = calculate_poisson_markets_from_dnb(
+            home_dnb, away_dnb, avg_goals, engine="numpy", tol=1e-12
+        )
+
+        assert result.keys() == reference.keys()
+        assert result["xg_home"] == pytest.approx(reference["xg_home"], abs=1e-9)
+        for market in ("probabilities", "over_under", "btts"):
+            for key, value in reference[market].items():
+                assert result[market][key] == pytest.approx(value, abs=1e-9)
+        assert isinstance(result["home_distribution"], list)
+        assert result["home_distribution"] == pytest.approx(reference["home_distribution"], abs=1e-9)
+
+    def test_unknown_engine(self):
+        """Test an unknown engine name is rejected."""
+        with pytest.raises(ValueError):
+            calculate_poisson_markets_from_dnb(2.0, 2.0, 2.5, engine="fortran")
+
+
+class TestPriceFixturesBatch:
+    """Test suite for the array-based batch pricing API."""
+
+    def test_matches_per_fixture_pricing(self):
+        """Test each batch element equals the scalar BTD + Poisson pipeline."""
+        home_ratings = [1650.0, 1500.0, 1420.0, 1800.0]
+        away_ratings = [1550.0, 1500.0, 1700.0, 1300.0]
+        draw_rates = [0.26, 0.28, 0.30, 0.22]
+        avg_goals = [2.6, 2.4, 2.9, 3.1]
+
+        batch = price_fixtures_batch(home_ratings, away_ratings, draw_rates, avg_goals)
+
+        for i in range(len(home_ratings)):
+            outcome = calculate_match_outcome_probabilities(
+                MatchInputs(
+                    home_rating=home_ratings[i],
+                    away_rating=away_ratings[i],
+                    base_draw_probability=draw_rates[i],
+                    average_goals=avg_goals[i],
+                    draw_weight=config.DRAW_OBS_WEIGHT,
+                )
+            )
+            p_dnb_home = outcome.home / (outcome.home + outcome.away)
+            markets = calculate_poisson_markets_from_dnb(
+                1 / p_dnb_home, 1 / (1 - p_dnb_home), avg_goals[i]
+            )
+
+            assert batch.dnb_home[i] == pytest.approx(p_dnb_home, abs=1e-9)
+            assert batch.home[i] == pytest.approx(markets["probabilities"]["home"], abs=1e-9)
+            assert batch.draw[i] == pytest.approx(markets["probabilities"]["draw"], abs=1e-9)
+            assert batch.over25[i] == pytest.approx(markets["over_under"]["over25_prob"], abs=1e-9)
+            assert batch.btts_yes[i] == pytest.approx(markets["btts"]["yes_prob"], abs=1e-9)
+            assert batch.xg_home[i] == pytest.approx(markets["xg_home"], abs=1e-9)
+
+    def test_scalar_league_inputs_broadcast(self):
+        """Test league-wide draw rate and goals are broadcast across the batch."""
+        batch = price_fixtures_batch([1600, 1500, 1400], [1500, 1500, 1500], 0.27, 2.6)
+
+        assert len(batch) == 3
+        assert np.allclose(batch.home + batch.draw + batch.away, 1.0)
+        assert np.allclose(batch.over25 + batch.under25, 1.0)
+        assert batch.home[0] > batch.home[1] > batch.home[2]
+
+    def test_empty_batch(self):
+        """Test an empty batch returns empty arrays."""
+        batch = price_fixtures_batch([], [], 0.27, 2.6)
+
+        assert len(batch) == 0
+
+    def test_zero_goals(self):
+        """Test a goalless environment prices a certain draw."""
+        batch = price_fixtures_batch([1600], [1500], 0.27, 0.0)
+
+        assert batch.draw[0] == pytest.approx(1.0)
+        assert batch.btts_yes[0] == pytest.approx(0.0)
+
+    def test_missing_ratings_price_as_nan(self):
+        """Test fixtures with a NaN rating get NaN rows, not an even-matchup price."""
+        home_ratings = [1650.0, np.nan, 1420.0, 1600.0]
+        away_ratings = [1550.0, 1500.0, 1700.0, np.nan]
+
+        batch = price_fixtures_batch(home_ratings, away_ratings, 0.27, 2.6)
+        rated = price_fixtures_batch([1650.0, 1420.0], [1550.0, 1700.0], 0.27, 2.6)
+
+        assert len(batch) == 4
+        for field in ("home", "draw", "dnb_home", "over25", "btts_yes", "xg_home"):
+            values = getattr(batch, field)
+            assert np.isnan(values[[1, 3]]).all(), field
+            assert np.allclose(values[[0, 2]], getattr(rated, field)), field
+        cached = price_fixtures_batch([np.nan], [1500.0], 0.27, 2.6, cache=PricingCache())
+        assert np.isnan(cached.home).all()
+
+    def test_mismatched_lengths(self):
+        """Test inputs that cannot be broadcast are rejected."""
+        with pytest.raises(ValueError):
+            price_fixtures_batch([1600, 1500], [1500, 1500, 1400], 0.27, 2.6)
+
+    def test_matrix_free_matches_matrix(self):
+        """Test closed-form batch pricing agrees with the score tensor."""
+        home_ratings = [1650.0, 1500.0, 1420.0, 1800.0, 1600.0]
+        away_ratings = [1550.0, 1500.0, 1700.0, 1300.0, 1500.0]
+
+        matrix = price_fixtures_batch(home_ratings, away_ratings, 0.27, [2.6, 2.4, 2.9, 3.1, 0.0])
+        closed = price_fixtures_batch(
+            home_ratings, away_ratings, 0.27, [2.6, 2.4, 2.9, 3.1, 0.0], matrix_free=True
+        )
+
+        for field in ("home", "draw", "away", "over25", "under25", "btts_yes", "btts_no"):
+            assert np.allclose(getattr(closed, field), getattr(matrix, field), atol=1e-9), field
+        assert len(price_fixtures_batch([], [], 0.27, 2.6, matrix_free=True)) == 0
+
+
+@pytest.fixture
+def split_table(tmp_path, monkeypatch):
+    """Provide a strength split table persisted under a temporary directory."""
+    table = StrengthSplitTable(15, path=tmp_path / "strength_split_g15.npz")
+    monkeypatch.setitem(odds._split_tables, 15, table)
+    return table
+
+
+class TestStrengthSplitTable:
+    """Test suite for the precomputed strength split lookup table."""
+
+    @pytest.mark.parametrize("pi_home,lambda_total", [(0.6, 2.6), (0.15, 1.2), (0.93, 4.4)])
+    def test_lookup_close_to_exact(self, split_table, pi_home, lambda_total):
+        """Test interpolated splits are close to the exact solution."""
+        exact, _, _, _ = _newton_strength_split(pi_home, lambda_total, 15, tol=1e-12)
+
+        assert float(split_table.lookup(pi_home, lambda_total)) == pytest.approx(exact, abs=1e-3)
+
+    def test_lookup_outside_grid_is_nan(self, split_table):
+        """Test inputs outside the grid are flagged for an exact solve."""
+        result = split_table.lookup([0.0, 0.5, 0.5], [2.5, 50.0, 2.5])
+
+        assert np.isnan(result[0])
+        assert np.isnan(result[1])
+        assert not np.isnan(result[2])
+
+    def test_persisted_and_reloaded(self, split_table, monkeypatch):
+        """Test a second table loads the grid from disk instead of rebuilding."""
+        grid = split_table.grid
+        assert split_table.path.exists()
+
+        reloaded = StrengthSplitTable(15, path=split_table.path)
+        monkeypatch.setattr(reloaded, "build", lambda: pytest.fail("table was rebuilt"))
+
+        assert np.array_equal(reloaded.grid, grid)
+
+    def test_stale_table_is_rebuilt(self, split_table):
+        """Test a table saved for different settings is ignored."""
+        split_table.grid
+        other = StrengthSplitTable(10, path=split_table.path)
+
+        assert other._load() is None
+        assert other.grid.shape == StrengthSplitTable.GRID_SHAPE
+
+    def test_markets_from_table(self, split_table):
+        """Test table-backed pricing skips the solver and stays accurate."""
+        exact = calculate_poisson_markets_from_dnb(1.8, 2.2, 2.6)
+        result = calculate_poisson_markets_from_dnb(1.8, 2.2, 2.6, use_split_table=True)
+
+        assert result["solver_iterations"] == 0
+        assert result["probabilities"]["home"] == pytest.approx(exact["probabilities"]["home"], abs=1e-3)
+
+    def test_strict_polishes_to_tolerance(self, split_table):
+        """Test strict mode polishes the interpolated split to the tolerance."""
+        result = calculate_poisson_markets_from_dnb(
+            1.8, 2.2, 2.6, use_split_table=True, strict=True, tol=1e-10
+        )
+        cond, _, _ = _conditional_home_win_probability(
+            result["xg_home"] / result["lambda_total"], result["lambda_total"], 15
+        )
+
+        assert cond == pytest.approx(result["pi_home_target"], abs=1e-10)
+        assert result["solver_iterations"] <= 3
+
+    def test_requires_numpy_engine(self, split_table):
+        """Test the table cannot be combined with the reference engine."""
+        with pytest.raises(ValueError):
+            calculate_poisson_markets_from_dnb(1.8, 2.2, 2.6, engine="python", use_split_table=True)
+
+    def test_batch_pricing_with_table(self, split_table):
+        """Test batch pricing through the table matches the exact batch."""
+        home_ratings = [1650.0, 1500.0, 1300.0, 2300.0]
+        away_ratings = [1550.0, 1500.0, 1700.0, 1000.0]
+
+        exact = price_fixtures_batch(home_ratings, away_ratings, 0.27, 2.6)
+        approx = price_fixtures_batch(home_ratings, away_ratings, 0.27, 2.6, use_split_table=True)
+        strict = price_fixtures_batch(
+            home_ratings, away_ratings, 0.27, 2.6, use_split_table=True, strict=True
+        )
+
+        assert np.allclose(approx.home, exact.home, atol=1e-3)
+        assert np.allclose(strict.home, exact.home, atol=1e-5)
+
+
+class TestSkellamMarkets:
+    """Test suite for matrix-free pricing from the Skellam/Poisson closed forms."""
+
+    @pytest.mark.parametrize("xg_home,xg_away", [(1.5, 1.1), (0.4, 2.9), (3.2, 0.0), (0.0, 0.0)])
+    def test_matches_score_matrix(self, xg_home, xg_away):
+        """Test closed forms agree with a wide score matrix."""
+        matrix = np.outer(_build_poisson_array(xg_home, 40), _build_poisson_array(xg_away, 40))
+        totals = _matrix_total_goals(matrix)
+        p_home, p_draw, p_away = _matrix_outcome_probabilities(matrix)
+
+        result = skellam_market_probabilities(xg_home, xg_away, total_lines=(2.0, 2.5))
+
+        assert result["home"] == pytest.approx(p_home, abs=1e-12)
+        assert result["draw"] == pytest.approx(p_draw, abs=1e-12)
+        assert result["away"] == pytest.approx(p_away, abs=1e-12)
+        assert result["btts_yes"] == pytest.approx(matrix[1:, 1:].sum(), abs=1e-12)
+        assert result["totals"][2.5]["under"] == pytest.approx(totals[:3].sum(), abs=1e-12)
+        assert result["totals"][2.0]["under"] == pytest.approx(totals[:2].sum(), abs=1e-12)
+        assert result["totals"][2.0]["push"] == pytest.approx(totals[2], abs=1e-12)
+        assert result["totals"][2.0]["over"] == pytest.approx(totals[3:].sum(), abs=1e-12)
+
+    def test_draw_matches_bessel_closed_form(self):
+        """Test the draw probability equals exp(-(h+a)) * I0(2*sqrt(h*a))."""
+        xg_home, xg_away = 1.8, 0.9
+        expected = math.exp(-(xg_home + xg_away)) * float(np.i0(2 * math.sqrt(xg_home * xg_away)))
+
+        assert skellam_market_probabilities(xg_home, xg_away)["draw"] == pytest.approx(expected, rel=1e-12)
+
+    def test_array_inputs(self):
+        """Test arrays are priced elementwise and returned as arrays."""
+        result = skellam_market_probabilities(np.array([1.5, 0.4]), np.array([1.1, 2.9]))
+
+        assert isinstance(result["home"], np.ndarray)
+        assert result["home"][1] == pytest.approx(skellam_market_probabilities(0.4, 2.9)["home"])
+        assert np.allclose(result["home"] + result["draw"] + result["away"], 1.0)
+
+    def test_negative_line(self):
+        """Test negative total lines are rejected."""
+        with pytest.raises(ValueError):
+            skellam_market_probabilities(1.0, 1.0, total_lines=(-0.5,))
+
+    def test_dnb_pricing_matrix_free(self):
+        """Test matrix-free DNB pricing matches the matrix path and can still return it."""
+        reference = calculate_poisson_markets_from_dnb(1.7, 2.3, 2.7)
+        result = calculate_poisson_markets_from_dnb(1.7, 2.3, 2.7, matrix_free=True)
+
+        assert "score_matrix" not in result
+        for market in ("probabilities", "over_under", "btts"):
+            for key, value in reference[market].items():
+                assert result[market][key] == pytest.approx(value, abs=1e-6)
+
+        with_matrix = calculate_poisson_markets_from_dnb(
+            1.7, 2.3, 2.7, matrix_free=True, include_matrix=True
+        )
+        assert with_matrix["score_matrix"].shape == (16, 16)
+        assert with_matrix["score_matrix"].sum() == pytest.approx(1.0)
+
+
+class TestProjectMarkets:
+    """Test suite for the market ladder projected from one score matrix."""
+
+    @pytest.fixture
+    def matrix(self) -> np.ndarray:
+        return np.outer(_build_poisson_array(1.6, 15), _build_poisson_array(1.1, 15))
+
+    def test_half_lines_match_direct_sums(self, matrix):
+        """Test half-goal lines equal direct sums over the matrix."""
+        ladder = project_markets(matrix)
+        home, away = np.indices(matrix.shape)
+
+        for line in (0.5, 2.5, 4.5):
+            expected_over = matrix[home + away > line].sum()
+            assert ladder["totals"][line]["over_prob"] == pytest.approx(expected_over, abs=1e-12)
+            assert ladder["totals"][line]["push_prob"] == 0.0
+        assert ladder["asian_handicap"][-1.5]["home_prob"] == pytest.approx(matrix[home - away >= 2].sum(), abs=1e-12)
+        assert ladder["team_totals"]["away"][1.5]["over_prob"] == pytest.approx(matrix[:, 2:].sum(), abs=1e-12)
+
+    def test_whole_and_quarter_lines(self, matrix):
+        """Test whole lines push and quarter lines split the stake."""
+        ladder = project_markets(matrix)
+        home, away = np.indices(matrix.shape)
+        p_draw = np.trace(matrix)
+
+        level = ladder["asian_handicap"][0.0]
+        assert level["push_prob"] == pytest.approx(p_draw, abs=1e-12)
+        assert level["home_odds"] == pytest.approx((1 - p_draw) / matrix[home > away].sum())
+
+        quarter = ladder["asian_handicap"][-0.25]
+        assert quarter["home_prob"] == pytest.approx(matrix[home > away].sum(), abs=1e-12)
+        assert quarter["push_prob"] == pytest.approx(p_draw / 2, abs=1e-12)
+        assert quarter["away_prob"] == pytest.approx(matrix[home < away].sum() + p_draw / 2, abs=1e-12)
+
+        over = ladder["totals"][2.75]
+        assert over["over_prob"] + over["push_prob"] + over["under_prob"] == pytest.approx(1.0)
+        assert over["push_prob"] == pytest.approx(matrix[home + away == 3].sum() / 2, abs=1e-12)
+
+    def test_double_chance_and_correct_score(self, matrix):
+        """Test double chance and the correct-score grid agree with 1X2."""
+        ladder = project_markets(matrix, max_correct_score=3)
+        p_home, p_draw, p_away = _matrix_outcome_probabilities(matrix)
+
+        assert ladder["double_chance"]["home_draw_prob"] == pytest.approx(p_home + p_draw)
+        assert ladder["double_chance"]["home_away_prob"] == pytest.approx(p_home + p_away)
+        assert len(ladder["correct_score"]) == 17
+        assert ladder["correct_score"]["2-1"] == pytest.approx(matrix[2, 1])
+        assert sum(ladder["correct_score"].values()) == pytest.approx(1.0)
+
+    def test_invalid_inputs(self, matrix):
+        """Test non-square matrices and off-grid lines are rejected."""
+        with pytest.raises(ValueError):
+            project_markets(matrix[:, :5])
+        with pytest.raises(ValueError):
+            project_markets(matrix, total_lines=(2.1,))
+
+    def test_dnb_pricing_includes_ladder(self):
+        """Test the ladder is attached to DNB pricing on request and matches its markets."""
+        result = calculate_poisson_markets_from_dnb(1.7, 2.3, 2.7, include_ladder=True)
+
+        assert result["ladder"]["totals"][2.5]["over_prob"] == pytest.approx(result["over_under"]["over25_prob"])
+        assert "ladder" not in calculate_poisson_markets_from_dnb(1.7, 2.3, 2.7)
+
+
+class TestDixonColes:
+    """Test suite for the Dixon-Coles low-score dependence correction."""
+
+    def test_adjusts_only_low_scores(self):
+        """Test only the 0-0, 0-1, 1-0 and 1-1 cells move and mass is kept."""
+        matrix = np.outer(_build_poisson_array(1.4, 15), _build_poisson_array(1.1, 15))
+
+        adjusted = dixon_coles_adjust(matrix, 1.4, 1.1, -0.1)
+
+        assert adjusted.sum() == pytest.approx(1.0)
+        assert adjusted[0, 0] == pytest.approx(matrix[0, 0] * (1 + 1.4 * 1.1 * 0.1))
+        assert adjusted[1, 1] == pytest.approx(matrix[1, 1] * 1.1)
+        assert np.allclose(adjusted[2:, :], matrix[2:, :], rtol=1e-12)
+        assert np.array_equal(dixon_coles_adjust(matrix, 1.4, 1.1, 0.0), matrix)
+
+    def test_batch_of_matrices(self):
+        """Test stacked matrices are corrected with per-fixture goal expectations."""
+        xg = [(1.4, 1.1), (0.6, 2.2)]
+        stacked = np.stack([np.outer(_build_poisson_array(h, 10), _build_poisson_array(a, 10)) for h, a in xg])
+
+        adjusted = dixon_coles_adjust(stacked, [h for h, _ in xg], [a for _, a in xg], 0.08)
+
+        for i, (h, a) in enumerate(xg):
+            assert np.allclose(adjusted[i], dixon_coles_adjust(stacked[i], h, a, 0.08))
+
+    @pytest.mark.parametrize("rho", [-0.15, 0.1])
+    def test_split_still_hits_dnb_target(self, rho):
+        """Test the split solve matches the DNB price under the correction."""
+        result = calculate_poisson_markets_from_dnb(1.6, 2.4, 2.6, rho=rho, tol=1e-10)
+        independent = calculate_poisson_markets_from_dnb(1.6, 2.4, 2.6, tol=1e-10)
+
+        assert result["pi_home_model"] == pytest.approx(result["pi_home_target"], abs=1e-9)
+        assert (result["probabilities"]["draw"] > independent["probabilities"]["draw"]) == (rho < 0)
+
+    def test_matrix_free_and_batch_agree(self):
+        """Test closed-form, batch and scalar pricing agree with a correction."""
+        scalar = calculate_poisson_markets_from_dnb(1.6, 2.4, 2.6, rho=-0.1, tol=1e-12)
+        closed = calculate_poisson_markets_from_dnb(1.6, 2.4, 2.6, rho=-0.1, tol=1e-12, matrix_free=True)
+
+        for market in ("probabilities", "over_under", "btts"):
+            for key, value in scalar[market].items():
+                assert closed[market][key] == pytest.approx(value, abs=1e-9)
+
+        batch = price_fixtures_batch([1650.0, 1400.0], [1500.0, 1700.0], 0.27, 2.6, rho=-0.1)
+        batch_free = price_fixtures_batch([1650.0, 1400.0], [1500.0, 1700.0], 0.27, 2.6, rho=-0.1, matrix_free=True)
+        assert np.allclose(batch.home / (batch.home + batch.away), batch.dnb_home, atol=1e-6)
+        assert np.allclose(batch.draw, batch_free.draw, atol=1e-9)
+
+    def test_matrix_free_low_totals_match_adjusted_matrix(self):
+        """Test the correction moves total-goals mass like the adjusted matrix."""
+        h, a, rho = 1.3, 1.1, -0.15
+        lines = (0.5, 1.0, 1.5, 2.0)
+        matrix = np.outer(_build_poisson_array(h, 30), _build_poisson_array(a, 30))
+        adjusted = dixon_coles_adjust(matrix, h, a, rho)
+        totals = np.add.outer(np.arange(31), np.arange(31))
+
+        result = skellam_market_probabilities(h, a, total_lines=lines, rho=rho)
+
+        assert result["totals"][0.5]["under"] == pytest.approx(0.1102, abs=1e-4)
+        for line in lines:
+            under = adjusted[totals < line].sum()
+            push = adjusted[totals == line].sum()
+            assert result["totals"][line]["under"] == pytest.approx(under, abs=1e-12)
+            assert result["totals"][line]["push"] == pytest.approx(push, abs=1e-12)
+            assert result["totals"][line]["over"] == pytest.approx(1.0 - under - push, abs=1e-12)
+
+    def test_invalid_rho(self):
+        """Test out-of-range rho and the python engine are rejected."""
+        with pytest.raises(ValueError):
+            calculate_poisson_markets_from_dnb(2.0, 2.0, 2.5, rho=1.5)
+        with pytest.raises(ValueError):
+            calculate_poisson_markets_from_dnb(2.0, 2.0, 2.5, engine="python", rho=-0.1)
+        with pytest.raises(TypeError):
+            price_fixtures_batch([1600], [1500], 0.27, 2.6, rho="strong")
+
+
+class TestPricingCache:
+    """Test suite for the quantized LRU pricing cache."""
+
+    def test_quantized_keys_share_entries(self):
+        """Test inputs within the quantization step hit the same entry."""
+        cache = PricingCache(maxsize=8, precision=3)
+
+        first = cached_poisson_markets_from_dnb(1.8, 2.2, 2.6, cache=cache)
+        second = cached_poisson_markets_from_dnb(1.80001, 2.2, 2.6, cache=cache)
+        third = cached_poisson_markets_from_dnb(1.9, 2.2, 2.6, cache=cache)
+
+        assert second is first
+        assert third is not first
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.size) == (1, 2, 2)
+        assert stats.hit_rate == pytest.approx(1 / 3)
+        assert first == calculate_poisson_markets_from_dnb(1.8, 2.2, 2.6)
+
+    def test_options_are_part_of_key(self):
+        """Test different pricing options are cached separately."""
+        cache = PricingCache()
+
+        plain = cached_poisson_markets_from_dnb(1.8, 2.2, 2.6, cache=cache)
+        corrected = cached_poisson_markets_from_dnb(1.8, 2.2, 2.6, cache=cache, rho=-0.1)
+
+        assert plain["probabilities"]["draw"] != corrected["probabilities"]["draw"]
+        assert len(cache) == 2
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = PricingCache(maxsize=2)
+        cache.put(("a",), 1)
+        cache.put(("b",), 2)
+        cache.get(("a",))
+        cache.put(("c",), 3)
+
+        assert cache.get(("b",)) is None
+        assert cache.get(("a",)) == 1
+        assert len(cache) == 2
+
+    def test_config_change_invalidates(self, monkeypatch):
+        """Test changing a watched config constant drops cached prices."""
+        cache = PricingCache()
+        cache.put(("a",), 1)
+
+        monkeypatch.setattr(config, "ELO_GOAL_SCALE_FACTOR", config.ELO_GOAL_SCALE_FACTOR + 0.1)
+
+        assert cache.get(("a",)) is None
+        assert cache.stats().invalidations == 1
+
+        cache.put(("a",), 1)
+        cache.invalidate()
+        assert len(cache) == 0
+        assert cache.stats().invalidations == 2
+
+    def test_batch_uses_cache(self):
+        """Test cached batch pricing matches uncached pricing and reuses rows."""
+        cache = PricingCache()
+        home_ratings = [1650.0, 1500.0, 1420.0, 1650.0]
+        away_ratings = [1550.0, 1500.0, 1700.0, 1550.0]
+
+        first = price_fixtures_batch(home_ratings, away_ratings, 0.27, 2.6, cache=cache)
+        second = price_fixtures_batch(home_ratings, away_ratings, 0.27, 2.6, cache=cache)
+        reference = price_fixtures_batch(home_ratings, away_ratings, 0.27, 2.6)
+
+        for result in (first, second):
+            assert np.allclose(result.home, reference.home, atol=1e-12)
+            assert np.allclose(result.xg_away, reference.xg_away, atol=1e-12)
+        assert cache.stats().hits == 4
+        assert len(cache) == 3
+
+    def test_invalid_size(self):
+        """Test a non-positive size is rejected."""
+        with pytest.raises(ValueError):
+            PricingCache(maxsize=0)
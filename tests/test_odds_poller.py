@@ -0,0 +1,153 @@
+"""Tests for the background Kambi odds poller."""
+
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from kambi_client import KambiMatch
+from odds_poller import OddsPoller, OddsStore
+
+
+def _match(event_id, odds_home=2.0, state="NOT_STARTED"):
+    return KambiMatch(
+        event_id=event_id,
+        home_team=f"Home {event_id}",
+        away_team=f"Away {event_id}",
+        league="Premier League",
+        league_id=1,
+        country="England",
+        start_time=datetime(2026, 1, 30, 15, 0),
+        state=state,
+        odds_home=odds_home,
+        odds_draw=3.4,
+        odds_away=3.5,
+    )
+
+
+def _client(*snapshots):
+    """Fake KambiClient whose successive polls return the given snapshots."""
+    client = MagicMock()
+    client.iter_all_football_matches.side_effect = [iter(s) for s in snapshots]
+    return client
+
+
+class TestOddsStore:
+    """Tests for the thread-safe snapshot store."""
+
+    def test_publish_versions_and_diffs(self):
+        """Test each publish bumps the version and diffs against the previous one."""
+        store = OddsStore()
+        assert store.latest() is None
+
+        first = store.publish([_match(1), _match(2)])
+        second = store.publish([_match(1, odds_home=1.9), _match(2)])
+
+        assert (first.version, second.version) == (1, 2)
+        assert len(first.diff.added) == 2
+        assert [m.event_id for m in second.diff.changed] == [1]
+        assert store.latest() is second
+        assert second.age >= 0
+
+    def test_matches_for_filters_live(self):
+        """Test live matches are only returned when requested."""
+        snapshot = OddsStore().publish([_match(1), _match(2, state="STARTED")])
+
+        assert [m.event_id for m in snapshot.matches_for()] == [1]
+        assert [m.event_id for m in snapshot.matches_for(include_live=True)] == [1, 2]
+
+    def test_index_covers_non_live_matches(self):
+        """Test the snapshot index finds scheduled matches but not live ones."""
+        snapshot = OddsStore().publish([_match(1), _match(2, state="STARTED")])
+
+        assert snapshot.index.find("Home 1", "Away 1").event_id == 1
+        assert snapshot.index.find("Home 2", "Away 2") is None
+        assert snapshot.index is snapshot.index
+
+    def test_wait_for_snapshot_times_out(self):
+        """Test waiting returns the current (possibly missing) snapshot on timeout."""
+        store = OddsStore()
+        assert store.wait_for_snapshot(timeout=0.01) is None
+
+        snapshot = store.publish([_match(1)])
+        assert store.wait_for_snapshot(timeout=0.01) is snapshot
+        assert store.wait_for_snapshot(timeout=0.01, newer_than=1) is snapshot
+
+
+class TestOddsPoller:
+    """Tests for the polling thread."""
+
+    def test_failed_poll_keeps_previous_snapshot(self):
+        """Test a fetch error is recorded without discarding the last snapshot."""
+        client = MagicMock()
+        client.iter_all_football_matches.side_effect = [
+            iter([_match(1)]),
+            requests.exceptions.ConnectionError("down"),
+        ]
+        poller = OddsPoller(client)
+
+        first = poller.poll_once()
+        assert poller.poll_once() is None
+
+        assert poller.store.latest() is first
+        assert isinstance(poller.store.last_error, requests.exceptions.ConnectionError)
+        client.iter_all_football_matches.assert_called_with(include_live=True, timeout=15)
+
+    def test_next_delay_within_jitter(self):
+        """Test jittered delays stay within the configured spread."""
+        poller = OddsPoller(MagicMock(), interval=10, jitter=0.2)
+
+        delays = [poller.next_delay() for _ in range(200)]
+
+        assert all(8 <= delay <= 12 for delay in delays)
+        assert len(set(delays)) > 1
+
+    def test_background_thread_polls_and_refreshes(self):
+        """Test the thread polls on start and again when refresh() is called."""
+        poller = OddsPoller(_client([_match(1)], [_match(1), _match(2)]), interval=60)
+
+        poller.start()
+        try:
+            first = poller.store.wait_for_snapshot(timeout=5)
+            poller.refresh()
+            second = poller.store.wait_for_snapshot(timeout=5, newer_than=first.version)
+        finally:
+            poller.stop(timeout=5)
+
+        assert second.version == 2
+        assert [m.event_id for m in second.diff.added] == [2]
+        assert not poller.is_running
+
+    def test_refresh_during_poll_is_not_lost(self):
+        """Test a refresh() requested while a poll runs triggers another poll."""
+        polling = threading.Event()
+        release = threading.Event()
+
+        def slow_first_poll():
+            polling.set()
+            release.wait(5)
+            yield _match(1)
+
+        client = MagicMock()
+        client.iter_all_football_matches.side_effect = [slow_first_poll(), iter([_match(2)])]
+        poller = OddsPoller(client, interval=60)
+
+        poller.start()
+        try:
+            assert polling.wait(5)
+            poller.refresh()
+            release.set()
+            second = poller.store.wait_for_snapshot(timeout=5, newer_than=1)
+        finally:
+            poller.stop(timeout=5)
+
+        assert second.version == 2
+
+    def test_invalid_settings(self):
+        """Test non-positive intervals and out-of-range jitter are rejected."""
+        with pytest.raises(ValueError):
+            OddsPoller(MagicMock(), interval=0)
+        with pytest.raises(ValueError):
+            OddsPoller(MagicMock(), jitter=1.0)
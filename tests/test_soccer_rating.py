@@ -0,0 +1,798 @@
+"""Tests for the soccer-rating.com scraper."""
+
+import io
+import os
+import re
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+import requests
+from bs4 import BeautifulSoup
+
+from soccer_rating import (
+    EloTableIndex,
+    LeagueTables,
+    RateLimiter,
+    SoccerRatingClient,
+    TableCache,
+    TeamPage,
+    all_league_keys,
+    normalize_team_name,
+    parse_ratings_page,
+    parse_team_page,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "soccer_rating"
+
+TEAMS = [("Arsenal", 1850.5), ("Manchester-City", 1902.0), ("Aston-Villa", 1720.25)]
+
+
+def league_page(side: str, teams=TEAMS) -> str:
+    """Build a ratings page shaped like soccer-rating.com's home/ and away/ pages."""
+    rating_rows = "".join(
+        f'<tr><td>{i}.</td><td><a href="/{name}/{100 + i}/">{name.replace("-", " ")}</a></td>'
+        f"<td>10</td><td>1.5</td><td>{rating}</td></tr>"
+        for i, (name, rating) in enumerate(teams, start=1)
+    )
+    standings_rows = "".join(
+        f"<tr><td>{i}.</td><td>{name}</td><td>10</td><td>{30 - i}</td>"
+        f"<td>20:10</td><td>15</td><td>{15 - i}</td></tr>"
+        for i, (name, _) in enumerate(teams, start=1)
+    )
+    return f"""
+    <html><body>
+    <table class="rattab"><tr><th colspan="5">Elo Rating {side}</th></tr>{rating_rows}</table>
+    <table class="rattab"><tr><th colspan="5">Other ranking</th></tr></table>
+    <table class="bigtable">
+      <tr><th>#</th><th>Team</th><th>M</th><th>P.</th><th>Goals</th><th>Home</th><th>Away</th></tr>
+      {standings_rows}
+    </table>
+    </body></html>
+    """
+
+
+def fake_response(text: str, status: int = 200) -> MagicMock:
+    """Build a mock response with raise_for_status behaving like requests."""
+    response = MagicMock()
+    response.content = text.encode("utf-8")
+    response.headers = {"Content-Type": "text/html; charset=utf-8"}
+    response.status_code = status
+    if status >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(f"{status} Error")
+    return response
+
+
+@pytest.fixture
+def client():
+    """Provide a client without rate limiting delays."""
+    client = SoccerRatingClient(rate_limit=1000, burst=1000)
+    yield client
+    client.close()
+
+
+def legacy_parse(home_html: str, away_html: str):
+    """The BeautifulSoup + pd.read_html parsing the lxml parser replaced (reference)."""
+
+    def rating_table(soup, side):
+        for table in soup.find_all("table", class_="rattab"):
+            header = table.find("th")
+            if header and side in header.get_text():
+                teams_data = []
+                for row in table.find_all("tr")[1:]:
+                    cols = row.find_all("td")
+                    if len(cols) == 5:
+                        team_link = cols[1].find("a")
+                        if team_link and team_link.has_attr("href"):
+                            team_url = team_link["href"]
+                            teams_data.append(
+                                {
+                                    "Team": team_url.split("/")[1].replace("-", " "),
+                                    "Rating": float(cols[4].get_text(strip=True)),
+                                    "URL": team_url,
+                                }
+                            )
+                return pd.DataFrame(teams_data)
+        return None
+
+    soup_home = BeautifulSoup(home_html, "lxml")
+    soup_away = BeautifulSoup(away_html, "lxml")
+    league_table = None
+    for candidate in pd.read_html(io.StringIO(str(soup_home)), flavor="lxml"):
+        if {"M", "P.", "Goals", "Home", "Away"}.issubset(set(candidate.columns.astype(str))):
+            league_table = candidate
+            break
+    return rating_table(soup_home, "Home"), rating_table(soup_away, "Away"), league_table
+
+
+def lxml_parse(home_content: bytes, away_content: bytes):
+    """Parse saved pages the way SoccerRatingClient.fetch_tables does."""
+    home = parse_ratings_page(home_content)
+    away = parse_ratings_page(away_content, league_table=False)
+    return home.home, away.away, home.league_table
+
+
+@pytest.fixture(scope="module")
+def saved_pages():
+    """Saved home/ and away/ pages of a league, as raw bytes."""
+    return (FIXTURES / "home.html").read_bytes(), (FIXTURES / "away.html").read_bytes()
+
+
+def legacy_team_parse(html: str, team_name: str, team_url: str):
+    """The BeautifulSoup team page parsing the lxml parser replaced (reference)."""
+    soup = BeautifulSoup(html, "lxml")
+
+    def correct_table(header_text, table_id_1, table_id_2):
+        header = next((th for th in soup.find_all("th") if header_text in th.get_text()), None)
+        team_name_row = header.find_next("tr") if header else None
+        if not team_name_row:
+            return None
+        team_links = team_name_row.find_all("a")
+        for position, table_id in ((0, table_id_1), (1, table_id_2)):
+            if len(team_links) > position and (position == 0 or len(team_links) == 2):
+                href = team_links[position].get("href", "javascript:")
+                if not href.startswith("javascript:") and href.strip("/") == team_url.strip("/"):
+                    return soup.find("table", id=table_id)
+        for position, table_id in ((0, table_id_1), (1, table_id_2)):
+            if len(team_links) > position and (position == 0 or len(team_links) == 2):
+                header_team = re.sub(
+                    r"\s*\([^)]*\)", "", team_links[position].get_text(strip=True)
+                ).strip()
+                if normalize_team_name(header_team) == normalize_team_name(team_name):
+                    return soup.find("table", id=table_id)
+        return None
+
+    def player_text(cell):
+        player_div = cell.find("div", class_="nomobil")
+        if not player_div:
+            return None
+        img_tag = player_div.find("img")
+        return (
+            img_tag.next_sibling.strip()
+            if img_tag and img_tag.next_sibling
+            else player_div.get_text(strip=True)
+        )
+
+    lineup_data = []
+    lineup_table = correct_table("Expected Lineup", "line1", "line2")
+    for row in lineup_table.find_all("tr") if lineup_table else []:
+        cols = row.find_all("td")
+        full_text = player_text(cols[1]) if len(cols) == 4 else None
+        if full_text is None:
+            continue
+        try:
+            match = re.match(r"(.+?)\s*\((.+)\)", full_text)
+            name, pos = (
+                (match.group(1).strip(), match.group(2).strip())
+                if match
+                else (full_text.strip(), "N/A")
+            )
+            lineup_data.append(
+                {
+                    "name": name,
+                    "position": pos,
+                    "stats": cols[2].get_text(strip=True),
+                    "rating": int(cols[3].get_text(strip=True)),
+                }
+            )
+        except ValueError:
+            continue
+
+    squad_data = []
+    squad_table = correct_table("Squad", "squad1", "squad2")
+    for row in squad_table.find_all("tr") if squad_table else []:
+        if row.find("th") or row.find("hr"):
+            continue
+        cols = row.find_all("td")
+        full_text = player_text(cols[0]) if len(cols) == 3 else None
+        if full_text is None:
+            continue
+        try:
+            match = re.match(r"(.+?)\s*\((\d+)\)", full_text)
+            name, age = (
+                (match.group(1).strip(), int(match.group(2))) if match else (full_text, "N/A")
+            )
+            squad_data.append(
+                {"name": name, "age": age, "rating": int(cols[2].get_text(strip=True))}
+            )
+        except ValueError:
+            continue
+
+    matches, points = [], 0
+    matches_table = soup.find("table", {"class": "bigtable", "cellspacing": "0"})
+    for row in matches_table.find_all("tr") if matches_table else []:
+        if len(matches) >= 5:
+            break
+        cols = row.find_all("td")
+        if len(cols) > 9 and "cup" not in cols[7].get_text(strip=True).lower():
+            opponent, result = cols[2].get_text(strip=True), cols[10].get_text(strip=True)
+            if not result:
+                continue
+            matches.append(
+                {
+                    "date": cols[1].get_text(strip=True, separator=" ").split(" ")[0],
+                    "opponent": opponent,
+                    "result": result,
+                }
+            )
+            try:
+                own_score, opp_score = map(int, result.split(":"))
+                is_home_match = team_name.lower() in opponent.split("-")[0].lower()
+                if (is_home_match and own_score > opp_score) or (
+                    not is_home_match and own_score < opp_score
+                ):
+                    points += 3
+                elif own_score == opp_score:
+                    points += 1
+            except ValueError:
+                pass
+    return lineup_data, squad_data, {"matches": matches, "points": points}
+
+
+def team_page(
+    name: str = "Arsenal", url: str = "/Arsenal/101/", hours_old: float = 0.0, error=None
+) -> TeamPage:
+    """Build a parsed team page without scraping."""
+    return TeamPage(
+        team_name=name,
+        team_url=url,
+        lineup=[] if error is None else None,
+        squad=[] if error is None else None,
+        last_matches={"matches": [], "points": 0} if error is None else None,
+        fetched_at=datetime.now() - timedelta(hours=hours_old),
+        error=error,
+    )
+
+
+class TestParsing:
+    """Tests for the single-pass lxml page parser."""
+
+    def test_parse_ratings_page(self):
+        """Test teams come from the URL with their rating and link."""
+        page = parse_ratings_page(league_page("Home"))
+        assert page.home["Team"].tolist() == ["Arsenal", "Manchester City", "Aston Villa"]
+        assert page.home["Rating"].tolist() == [1850.5, 1902.0, 1720.25]
+        assert page.home["URL"].iloc[0] == "/Arsenal/101/"
+        assert page.away is None
+        assert {"M", "P.", "Goals", "Home", "Away"} <= set(page.league_table.columns)
+        assert len(page.league_table) == 3
+
+    def test_league_table_optional(self):
+        """Test the standings are skipped when not requested."""
+        page = parse_ratings_page(league_page("Away"), league_table=False)
+        assert page.away is not None
+        assert page.league_table is None
+
+    def test_matches_legacy_parser_on_saved_pages(self, saved_pages):
+        """Test the lxml parser returns exactly what BeautifulSoup + read_html did."""
+        home_content, away_content = saved_pages
+        expected = legacy_parse(home_content.decode("utf-8"), away_content.decode("utf-8"))
+        for actual, reference in zip(lxml_parse(home_content, away_content), expected):
+            pd.testing.assert_frame_equal(actual, reference)
+
+    def test_matches_legacy_parser_on_hidden_markup(self):
+        """Test hidden rows, cells and tables and &nbsp; are read like read_html reads them."""
+        home_html = (
+            league_page("Home")
+            .replace(
+                '<table class="bigtable">',
+                '<table class="bigtable" style="display: none"><tr><th>M</th><th>P.</th>'
+                "<th>Goals</th><th>Home</th><th>Away</th></tr><tr><td>1</td><td>2</td><td>3</td>"
+                '<td>4</td><td>5</td></tr></table><table class="bigtable">',
+            )
+            .replace("<td>Arsenal</td>", '<td>Arsenal<sup style="display:none">3</sup></td>')
+            .replace("<td>Aston-Villa</td>", "<td>Aston&nbsp;Villa  FC\n</td>")
+            .replace(
+                "<tr><td>2.</td>",
+                '<tr style="display:none"><td>9.</td><td>Hidden</td><td>1</td><td>1</td>'
+                "<td>0:0</td><td>1</td><td>1</td></tr><tr><td>2.</td>",
+            )
+        )
+        away_html = league_page("Away")
+        expected = legacy_parse(home_html, away_html)
+        actual = lxml_parse(home_html.encode("utf-8"), away_html.encode("utf-8"))
+
+        assert len(expected[2]) == 3
+        assert expected[2].iloc[:, 1].tolist() == [
+            "Arsenal",
+            "Manchester-City",
+            "Aston\xa0Villa FC",
+        ]
+        for table, reference in zip(actual, expected):
+            pd.testing.assert_frame_equal(table, reference)
+
+    def test_declared_charset_is_used(self):
+        """Test bytes are decoded with the server's charset when there is no meta tag."""
+        html = (
+            league_page("Home")
+            .replace("Arsenal", "Bor\u00e5s")
+            .replace("<html>", "<html><head></head>")
+        )
+        page = parse_ratings_page(html.encode("cp1252"), encoding="cp1252")
+        assert page.home["Team"].iloc[0] == "Bor\u00e5s"
+
+    @pytest.mark.slow
+    def test_benchmark_against_legacy_parser(self, saved_pages):
+        """Benchmark parse time and Python heap peak per league against the old path."""
+        home_content, away_content = saved_pages
+        home_html, away_html = home_content.decode("utf-8"), away_content.decode("utf-8")
+
+        def measure(parse, *pages, repeat=5):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                parse(*pages)
+            elapsed = (time.perf_counter() - started) / repeat
+            tracemalloc.start()
+            parse(*pages)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return elapsed, peak
+
+        legacy_time, legacy_peak = measure(legacy_parse, home_html, away_html)
+        lxml_time, lxml_peak = measure(lxml_parse, home_content, away_content)
+        print(
+            f"\nlegacy: {legacy_time * 1000:.1f} ms, {legacy_peak / 1024:.0f} KiB; "
+            f"lxml: {lxml_time * 1000:.1f} ms, {lxml_peak / 1024:.0f} KiB"
+        )
+        assert lxml_time * 3 < legacy_time
+        assert lxml_peak * 3 < legacy_peak
+
+
+class TestTeamPageParsing:
+    """Tests for the lxml team page parser."""
+
+    TEAMS = [
+        ("Bayern Munich", "/Bayern-Munich/5/"),  # Matched by URL
+        (
+            "Borussia Dortmund",
+            "/Borussia-Dortmund/7/",
+        ),  # Matched by name, the header link is javascript:
+        ("Unknown FC", "/Unknown-FC/9/"),  # Not on the page
+    ]
+
+    @pytest.fixture(scope="class")
+    def saved_team_page(self):
+        return (FIXTURES / "team.html").read_bytes()
+
+    @pytest.mark.parametrize("team_name,team_url", TEAMS)
+    def test_matches_legacy_parser(self, saved_team_page, team_name, team_url):
+        """Test the lxml parser returns exactly what the BeautifulSoup parser did."""
+        page = parse_team_page(saved_team_page, team_name, team_url)
+        assert page.ok
+        assert page.as_tuple() == legacy_team_parse(
+            saved_team_page.decode("utf-8"), team_name, team_url
+        )
+
+    def test_team_tables_and_form(self, saved_team_page):
+        """Test the right side's tables are picked and the form skips cups and empty results."""
+        home = parse_team_page(saved_team_page, "Bayern Munich", "/Bayern-Munich/5/")
+        away = parse_team_page(saved_team_page, "Borussia Dortmund", "/Borussia-Dortmund/7/")
+        assert len(home.lineup) == 15  # 16 players, one without a numeric rating
+        assert len(away.lineup) == 14
+        assert len(home.squad) == 24 and len(away.squad) == 22
+        assert home.lineup[0]["position"] == "GK"
+        assert all(isinstance(player["age"], int) for player in home.squad[:9])
+        assert home.squad[9]["age"] == "N/A"
+        dates = [match["date"] for match in home.last_matches["matches"]]
+        assert dates == ["10.03.25", "13.03.25", "14.03.25", "15.03.25", "16.03.25"]
+
+    def test_missing_sections(self):
+        """Test a page without the expected sections parses to empty data."""
+        page = parse_team_page(
+            b"<html><body><p>Maintenance</p></body></html>", "Arsenal", "/Arsenal/1/"
+        )
+        assert page.as_tuple() == ([], [], {"matches": [], "points": 0})
+
+    @pytest.mark.slow
+    def test_benchmark_against_legacy_parser(self, saved_team_page):
+        """Benchmark parse time per team page against the old path."""
+        html = saved_team_page.decode("utf-8")
+
+        def measure(parse, content, repeat=10):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                parse(content, "Bayern Munich", "/Bayern-Munich/5/")
+            return (time.perf_counter() - started) / repeat
+
+        legacy_time = measure(legacy_team_parse, html)
+        lxml_time = measure(parse_team_page, saved_team_page)
+        print(f"\nlegacy: {legacy_time * 1000:.1f} ms; lxml: {lxml_time * 1000:.1f} ms")
+        assert lxml_time * 3 < legacy_time
+
+
+class TestRateLimiter:
+    """Tests for the token bucket rate limiter."""
+
+    def test_burst_then_rate(self):
+        """Test the burst passes immediately and later calls are spaced at the rate."""
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+
+        limiter = RateLimiter(rate=2.0, burst=2, clock=lambda: now[0], sleep=sleep)
+        assert [limiter.acquire() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+        assert sleeps == [0.5, 1.0]
+
+        now[0] = 10.0  # Idle long enough to refill the bucket, but not beyond burst
+        assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.5]
+
+    def test_invalid_settings(self):
+        """Test non-positive rate or burst is rejected."""
+        with pytest.raises(ValueError):
+            RateLimiter(rate=0)
+        with pytest.raises(ValueError):
+            RateLimiter(rate=1, burst=0)
+
+
+class TestSoccerRatingClient:
+    """Tests for concurrent fetching and prefetching."""
+
+    def test_home_and_away_fetched_concurrently(self, client):
+        """Test both pages are in flight at the same time over the pooled session."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fake_get(url, **kwargs):
+            barrier.wait()  # Deadlocks (and times out) if the fetches were serial
+            side = "Home" if url.endswith("/home/") else "Away"
+            return fake_response(league_page(side))
+
+        with patch.object(client.session, "get", side_effect=fake_get) as mock_get:
+            result = client.fetch_tables("England", "UK1")
+
+        assert result.ok, result.error
+        assert result.away["Rating"].tolist() == [1850.5, 1902.0, 1720.25]
+        assert len(result.league_table) == 3
+        urls = sorted(call.args[0] for call in mock_get.call_args_list)
+        assert urls == [
+            "https://www.soccer-rating.com/England/UK1/away/",
+            "https://www.soccer-rating.com/England/UK1/home/",
+        ]
+        assert (
+            mock_get.call_args.kwargs["headers"]["Referer"]
+            == "https://www.soccer-rating.com/England/UK1/"
+        )
+
+    def test_results_served_from_cache_until_stale(self, client):
+        """Test a fresh stored result skips the network and a stale one is refetched."""
+        with patch.object(
+            client.session,
+            "get",
+            side_effect=lambda url, **kw: fake_response(
+                league_page("Home" if "/home/" in url else "Away")
+            ),
+        ) as mock_get:
+            first = client.fetch_tables("England", "UK1")
+            assert client.fetch_tables("England", "UK1") is first
+            assert mock_get.call_count == 2
+
+            second = client.fetch_tables("England", "UK1", max_age=0, background_refresh=False)
+            assert second is not first
+            assert mock_get.call_count == 4
+
+    def test_stale_tables_served_while_revalidating(self, client):
+        """Test stale tables return at once and a single background refresh replaces them."""
+        stale = LeagueTables(
+            "England",
+            "UK1",
+            home=pd.DataFrame({"Team": ["Old"], "Rating": [1.0], "URL": ["/Old/1/"]}),
+            fetched_at=datetime.now() - timedelta(hours=2),
+        )
+        client.table_cache.put(("England", "UK1"), stale)
+        release = threading.Event()
+
+        def fake_get(url, **kwargs):
+            release.wait(5)
+            return fake_response(league_page("Home" if "/home/" in url else "Away"))
+
+        with patch.object(client.session, "get", side_effect=fake_get) as mock_get:
+            assert client.fetch_tables("England", "UK1") is stale
+            assert client.fetch_tables("England", "UK1") is stale  # Refresh already queued
+            release.set()
+            for _ in range(500):  # Wait for the refresh to finish
+                if ("England", "UK1") not in client._refreshing:
+                    break
+                time.sleep(0.01)
+
+        assert mock_get.call_count == 2
+        refreshed = client.fetch_tables("England", "UK1")
+        assert refreshed.home["Team"].tolist() == ["Arsenal", "Manchester City", "Aston Villa"]
+
+    def test_tables_past_max_stale_are_refetched(self, client):
+        """Test very old tables are not served while refreshing."""
+        client.table_cache.put(
+            ("England", "UK1"),
+            LeagueTables(
+                "England",
+                "UK1",
+                home=pd.DataFrame({"Team": ["Old"]}),
+                fetched_at=datetime.now() - timedelta(seconds=client.max_stale + 1),
+            ),
+        )
+        with patch.object(
+            client.session,
+            "get",
+            side_effect=lambda url, **kw: fake_response(
+                league_page("Home" if "/home/" in url else "Away")
+            ),
+        ):
+            assert len(client.fetch_tables("England", "UK1").home) == 3
+
+    def test_failure_is_reported_not_raised(self, client):
+        """Test HTTP errors end up in the result and are not stored."""
+        with patch.object(client.session, "get", return_value=fake_response("", status=503)):
+            result = client.fetch_tables("England", "UK1")
+
+        assert not result.ok
+        assert "HTTPError" in result.error
+        assert result.as_tuple() == (None, None, None)
+
+    def test_prefetch_report(self, client):
+        """Test prefetching reports per-league timings and failures, in input order."""
+
+        def fake_get(url, **kwargs):
+            if "/DE1/" in url:
+                return fake_response("", status=500)
+            return fake_response(league_page("Home" if "/home/" in url else "Away"))
+
+        leagues = [("England", "UK1"), ("Germany", "DE1"), ("Spain", "ES1"), ("England", "UK1")]
+        with patch.object(client.session, "get", side_effect=fake_get) as mock_get:
+            report = client.prefetch_leagues(leagues, max_workers=3)
+            assert mock_get.call_count == 6
+
+            # Prefetched leagues are now answered from memory
+            assert client.fetch_tables("Spain", "ES1").ok
+            assert mock_get.call_count == 6
+
+        assert list(report.results) == [("England", "UK1"), ("Germany", "DE1"), ("Spain", "ES1")]
+        assert [(r.country, r.league) for r in report.failed] == [("Germany", "DE1")]
+        assert report.workers == 3
+        assert all(result.latency > 0 for result in report.results.values())
+        assert "2/3 leagues" in report.summary
+
+    def test_rate_limit_is_per_host(self, client):
+        """Test one limiter is shared by every request to the same host."""
+        assert client._limiter("https://www.soccer-rating.com/a/") is client._limiter(
+            "https://www.soccer-rating.com/b/"
+        )
+        assert client._limiter("https://example.com/") is not client._limiter(
+            "https://www.soccer-rating.com/"
+        )
+
+    def test_all_league_keys(self):
+        """Test the default prefetch set covers config.LEAGUES_DATA without duplicates."""
+        keys = all_league_keys()
+        assert ("England", "UK1") in keys
+        assert len(keys) == len(set(keys))
+
+
+class TestTeamPages:
+    """Tests for batch team page fetching and the per-league team page cache."""
+
+    TEAMS = [
+        ("Bayern Munich", "/Bayern-Munich/5/"),
+        ("Dortmund", "/Dortmund/7/"),
+        ("Mainz", "/Mainz/9/"),
+    ]
+
+    @pytest.fixture
+    def team_html(self):
+        return (FIXTURES / "team.html").read_text(encoding="utf-8")
+
+    def test_batch_fetches_concurrently_and_caches(self, client, team_html):
+        """Test every page is in flight at once and later selections skip the network."""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fake_get(url, **kwargs):
+            barrier.wait()  # Deadlocks (and times out) if the fetches were serial
+            return fake_response(team_html)
+
+        with patch.object(client.session, "get", side_effect=fake_get) as mock_get:
+            pages = client.fetch_team_pages("Germany", "DE1", self.TEAMS + [self.TEAMS[0]])
+            assert mock_get.call_count == 3
+
+            page = client.team_page("Germany", "DE1", "Bayern Munich", "/Bayern-Munich/5/")
+            assert client.fetch_team_pages("Germany", "DE1", self.TEAMS).pages == pages.pages
+            assert mock_get.call_count == 3
+
+        assert sorted(pages.pages) == sorted(url for _, url in self.TEAMS)
+        assert page is pages.pages["/Bayern-Munich/5/"]
+        assert len(page.lineup) == 15
+        urls = sorted(call.args[0] for call in mock_get.call_args_list)
+        assert urls[0] == "https://www.soccer-rating.com/Bayern-Munich/5/"
+
+    def test_team_page_miss_is_fetched_and_stored(self, client, team_html):
+        """Test a team outside the cached batch is scraped once and then cached."""
+        with patch.object(client.session, "get", return_value=fake_response(team_html)) as mock_get:
+            assert client.cached_team_page("Germany", "DE1", "/Bayern-Munich/5/") is None
+            first = client.team_page("Germany", "DE1", "Bayern Munich", "/Bayern-Munich/5/")
+            assert client.team_page("Germany", "DE1", "Bayern Munich", "/Bayern-Munich/5/") is first
+            assert mock_get.call_count == 1
+
+    def test_stale_pages_are_refetched(self, client, team_html):
+        """Test only pages older than max_age are fetched again."""
+        client._store_team_pages(
+            "Germany",
+            "DE1",
+            [
+                team_page("Bayern Munich", "/Bayern-Munich/5/", hours_old=2),
+                team_page("Dortmund", "/Dortmund/7/"),
+                team_page("Mainz", "/Mainz/9/"),
+            ],
+            0.0,
+        )
+        with patch.object(client.session, "get", return_value=fake_response(team_html)) as mock_get:
+            client.fetch_team_pages("Germany", "DE1", self.TEAMS)
+
+        assert [call.args[0] for call in mock_get.call_args_list] == [
+            "https://www.soccer-rating.com/Bayern-Munich/5/"
+        ]
+
+    def test_failures_do_not_replace_good_pages(self, client):
+        """Test a failed scrape is reported but keeps the previously stored page."""
+        good = team_page("Mainz", "/Mainz/9/", hours_old=2)
+        client._store_team_pages("Germany", "DE1", [good], 0.0)
+        with patch.object(client.session, "get", return_value=fake_response("", status=503)):
+            pages = client.fetch_team_pages("Germany", "DE1", self.TEAMS)
+            page = client.team_page("Germany", "DE1", "Dortmund", "/Dortmund/7/")
+
+        assert pages.pages["/Mainz/9/"] is good
+        assert sorted(page.team_url for page in pages.failed) == [
+            "/Bayern-Munich/5/",
+            "/Dortmund/7/",
+        ]
+        assert "HTTPError" in page.error
+        assert page.as_tuple() == (None, None, None)
+
+    def test_background_batch_runs_once_per_league(self, client, team_html):
+        """Test a second prefetch of the same league is dropped while the first runs."""
+        release = threading.Event()
+
+        def fake_get(url, **kwargs):
+            release.wait(5)
+            return fake_response(team_html)
+
+        with patch.object(client.session, "get", side_effect=fake_get) as mock_get:
+            assert client.prefetch_team_pages("Germany", "DE1", self.TEAMS)
+            assert not client.prefetch_team_pages("Germany", "DE1", self.TEAMS)
+            release.set()
+            for _ in range(500):  # Wait for the batch to finish
+                if ("team_pages", "Germany", "DE1") not in client._refreshing:
+                    break
+                time.sleep(0.01)
+
+        assert mock_get.call_count == 3
+        assert client.cached_team_page("Germany", "DE1", "/Mainz/9/") is not None
+
+
+class TestEloTableIndex:
+    """Tests for the team lookup index built over a rating table."""
+
+    @pytest.fixture
+    def table(self):
+        return pd.DataFrame(
+            {
+                "Team": ["Bayern Munich", "1. FC Köln", "Borussia Dortmund", "1 FC Koeln"],
+                "Rating": [1900.0, 1650.0, 1800.0, 1000.0],
+                "URL": [
+                    "/Bayern-Munich/1/",
+                    "/1.-FC-Koeln/2/",
+                    "/Borussia-Dortmund/3/",
+                    "/1-FC-Koeln/4/",
+                ],
+            }
+        )
+
+    def test_exact_and_normalized_lookups(self, table):
+        """Test exact and normalized names resolve to the first matching row."""
+        index = EloTableIndex(table)
+        assert len(index) == 4
+        assert index.position("Borussia Dortmund") == 2
+        assert index.position("borussia dortmund") is None
+        assert index.position(None) is None
+        assert index.normalized_position("1.FC Köln") == 1  # Not the later "1 FC Koeln"
+        assert index.normalized_names[1] == "1 fc koeln"
+        assert index.row(index.normalized_position("BAYERN MUNICH"))["Rating"] == 1900.0
+
+    def test_built_once_per_tables_and_kept_off_disk(self, tmp_path, table):
+        """Test the index is cached on LeagueTables but not written to the disk cache."""
+        tables = LeagueTables("Germany", "DE1", home=table, away=table)
+        assert tables.home_index is tables.home_index
+        assert tables.away_index is not tables.home_index
+        TableCache(tmp_path).put(("Germany", "DE1"), tables)
+
+        loaded = TableCache(tmp_path).get(("Germany", "DE1"))
+        assert "home_index" not in loaded.__dict__
+        assert loaded.home_index.position("Bayern Munich") == 0
+        assert LeagueTables("Germany", "DE1").home_index is None
+
+    def test_scrape_builds_indexes(self, client):
+        """Test scraped tables come with their indexes ready."""
+        with patch.object(
+            client.session,
+            "get",
+            side_effect=lambda url, **kw: fake_response(
+                league_page("Home" if "/home/" in url else "Away")
+            ),
+        ):
+            result = client.fetch_tables("England", "UK1")
+
+        assert {"home_index", "away_index"} <= set(result.__dict__)
+        assert result.away_index.normalized_position("manchester-city") == 1
+
+
+class TestTableCache:
+    """Tests for the disk-backed table cache and its snapshots."""
+
+    @staticmethod
+    def tables(league="UK1", age_hours=0.0):
+        return LeagueTables(
+            "England",
+            league,
+            home=pd.DataFrame({"Team": ["Arsenal"], "Rating": [1850.5], "URL": ["/Arsenal/1/"]}),
+            fetched_at=datetime.now() - timedelta(hours=age_hours),
+        )
+
+    def test_entries_survive_new_instances(self, tmp_path):
+        """Test tables written by one cache are read back by another."""
+        TableCache(tmp_path).put(("England", "UK1"), self.tables())
+
+        reopened = TableCache(tmp_path)
+        entry = reopened.get(("England", "UK1"))
+        pd.testing.assert_frame_equal(entry.home, self.tables().home)
+        assert reopened.get(("England", "UK2")) is None
+        assert len(reopened) == 1
+
+    def test_newer_files_from_other_workers_are_reloaded(self, tmp_path):
+        """Test a worker picks up tables another worker rewrote on disk."""
+        reader = TableCache(tmp_path)
+        writer = TableCache(tmp_path)
+        writer.put(("England", "UK1"), self.tables(age_hours=3))
+        stale = reader.get(("England", "UK1"))
+        assert reader.get(("England", "UK1")) is stale
+
+        writer.put(("England", "UK1"), self.tables(age_hours=0))
+        path = reader._path(("England", "UK1"))
+        mtime = path.stat().st_mtime_ns + 1_000_000_000
+        os.utime(path, ns=(mtime, mtime))
+        assert reader.get(("England", "UK1")).age < 3600
+
+    def test_corrupt_files_are_ignored(self, tmp_path):
+        """Test unreadable cache files count as misses."""
+        cache = TableCache(tmp_path)
+        cache._path(("England", "UK1")).write_bytes(b"not a pickle")
+        assert cache.get(("England", "UK1")) is None
+
+    def test_snapshot_warms_an_empty_cache(self, tmp_path):
+        """Test a snapshot fills a new cache, keeping newer local entries."""
+        source = TableCache()
+        source.put(("England", "UK1"), self.tables("UK1", age_hours=3))
+        source.put(("England", "UK2"), self.tables("UK2", age_hours=3))
+        snapshot = tmp_path / "snapshot.pkl.gz"
+        assert source.write_snapshot(snapshot) == 2
+
+        target = TableCache(tmp_path / "cache")
+        newer = self.tables("UK2", age_hours=0)
+        target.put(("England", "UK2"), newer)
+        assert target.load_snapshot(snapshot) == 1
+        assert target.get(("England", "UK2")) is newer
+        assert target.get(("England", "UK1")).age > 3600
+        assert TableCache(tmp_path / "cache").get(("England", "UK1")) is not None
+
+    def test_missing_snapshot(self, tmp_path):
+        """Test loading a snapshot that does not exist is a no-op."""
+        assert TableCache().load_snapshot(tmp_path / "missing.pkl.gz") == 0
+
+    def test_clear(self, tmp_path):
+        """Test clear drops memory and disk entries."""
+        cache = TableCache(tmp_path)
+        cache.put(("England", "UK1"), self.tables())
+        cache.clear()
+        assert len(cache) == 0
+        assert TableCache(tmp_path).get(("England", "UK1")) is None
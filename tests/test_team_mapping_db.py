@@ -0,0 +1,382 @@
+"""Tests for the team mapping database service."""
+
+import io
+import sqlite3
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from team_mapping_db import TeamMappingService, read_mapping_rows
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Provide a mapping service backed by a temporary database."""
+    return TeamMappingService(db_path=str(tmp_path / "mappings.db"))
+
+
+ELO_TEAMS = ["Manchester United", "Manchester City", "Liverpool", "Arsenal", "Tottenham"]
+
+
+class TestBulkLookups:
+    """Tests for the bulk mapping and fuzzy matching helpers."""
+
+    def test_get_mappings_matches_single_lookups(self, service):
+        """Test league-specific mappings take precedence, as in get_mapping."""
+        service.add_mapping("Man Utd", "Manchester United")
+        service.add_mapping("Man Utd", "Manchester United U21", league_filter="U21 League")
+        service.add_mapping("Spurs", "Tottenham", league_filter="Premier League")
+        names = ["Man Utd", "Spurs", "Unknown", "Man Utd"]
+
+        for league in (None, "U21 League", "Premier League"):
+            expected = {
+                name: service.get_mapping(name, league)
+                for name in names
+                if service.get_mapping(name, league)
+            }
+            assert service.get_mappings(names, league) == expected
+
+        assert service.get_mappings([], "Premier League") == {}
+
+    def test_get_mappings_large_inputs(self, service):
+        """Test many names resolve in one call."""
+        names = [f"Team {i}" for i in range(1200)]
+        service.add_mapping("Team 1199", "Elo Team")
+
+        assert service.get_mappings(names) == {"Team 1199": "Elo Team"}
+
+    def test_find_fuzzy_matches_agrees_with_loop(self, service):
+        """Test the cdist resolver returns what find_fuzzy_match does per name."""
+        names = ["Manchester Utd", "Man City", "Liverpool FC", "Arsenal", "Barcelona"]
+
+        bulk = service.find_fuzzy_matches(names, ELO_TEAMS, threshold=60)
+
+        for name in names:
+            single = service.find_fuzzy_match(name, ELO_TEAMS, threshold=60)
+            if single is None:
+                assert name not in bulk
+            else:
+                assert bulk[name][0] == single[0]
+                assert bulk[name][1] == pytest.approx(single[1])
+
+    def test_suggest_mappings(self, service):
+        """Test bulk suggestions carry confidence levels and are never saved."""
+        suggestions = service.suggest_mappings(["Arsenal", "Liverpool FC", "Barcelona"], ELO_TEAMS)
+
+        assert suggestions["Arsenal"] == ("Arsenal", 100.0, "auto_high")
+        assert suggestions["Liverpool FC"][0] == "Liverpool"
+        assert suggestions["Liverpool FC"][2] in ("auto_medium", "auto_low")
+        assert "Barcelona" not in suggestions
+        assert service.get_all_mappings() == []
+        assert service.suggest_mappings(["Arsenal"], []) == {}
+
+
+class TestConnections:
+    """Tests for persistent connections and transactions."""
+
+    def test_persistent_connection_uses_wal(self, service):
+        """Test one configured connection is reused per thread."""
+        conn = service._get_connection()
+
+        assert service._get_connection() is conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+    def test_threads_get_separate_connections(self, service):
+        """Test each thread has its own connection and sees committed writes."""
+        service.add_mapping("Spurs", "Tottenham")
+        seen = {}
+
+        def worker():
+            seen["conn"] = service._get_connection()
+            seen["mapping"] = service.get_mapping("Spurs")
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        assert seen["conn"] is not service._get_connection()
+        assert seen["mapping"] == "Tottenham"
+
+    @pytest.mark.parametrize("persistent", [True, False])
+    def test_transaction_groups_and_rolls_back(self, tmp_path, persistent):
+        """Test nested calls commit together and an error undoes all of them."""
+        service = TeamMappingService(db_path=str(tmp_path / "tx.db"), persistent=persistent)
+
+        with service.transaction():
+            service.add_mapping("Man Utd", "Manchester United")
+            service.add_mapping("Spurs", "Tottenham")
+            assert service.get_mapping("Spurs") == "Tottenham"
+
+        with pytest.raises(RuntimeError):
+            with service.transaction():
+                service.add_mapping("Wolves", "Wolverhampton")
+                raise RuntimeError("abort")
+
+        assert {m.kambi_team_name for m in service.get_all_mappings()} == {"Man Utd", "Spurs"}
+        service.close()
+
+    def test_close_reopens_lazily(self, service):
+        """Test the service keeps working after close()."""
+        service.add_mapping("Spurs", "Tottenham")
+        service.close()
+
+        assert service.get_mapping("Spurs") == "Tottenham"
+
+
+class TestMappingSnapshot:
+    """Tests for the in-memory mapping snapshot."""
+
+    def test_lookups_do_not_touch_database(self, service):
+        """Test repeated lookups are served from memory once loaded."""
+        service.add_mapping("Spurs", "Tottenham")
+        service.add_league_mapping("Premier League", "england")
+        service.get_mapping("Spurs")
+
+        with patch.object(service, "_connection", side_effect=AssertionError("DB access")):
+            assert service.get_mapping("Spurs", "Premier League") == "Tottenham"
+            assert service.get_mapping("Unknown") is None
+            assert service.get_league_mapping("Premier League") == "england"
+
+    def test_writes_go_through_without_reload(self, service):
+        """Test add_mapping updates the snapshot and advances its version."""
+        service.get_mapping("Spurs")
+        version = service.mapping_version
+
+        service.add_mapping("Spurs", "Tottenham", league_filter="Premier League")
+        service.add_league_mapping("La Liga", "spain")
+
+        with patch.object(service, "_connection", side_effect=AssertionError("DB access")):
+            assert service.get_mapping("Spurs", "Premier League") == "Tottenham"
+            assert service.get_league_mapping("La Liga") == "spain"
+        assert service.mapping_version == version + 2
+
+    def test_unfiltered_duplicates_keep_oldest_row(self, service):
+        """Test the snapshot mirrors SQLite's NULL-distinct unique constraint."""
+        service.add_mapping("Spurs", "Tottenham")
+        service.add_mapping("Spurs", "Tottenham Hotspur")
+
+        assert service.get_mapping("Spurs") == "Tottenham"
+        service.invalidate_snapshot()
+        assert service.get_mapping("Spurs") == "Tottenham"
+
+    def test_external_changes_are_detected(self, tmp_path):
+        """Test edits by another service instance are picked up via the version."""
+        db_path = str(tmp_path / "shared.db")
+        reader = TeamMappingService(db_path=db_path, snapshot_check_interval=0)
+        writer = TeamMappingService(db_path=db_path)
+
+        assert reader.get_mapping("Spurs") is None
+        mapping = writer.add_mapping("Spurs", "Tottenham")
+        assert reader.get_mapping("Spurs") == "Tottenham"
+
+        writer.delete_mapping(mapping.id)
+        assert reader.get_mapping("Spurs") is None
+
+    def test_rollback_discards_written_through_entries(self, service):
+        """Test a rolled-back transaction does not leave entries in memory."""
+        service.get_mapping("Spurs")
+
+        with pytest.raises(RuntimeError):
+            with service.transaction():
+                service.add_mapping("Spurs", "Tottenham")
+                raise RuntimeError("abort")
+
+        assert service.get_mapping("Spurs") is None
+
+
+class TestUnmappedRecorder:
+    """Tests for the buffered unmapped team/league recorder."""
+
+    def test_sightings_are_coalesced_into_one_write(self, service):
+        """Test repeated misses become one row written in a single transaction."""
+        with patch.object(service, "transaction", wraps=service.transaction) as transaction:
+            for _ in range(5):
+                service.record_unmapped_team("Foo FC", "kambi", "Premier League")
+            service.record_unmapped_team("Bar FC", "kambi", "Premier League")
+            service.record_unmapped_league("Mystery League")
+            service.record_unmapped_league("Mystery League")
+
+            assert transaction.call_count == 0
+            assert service.unmapped_recorder.pending == 3
+            assert service.unmapped_recorder.flush() == 3
+            assert transaction.call_count == 1
+
+        teams = {row["team_name"]: row["occurrence_count"] for row in service.get_unmapped_teams()}
+        assert teams == {"Foo FC": 5, "Bar FC": 1}
+        assert service.get_unmapped_leagues()[0]["occurrence_count"] == 2
+
+        service.record_unmapped_team("Foo FC", "kambi", "Premier League")
+        assert service.get_unmapped_teams()[0]["occurrence_count"] == 6
+
+    def test_reads_include_buffered_sightings(self, service):
+        """Test get_unmapped_teams flushes first and clear drops the buffer."""
+        service.record_unmapped_team("Foo FC", "kambi")
+        assert [row["team_name"] for row in service.get_unmapped_teams("kambi")] == ["Foo FC"]
+
+        service.record_unmapped_team("Bar FC", "kambi")
+        service.clear_unmapped_teams()
+        assert service.get_unmapped_teams() == []
+        assert service.unmapped_recorder.pending == 0
+
+    def test_close_unregisters_atexit_hook(self, service):
+        """Test closed recorders are not kept alive by atexit until exit."""
+        recorder = service.unmapped_recorder
+        with patch("team_mapping_db.atexit") as mock_atexit:
+            service.record_unmapped_team("Foo FC", "kambi")
+            mock_atexit.register.assert_called_once_with(recorder.close)
+
+            recorder.close()
+            mock_atexit.unregister.assert_called_once_with(recorder.close)
+            recorder.close()
+            assert mock_atexit.unregister.call_count == 1
+
+    def test_batch_size_triggers_background_flush(self, tmp_path):
+        """Test reaching the batch size flushes without waiting for the timer."""
+        db_path = str(tmp_path / "mappings.db")
+        service = TeamMappingService(
+            db_path=db_path, unmapped_flush_interval=60, unmapped_batch_size=3
+        )
+        for name in ("A", "B", "C"):
+            service.record_unmapped_team(name, "kambi")
+
+        conn = sqlite3.connect(db_path)
+        try:
+            for _ in range(200):
+                if conn.execute("SELECT COUNT(*) FROM unmapped_teams").fetchone()[0] == 3:
+                    break
+                threading.Event().wait(0.01)
+            assert conn.execute("SELECT COUNT(*) FROM unmapped_teams").fetchone()[0] == 3
+        finally:
+            conn.close()
+            service.close()
+
+    def test_failed_flush_keeps_batch(self, service):
+        """Test a failed write merges the batch back for the next flush."""
+        service.record_unmapped_team("Foo FC", "kambi")
+        with patch.object(service, "transaction", side_effect=sqlite3.OperationalError("locked")):
+            assert service.unmapped_recorder.flush() == 0
+        service.record_unmapped_team("Foo FC", "kambi")
+
+        assert service.unmapped_recorder.flush() == 1
+        assert service.get_unmapped_teams()[0]["occurrence_count"] == 2
+
+    def test_close_flushes_pending(self, tmp_path):
+        """Test closing the service writes buffered sightings."""
+        db_path = str(tmp_path / "mappings.db")
+        service = TeamMappingService(db_path=db_path, unmapped_flush_interval=60)
+        service.record_unmapped_league("Mystery League")
+        service.close()
+
+        reopened = TeamMappingService(db_path=db_path)
+        assert [row["league_name"] for row in reopened.get_unmapped_leagues()] == ["Mystery League"]
+
+    def test_invalid_settings(self, tmp_path):
+        """Test non-positive flush settings are rejected."""
+        with pytest.raises(ValueError):
+            TeamMappingService(db_path=str(tmp_path / "a.db"), unmapped_flush_interval=0)
+        with pytest.raises(ValueError):
+            TeamMappingService(db_path=str(tmp_path / "b.db"), unmapped_batch_size=0)
+
+
+class TestBulkImportExport:
+    """Tests for the bulk import and streaming export paths."""
+
+    def test_import_reports_changes_and_conflicts(self, service):
+        """Test one import inserts, updates, skips identical rows and reports conflicts."""
+        service.add_mapping("Spurs", "Tottenham")
+        service.add_mapping("Man Utd", "Manchester United", confidence="auto_high")
+        service.add_mapping("Wolves", "Wolverhampton")
+
+        report = service.import_mappings(
+            [
+                {"kambi_team_name": "Spurs", "elo_team_name": "Tottenham"},
+                {"kambi_team_name": "Man Utd", "elo_team_name": "Manchester United"},
+                {"kambi_team_name": "Wolves", "elo_team_name": "Wolves"},
+                {"kambi_team_name": "Arsenal FC", "elo_team_name": "Arsenal", "league_filter": ""},
+                {"kambi_team_name": "Villa", "elo_team_name": "Aston Villa"},
+                {
+                    "kambi_team_name": "Villa",
+                    "elo_team_name": "Villarreal",
+                    "league_filter": "La Liga",
+                },
+                {"kambi_team_name": "Bad row"},
+            ]
+        )
+
+        assert (report.inserted, report.updated, report.unchanged) == (3, 2, 1)
+        assert [
+            (c["kambi_team_name"], c["existing"], c["incoming"], c["source"])
+            for c in report.conflicts
+        ] == [("Wolves", "Wolverhampton", "Wolves", "database")]
+        assert len(report.errors) == 1 and "Row 7" in report.errors[0]
+        assert service.get_mapping("Wolves") == "Wolves"
+        assert service.get_mapping("Arsenal FC") == "Arsenal"
+        assert service.get_mapping("Villa", "La Liga") == "Villarreal"
+        # The unfiltered Wolves row was updated in place, not duplicated
+        assert len(service.get_all_mappings()) == 6
+
+    def test_import_without_overwrite_keeps_existing(self, service):
+        """Test conflicting rows are skipped when overwrite is off."""
+        service.add_league_mapping("England - Premier League", "ENG1")
+
+        report = service.import_league_mappings(
+            [
+                {"kambi_league_name": "England - Premier League", "elo_league_key": "ENG2"},
+                {"kambi_league_name": "Spain - La Liga", "elo_league_key": "ESP"},
+                {"kambi_league_name": "Spain - La Liga", "elo_league_key": "ESP1"},
+            ],
+            overwrite=False,
+        )
+
+        assert (report.inserted, report.skipped) == (1, 1)
+        assert {c["source"] for c in report.conflicts} == {"database", "import"}
+        assert service.get_league_mapping("England - Premier League") == "ENG1"
+        assert service.get_league_mapping("Spain - La Liga") == "ESP1"
+
+    def test_import_is_one_transaction(self, service):
+        """Test a large import commits once and rolls back as a whole."""
+        rows = [{"kambi_team_name": f"Team {i}", "elo_team_name": f"Elo {i}"} for i in range(2000)]
+        with patch.object(service, "transaction", wraps=service.transaction) as transaction:
+            report = service.import_mappings(rows)
+        assert transaction.call_count == 1
+        assert report.inserted == 2000
+
+        rows.append({"kambi_team_name": "Late", "elo_team_name": "Late"})
+        with pytest.raises(RuntimeError):
+            with service.transaction():
+                service.import_mappings(rows)
+                raise RuntimeError("abort")
+        assert service.get_mapping("Late") is None
+        assert service.get_mapping("Team 0") == "Elo 0"
+
+    @pytest.mark.parametrize("fmt", ["jsonl", "csv"])
+    def test_streaming_export_round_trip(self, service, tmp_path, fmt):
+        """Test written exports read back into an identical import."""
+        service.add_mapping("Spurs", "Tottenham")
+        service.add_mapping("Villa", "Villarreal", league_filter="La Liga")
+        service.add_league_mapping("Spain - La Liga", "ESP")
+
+        path = tmp_path / f"teams.{fmt}"
+        with open(path, "w", newline="") as fp:
+            assert service.write_mappings(fp, fmt) == 2
+        league_path = tmp_path / f"leagues.{fmt}"
+        with open(league_path, "w", newline="") as fp:
+            assert service.write_league_mappings(fp, fmt) == 1
+
+        assert service.export_mappings() == [m.to_dict() for m in service.get_all_mappings()]
+
+        other = TeamMappingService(db_path=str(tmp_path / "other.db"))
+        with open(path, newline="") as fp:
+            assert other.import_mappings(read_mapping_rows(fp, fmt)).inserted == 2
+        with open(league_path, newline="") as fp:
+            assert other.import_league_mappings(read_mapping_rows(fp, fmt)).inserted == 1
+        assert other.get_mapping("Villa", "La Liga") == "Villarreal"
+        assert other.get_mapping("Villa") is None
+        assert other.get_league_mapping("Spain - La Liga") == "ESP"
+
+    def test_unknown_format(self, service, tmp_path):
+        """Test unsupported formats are rejected."""
+        with pytest.raises(ValueError):
+            service.write_mappings(io.StringIO(), "xml")